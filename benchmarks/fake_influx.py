@@ -0,0 +1,205 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qsl
+import threading
+import argparse
+import json
+import gzip
+import time
+
+
+class FakeInfluxHandler(BaseHTTPRequestHandler):
+    """FakeInfluxHandler: answer the influx requests the exporter sends, and count the written lines"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def __send(self, code, body=None, headers=None):
+        """Private Function: send the response, the body is dumped to json if not None"""
+
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(code)
+        self.send_header('X-Influxdb-Version', self.server.version)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def __read_body(self):
+        """Private Function: read the request body, gunzip if the content encoding is gzip"""
+
+        data = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        body_bytes = len(data)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            data = gzip.decompress(data)
+        return data, body_bytes
+
+    def __query(self):
+        """Private Function: the 1.x query, only show databases has the result"""
+
+        if 'SHOW+DATABASES' in self.path.upper() or 'SHOW%20DATABASES' in self.path.upper():
+            values = [[self.server.db_name]]
+            return {'results': [{'statement_id': 0, 'series': [{'name': 'databases',
+                                                                'columns': ['name'],
+                                                                'values': values}]}]}
+        return {'results': [{'statement_id': 0}]}
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/query':
+            self.__send(200, self.__query())
+        elif path == '/api/v2/buckets':
+            self.__send(200, {'buckets': [{'id': '0000000000000001',
+                                           'orgID': '0000000000000001',
+                                           'name': self.server.bucket_name,
+                                           'retentionRules': []}]})
+        elif path == '/api/v2/orgs':
+            self.__send(200, {'orgs': [{'id': '0000000000000001', 'name': self.server.org_name}]})
+        else:
+            # /ping, /health and the version probe
+            self.__send(204)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        path = url.path
+        data, body_bytes = self.__read_body()
+        if path in ('/write', '/api/v2/write'):
+            code = self.server.next_response()
+            self.server.record(data, path=path, params=dict(parse_qsl(url.query)), headers=dict(self.headers),
+                               body_bytes=body_bytes, code=code)
+            if code == 204:
+                self.__send(204)
+            else:
+                self.__send(code, {'error': 'fake error {0}'.format(code)}, {'Retry-After': '0'})
+        elif path == '/query':
+            self.__send(200, self.__query())
+        else:
+            self.__send(204)
+
+
+class FakeInfluxServer(ThreadingMixIn, HTTPServer):
+    """FakeInfluxServer: the local stand in for the influx 1.x /ping, /query, /write and 2.x /api/v2/write,
+    which counts the written requests, lines and bytes
+
+    For the tests, the write requests are kept with keep_writes, and the write requests could be answered by
+    the status codes in responses, like 503 or 429, one code per request, then 204 when they are used up
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, version='1.8.10', db_name='benchmark', org_name='my-org',
+                 bucket_name='my-bucket', keep_writes=False):
+        HTTPServer.__init__(self, (host, port), FakeInfluxHandler)
+        self.version = version
+        self.db_name = db_name
+        self.org_name = org_name
+        self.bucket_name = bucket_name
+        self.keep_writes = keep_writes
+        self.lock = threading.Lock()
+        self.thread = None
+        self.requests = 0
+        self.lines = 0
+        self.bytes = 0
+        self.writes = list()
+        self.responses = list()
+
+    @property
+    def url(self):
+        """Function: url
+
+        :return return the server name, like: 127.0.0.1:8086
+        """
+
+        return '{0}:{1}'.format(self.server_address[0], self.server_address[1])
+
+    def next_response(self):
+        """Function: next_response
+
+        :return return the status code to answer the write request: the first one of responses, or 204
+        """
+
+        with self.lock:
+            return self.responses.pop(0) if self.responses else 204
+
+    def record(self, data, path=None, params=None, headers=None, body_bytes=None, code=204):
+        """Function: record, count the written request, and keep it with keep_writes
+
+        :param data: the line protocol body of the write request, decompressed if gzip
+        :param path: the request path (default None)
+        :param params: the request params dict (default None)
+        :param headers: the request headers dict (default None)
+        :param body_bytes: the request body bytes, compressed if gzip (default None, which means len(data))
+        :param code: the status code answered, only the written request is counted (default 204)
+        """
+
+        with self.lock:
+            if self.keep_writes:
+                self.writes.append({'path': path,
+                                    'params': params,
+                                    'headers': headers,
+                                    'data': data,
+                                    'body_bytes': len(data) if body_bytes is None else body_bytes,
+                                    'code': code})
+            if code != 204:
+                return
+            self.requests += 1
+            self.lines += data.count(b'\n') + (0 if data.endswith(b'\n') or not data else 1)
+            self.bytes += len(data)
+
+    def reset(self, version=None):
+        """Function: reset, reset the counters
+
+        :param version: the influx version to answer (default None, which means not changed)
+        """
+
+        with self.lock:
+            self.version = version or self.version
+            self.requests = 0
+            self.lines = 0
+            self.bytes = 0
+            self.writes = list()
+            self.responses = list()
+
+    def start(self, poll_interval=0.5):
+        """Function: start, serve in the background thread
+
+        :param poll_interval: the seconds to check the shutdown (default 0.5)
+        """
+
+        self.thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': poll_interval})
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Function: stop"""
+
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='The local fake influx for the benchmark.')
+    parser.add_argument('-p', '--port', type=int, default=8086, help='The port. Default: 8086')
+    parser.add_argument('-V', '--influx_version', default='1.8.10',
+                        help='The influx version to answer, like: 1.8.10 or 2.0.0. Default: 1.8.10')
+    args = parser.parse_args()
+
+    server = FakeInfluxServer(port=args.port, version=args.influx_version).start()
+    print('Info: The fake influx {0} is serving on {1}'.format(server.version, server.url))
+    try:
+        while True:
+            time.sleep(5)
+            print('Info: {0} requests, {1} lines, {2} bytes written'.format(server.requests,
+                                                                            server.lines,
+                                                                            server.bytes))
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
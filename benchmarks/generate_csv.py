@@ -0,0 +1,117 @@
+import datetime
+import argparse
+import random
+import csv
+import io
+
+time_formats = {'datetime': '%Y-%m-%d %H:%M:%S',
+                'iso_us': '%Y-%m-%dT%H:%M:%S.%fZ',
+                'epoch_s': None,
+                'epoch_ms': None,
+                'epoch_ns': None}
+
+
+def generate_csv(file_name,
+                 rows=100000,
+                 columns=6,
+                 tag_columns=2,
+                 tag_cardinality=100,
+                 empty_ratio=0.0,
+                 time_format='datetime',
+                 seed=0,
+                 start=1609459200):
+    """Function: generate_csv, the same arguments generate the same csv
+
+    The columns are: timestamp, the tag columns tag_0, tag_1..., and the field columns field_0, field_1...,
+    the field columns are int, float and string in turn.
+
+    :param file_name: the csv file name
+    :param rows: the rows count (default 100000)
+    :param columns: the field columns count (default 6)
+    :param tag_columns: the tag columns count (default 2)
+    :param tag_cardinality: the distinct values of each tag column (default 100)
+    :param empty_ratio: the ratio of the empty field cells, from 0 to 1 (default 0.0)
+    :param time_format: datetime, iso_us, epoch_s, epoch_ms or epoch_ns (default datetime)
+    :param seed: the random seed (default 0)
+    :param start: the epoch seconds of the first row, the rows are 1 second apart (default 1609459200)
+    :return return the dict of the export arguments: time_column, time_format, tag_columns, field_columns
+    """
+
+    if time_format not in time_formats:
+        raise ValueError('The time_format should be one of {0}, current is: {1}'.format(sorted(time_formats),
+                                                                                          time_format))
+
+    rand = random.Random(seed)
+    tags = ['tag_{0}'.format(i) for i in range(tag_columns)]
+    fields = ['field_{0}'.format(i) for i in range(columns)]
+    tag_values = [['{0}-{1}'.format(tag, i) for i in range(tag_cardinality)] for tag in tags]
+    words = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'fox trot', 'golf, hotel', 'india "juliet"']
+    epoch = datetime.datetime(1970, 1, 1)
+
+    with io.open(file_name, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['timestamp'] + tags + fields)
+        for i in range(rows):
+            seconds = start + i
+            if time_format == 'epoch_s':
+                timestamp = str(seconds)
+            elif time_format == 'epoch_ms':
+                timestamp = str(seconds * 1000 + rand.randint(0, 999))
+            elif time_format == 'epoch_ns':
+                timestamp = str(seconds * 1000000000 + rand.randint(0, 999999999))
+            else:
+                value = epoch + datetime.timedelta(seconds=seconds, microseconds=rand.randint(0, 999999))
+                timestamp = value.strftime(time_formats[time_format])
+            row = [timestamp]
+            row.extend(rand.choice(values) for values in tag_values)
+            for j in range(columns):
+                if empty_ratio and rand.random() < empty_ratio:
+                    row.append('')
+                elif j % 3 == 0:
+                    row.append(rand.randint(-100000, 100000))
+                elif j % 3 == 1:
+                    row.append(round(rand.uniform(-1000, 1000), 3))
+                else:
+                    row.append(rand.choice(words))
+            writer.writerow(row)
+
+    return {'time_column': 'timestamp',
+            'time_format': time_formats[time_format] or '%Y-%m-%d %H:%M:%S',
+            'tag_columns': ','.join(tags),
+            'field_columns': ','.join(fields)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the deterministic csv for the benchmark.')
+    parser.add_argument('-o', '--output', required=True, help='The csv file name')
+    parser.add_argument('-r', '--rows', type=int, default=100000, help='The rows count. Default: 100000')
+    parser.add_argument('-c', '--columns', type=int, default=6, help='The field columns count. Default: 6')
+    parser.add_argument('-t', '--tag_columns', type=int, default=2, help='The tag columns count. Default: 2')
+    parser.add_argument('-tc', '--tag_cardinality', type=int, default=100,
+                        help='The distinct values of each tag column. Default: 100')
+    parser.add_argument('-e', '--empty_ratio', type=float, default=0.0,
+                        help='The ratio of the empty field cells, from 0 to 1. Default: 0.0')
+    parser.add_argument('-tf', '--time_format', default='datetime', choices=sorted(time_formats),
+                        help='The time format. Default: datetime')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='The random seed. Default: 0')
+    args = parser.parse_args()
+
+    export_args = generate_csv(args.output,
+                               rows=args.rows,
+                               columns=args.columns,
+                               tag_columns=args.tag_columns,
+                               tag_cardinality=args.tag_cardinality,
+                               empty_ratio=args.empty_ratio,
+                               time_format=args.time_format,
+                               seed=args.seed)
+    print('Info: Generated {0} rows to {1}, export it by: -t {2} -tf "{3}" -tc {4} -fc {5}'.format(
+        args.rows,
+        args.output,
+        export_args['time_column'],
+        export_args['time_format'],
+        export_args['tag_columns'],
+        export_args['field_columns']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+from fake_influx import FakeInfluxServer
+from generate_csv import generate_csv
+import collections
+import subprocess
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import sys
+import os
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Optional: the peak rss is not reported on Windows
+
+# The scenario: csv is the generate_csv arguments, export is the export_csv_to_influx arguments,
+# stages are the stages to run, version is the influx version the fake influx answers
+scenarios = collections.OrderedDict([
+    ('baseline', {'csv': {}, 'stages': ['scan', 'convert', 'serialize', 'export']}),
+    ('epoch_ns', {'csv': {'time_format': 'epoch_ns'}, 'stages': ['scan', 'convert', 'serialize', 'export']}),
+    ('iso_us', {'csv': {'time_format': 'iso_us'}, 'stages': ['serialize', 'export']}),
+    ('empty_cells', {'csv': {'empty_ratio': 0.1}, 'stages': ['scan', 'convert', 'serialize', 'export']}),
+    ('wide', {'csv': {'columns': 30}, 'stages': ['scan', 'convert', 'serialize', 'export']}),
+    ('high_cardinality', {'csv': {'tag_cardinality': 100000}, 'stages': ['export']}),
+    ('match_filter', {'export': {'match_columns': 'tag_0', 'match_by_regex': r'tag_0-[0-4]\b'},
+                      'stages': ['export']}),
+    ('gzip', {'export': {'gzip': True}, 'stages': ['export']}),
+    ('max_in_flight', {'export': {'max_in_flight': 4}, 'stages': ['export']}),
+    ('columnar', {'export': {'engine': 'columnar'}, 'stages': ['export']}),
+    ('workers', {'export': {'workers': 4, 'chunk_size': 1024 * 1024}, 'stages': ['export']}),
+    ('influx_2', {'version': '2.0.0', 'stages': ['export']}),
+])
+
+
+def get_peak_rss():
+    """Function: get_peak_rss
+
+    :return return the peak rss of the current process or the largest child process, like the workers,
+        in bytes, None if unknown
+    """
+
+    if resource is None:
+        return None
+    peak_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+def run_stage(stage, csv_file, server, export_args):
+    """Function: run_stage, run the stage in the current process
+
+    :param stage: scan: the charset, hash, header, count and type scan; convert: parse the csv and convert the
+        values by the scanned types; serialize: serialize_csv_to_influx, without the network;
+        export: export_csv_to_influx end to end
+    :param csv_file: the csv file
+    :param server: the fake influx server name
+    :param export_args: the export_csv_to_influx arguments
+    :return return the dict: seconds, rows, bytes, peak_rss
+    """
+
+    from ExportCsvToInflux import ExporterObject, CSVObject
+
+    csv_object = CSVObject()
+    if stage == 'scan':
+        start = time.time()
+        rows = csv_object.scan_csv(csv_file, ignore_filed=export_args['time_column']).lines_count
+    elif stage == 'convert':
+        csv_scan = csv_object.scan_csv(csv_file, ignore_filed=export_args['time_column'])
+        start = time.time()
+        with csv_object.compatible_open(csv_file, encoding=csv_object.csv_charset) as f:
+            csv_reader = csv_object.compatible_dict_reader(f, encoding=csv_object.csv_charset)
+            rows = 0
+            for _ in csv_object.convert_csv_data_to_int_float(csv_reader=csv_reader,
+                                                              int_type=csv_scan.int_type,
+                                                              float_type=csv_scan.float_type):
+                rows += 1
+    elif stage in ('serialize', 'export'):
+        rows = csv_object.scan_csv(csv_file, ignore_filed=export_args['time_column']).lines_count
+        kwargs = dict(csv_file=csv_file,
+                      db_server_name=server,
+                      db_name='benchmark',
+                      db_measurement='benchmark',
+                      token='benchmark',
+                      force_insert_even_csv_no_update=True)
+        kwargs.update(export_args)
+        stdout = sys.stdout
+        start = time.time()
+        with open(os.devnull, 'w') as sys.stdout:
+            try:
+                if stage == 'serialize':
+                    for _ in ExporterObject().serialize_csv_to_influx(**kwargs):
+                        pass
+                else:
+                    ExporterObject().export_csv_to_influx(**kwargs)
+            finally:
+                sys.stdout = stdout
+    else:
+        raise ValueError('Unknown stage: {0}'.format(stage))
+
+    return {'seconds': time.time() - start,
+            'rows': rows,
+            'bytes': os.path.getsize(csv_file),
+            'peak_rss': get_peak_rss()}
+
+
+def run_stage_process(stage, csv_file, server, export_args):
+    """Function: run_stage_process, run the stage in a new process, so the peak rss is of the stage only"""
+
+    command = [sys.executable,
+               os.path.abspath(__file__),
+               '--stage', stage,
+               '--csv', csv_file,
+               '--server', server,
+               '--export_args', json.dumps(export_args)]
+    output = subprocess.check_output(command)
+
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def run_scenarios(names, rows, repeat, work_dir):
+    """Function: run_scenarios
+
+    :param names: the scenario names
+    :param rows: the csv rows count
+    :param repeat: run each stage by the times, the fastest run is reported
+    :param work_dir: the dir of the generated csv files
+    :return return the result list, each result is the dict: scenario, stage, rows, seconds, bytes, peak_rss,
+        and points, written_bytes of the export stage
+    """
+
+    server = FakeInfluxServer().start()
+    csv_files = dict()
+    results = list()
+    try:
+        for name in names:
+            scenario = scenarios[name]
+            csv_args = dict(scenario.get('csv', {}), rows=rows)
+            key = json.dumps(csv_args, sort_keys=True)
+            if key not in csv_files:
+                csv_file = os.path.join(work_dir, 'benchmark_{0}.csv'.format(len(csv_files)))
+                csv_files[key] = (csv_file, generate_csv(csv_file, **csv_args))
+            csv_file, export_args = csv_files[key]
+            export_args = dict(export_args, **scenario.get('export', {}))
+
+            for stage in scenario['stages']:
+                best = None
+                for _ in range(repeat):
+                    server.reset(scenario.get('version', '1.8.10'))
+                    result = run_stage_process(stage, csv_file, server.url, export_args)
+                    if stage == 'export':
+                        result.update(points=server.lines, written_bytes=server.bytes)
+                    if best is None or result['seconds'] < best['seconds']:
+                        best = result
+                best.update(scenario=name, stage=stage)
+                results.append(best)
+                print_result(best)
+    finally:
+        server.stop()
+
+    return results
+
+
+def print_result(result, baseline=None):
+    """Function: print_result
+
+    :param result: the result dict
+    :param baseline: the baseline result dict of the same scenario and stage to compare (default None)
+    """
+
+    seconds = max(result['seconds'], 1e-9)
+    peak_rss = result['peak_rss']
+    message = '{0:<18} {1:<9} {2:>10} rows {3:>8.2f} s {4:>12,.0f} rows/s {5:>8.2f} MB/s {6:>9} MB peak rss'.format(
+        result['scenario'],
+        result['stage'],
+        result['rows'],
+        result['seconds'],
+        result['rows'] / seconds,
+        result['bytes'] / seconds / 1024 / 1024,
+        '{0:.1f}'.format(peak_rss / 1024.0 / 1024) if peak_rss is not None else '-')
+    if 'points' in result:
+        message += ' {0:>10} points {1:>8.2f} MB written'.format(result['points'],
+                                                                 result['written_bytes'] / 1024.0 / 1024)
+    if baseline is not None:
+        baseline_rate = baseline['rows'] / max(baseline['seconds'], 1e-9)
+        message += ' {0:>+7.1%} rows/s'.format(result['rows'] / seconds / baseline_rate - 1)
+    print(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='The throughput benchmark of export_csv_to_influx, against '
+                                                 'the local fake influx.')
+    parser.add_argument('-r', '--rows', type=int, default=200000, help='The csv rows count. Default: 200000')
+    parser.add_argument('-s', '--scenarios', default=','.join(scenarios),
+                        help='The scenarios, separated by comma: {0}. Default: all'.format(', '.join(scenarios)))
+    parser.add_argument('-n', '--repeat', type=int, default=1,
+                        help='Run each stage by the times, the fastest run is reported. Default: 1')
+    parser.add_argument('-d', '--work_dir', default=None,
+                        help='The dir of the generated csv files, which are kept. Default: a temporary dir')
+    parser.add_argument('-o', '--output', default=None, help='Save the results to the json file. Default: None')
+    parser.add_argument('-c', '--compare', default=None,
+                        help='Compare the rows/s with the results json file saved by --output. Default: None')
+    # The stage process
+    parser.add_argument('--stage', help=argparse.SUPPRESS)
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    parser.add_argument('--server', help=argparse.SUPPRESS)
+    parser.add_argument('--export_args', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        result = run_stage(args.stage, args.csv, args.server, json.loads(args.export_args))
+        print(json.dumps(result))
+        return
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in scenarios]
+    if unknown:
+        parser.error('Unknown scenarios: {0}'.format(', '.join(unknown)))
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='export_csv_to_influx_benchmark_')
+    if not os.path.isdir(work_dir):
+        os.makedirs(work_dir)
+    try:
+        results = run_scenarios(names, args.rows, args.repeat, work_dir)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print('Info: Saved the results to {0}'.format(args.output))
+    if args.compare:
+        with open(args.compare) as f:
+            baselines = dict(((result['scenario'], result['stage']), result) for result in json.load(f))
+        print('Info: Compared with {0}'.format(args.compare))
+        for result in results:
+            baseline = baselines.get((result['scenario'], result['stage']))
+            if baseline is not None:
+                print_result(result, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -40,6 +40,14 @@ setup(
         'python-dateutil>=2.8.0',
         'chardet>=4.0.0'
     ],
+    extras_require={
+        'watch': ['inotify_simple>=1.3.5; sys_platform == "linux"'],
+        'xxhash': ['xxhash>=1.0.0'],
+        'zstd': ['zstandard>=0.15.0'],
+        'columnar': ['numpy>=1.16.0'],
+        'arrow': ['pyarrow>=1.0.0'],
+        'test': ['pytest>=4.6', 'numpy>=1.16.0'],
+    },
     download_url=download_url,
     url=url,
     classifiers=[
@@ -59,6 +67,7 @@ setup(
     entry_points={
         'console_scripts': [
             'export_csv_to_influx = ExportCsvToInflux.command_object:export_csv_to_influx',
+            'replay_spool_to_influx = ExportCsvToInflux.command_object:replay_spool_to_influx',
         ],
     },
 )
@@ -4,4 +4,17 @@ from .exporter_object import ExporterObject
 from .base_object import BaseObject
 from .__version__ import __version__
 from .config_object import Configuration
+from .match_object import MatchObject
+from .writer_object import WriterObject
+from .line_protocol_object import LineProtocolObject
+from .timestamp_object import TimestampObject
+from .manifest_object import ManifestObject
+from .watcher_object import WatcherObject
+from .columnar_object import ColumnarObject
+from .arrow_object import ArrowObject
+from .sink_object import SinkObject
+from .metrics_object import MetricsObject
+from .profile_object import ProfileObject
+from .progress_object import ProgressObject
 from .command_object import export_csv_to_influx
+from .command_object import replay_spool_to_influx
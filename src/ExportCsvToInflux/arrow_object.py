@@ -0,0 +1,192 @@
+from .csv_object import CSVScanResult
+import os
+import sys
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None  # Optional: the parquet and arrow files require pyarrow
+
+
+class ArrowObject(object):
+    """ArrowObject: read the parquet and arrow ipc files by record batches, in place of the csv
+
+    The column types are from the file schema, no type detection pass is needed:
+    the integer columns are int, the floating point and decimal columns are float, the bool columns are bool,
+    and the other columns are string. The null value is empty, like the empty csv value.
+    The timestamp and date time column is converted to the timestamp in nanoseconds directly,
+    the timestamp without time zone is taken as UTC.
+    """
+
+    parquet_suffixes = ['.parquet', '.pq']
+    ipc_suffixes = ['.arrow', '.feather', '.ipc']
+    batch_rows = 10000
+
+    def __init__(self, csv_object):
+        """Function: __init__
+
+        :param csv_object: the CSVObject, which hashes the file
+        """
+
+        self.csv_object = csv_object
+        self.timestamp_columns = list()
+        self.column_types = dict()
+
+    @classmethod
+    def get_format(cls, file_name):
+        """Function: get_format
+
+        :param file_name: the file name
+        :return return parquet or ipc by the file suffix, None if the file is not parquet or arrow ipc
+        """
+
+        suffix = os.path.splitext(file_name)[1].lower()
+        if suffix in cls.parquet_suffixes:
+            return 'parquet'
+        if suffix in cls.ipc_suffixes:
+            return 'ipc'
+
+        return None
+
+    def __open(self, file_name):
+        """Private Function: open the file, return (schema, rows count, record batches generator).
+        The rows count of the arrow ipc stream is None, as it is unknown before reading"""
+
+        if pa is None:
+            error_message = 'Error: The parquet and arrow files require pyarrow: pip install pyarrow: ' \
+                            '{0}'.format(file_name)
+            sys.exit(error_message)
+
+        try:
+            if self.get_format(file_name) == 'parquet':
+                parquet_file = pq.ParquetFile(file_name)
+                return (parquet_file.schema_arrow,
+                        parquet_file.metadata.num_rows,
+                        parquet_file.iter_batches(batch_size=self.batch_rows))
+            source = pa.memory_map(file_name)
+            try:
+                reader = pa.ipc.open_file(source)
+            except pa.ArrowInvalid:
+                reader = pa.ipc.open_stream(pa.memory_map(file_name))
+                return reader.schema, None, iter(reader)
+            lines_count = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+            return reader.schema, lines_count, (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except (pa.ArrowException, OSError) as e:
+            error_message = 'Error: Failed to read {0}: {1}'.format(file_name, e)
+            sys.exit(error_message)
+
+    @staticmethod
+    def __value_type(data_type):
+        """Private Function: the value type of the dictionary type, else the type itself"""
+
+        if pa.types.is_dictionary(data_type):
+            return data_type.value_type
+
+        return data_type
+
+    def scan_file(self, file_name, ignore_filed=None, column_types=None):
+        """Function: scan_file
+
+        :param file_name: the file name
+        :param ignore_filed: the certain column is not int or float, like the time column, case sensitive
+            (default None)
+        :param column_types: pin the column types, the value is int, float or string, the values are cast to
+            the pinned type when reading (default None)
+        :return return CSVScanResult, the headers, lines count and column types are from the schema.
+            The timestamp_columns of the object is updated as well
+        """
+
+        self.csv_object.valid_file_exist(file_name)
+
+        schema, lines_count, batches = self.__open(file_name)
+        if lines_count is None:
+            lines_count = sum(batch.num_rows for batch in batches)
+        int_type = dict()
+        float_type = dict()
+        self.timestamp_columns = list()
+        for field in schema:
+            data_type = self.__value_type(field.type)
+            if pa.types.is_timestamp(data_type) or pa.types.is_date(data_type):
+                self.timestamp_columns.append(field.name)
+            int_type[field.name] = pa.types.is_integer(data_type) and field.name != ignore_filed
+            float_type[field.name] = field.name != ignore_filed and (pa.types.is_integer(data_type) or
+                                                                     pa.types.is_floating(data_type) or
+                                                                     pa.types.is_decimal(data_type))
+        self.column_types = dict((key, column_type) for key, column_type in (column_types or {}).items()
+                                 if key in int_type)
+        for key, column_type in self.column_types.items():
+            int_type[key] = column_type == 'int'
+            float_type[key] = column_type in ('int', 'float')
+
+        return CSVScanResult(file_hash=self.csv_object.get_file_hash(file_name),
+                             headers=schema.names,
+                             lines_count=lines_count,
+                             int_type=int_type,
+                             float_type=float_type)
+
+    def __to_values(self, file_name, header, column, column_type, is_time):
+        """Private Function: convert the arrow column to the value list, the null value is empty"""
+
+        data_type = column.type
+        if pa.types.is_dictionary(data_type):
+            column = column.dictionary_decode()
+            data_type = column.type
+
+        try:
+            if is_time and (pa.types.is_timestamp(data_type) or pa.types.is_date(data_type)):
+                column = column.cast(pa.timestamp('ns')).cast(pa.int64())
+            elif is_time:
+                return ['' if v is None else str(v) for v in column.to_pylist()]
+            elif column_type == 'int':
+                column = column.cast(pa.int64())
+            elif column_type == 'float' or (column_type is None and pa.types.is_decimal(data_type)):
+                column = column.cast(pa.float64())
+        except pa.ArrowException as e:
+            error_message = 'Error: Failed to convert the column {0} of {1}: {2}'.format(header, file_name, e)
+            sys.exit(error_message)
+
+        values = column.to_pylist()
+        data_type = column.type
+        if column_type == 'string' or not (pa.types.is_integer(data_type) or
+                                           pa.types.is_floating(data_type) or
+                                           pa.types.is_boolean(data_type) or
+                                           pa.types.is_string(data_type) or
+                                           pa.types.is_large_string(data_type)):
+            if pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type):
+                return ['' if v is None else v.decode('utf-8', 'replace') for v in values]
+            return ['' if v is None else str(v) for v in values]
+        if column.null_count:
+            return ['' if v is None else v for v in values]
+
+        return values
+
+    def read_rows(self, file_name, int_type, float_type, time_column=None, added_columns=None):
+        """Function: read_rows
+
+        :param file_name: the file name, scanned by scan_file
+        :param int_type: the column int type dict
+        :param float_type: the column float type dict
+        :param time_column: the time column, the timestamp and date time column is read as the timestamp
+            in nanoseconds (default None)
+        :param added_columns: the dict of the column and value added to each row (default None)
+        :return return the generator of (row, int_type, float_type), the same as
+            CSVObject.convert_csv_data_to_int_float
+        """
+
+        added_columns = added_columns or dict()
+        schema, lines_count, batches = self.__open(file_name)
+        headers = schema.names
+        for batch in batches:
+            columns = list()
+            for header, column in zip(headers, batch.columns):
+                columns.append(self.__to_values(file_name,
+                                                header,
+                                                column,
+                                                self.column_types.get(header),
+                                                header == time_column))
+            for values in zip(*columns):
+                row = dict(zip(headers, values))
+                if added_columns:
+                    row.update(added_columns)
+                yield row, int_type, float_type
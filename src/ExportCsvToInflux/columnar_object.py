@@ -0,0 +1,450 @@
+from .line_protocol_object import LineProtocolObject
+from itertools import islice
+import datetime
+import uuid
+import time
+import csv
+import sys
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Optional: --engine columnar requires numpy
+
+
+class ColumnarObject(object):
+    """ColumnarObject: convert and serialize the csv rows chunk by chunk as the column arrays, by NumPy
+
+    Only the conversion and the serialization are vectorized: the type conversion, the empty value, the force
+    conversion, the match and filter, the time and the line protocol are processed column by column.
+    The parsing is not: the csv is split into the rows by the Python csv reader like the row engine, and the
+    columns are built as the object arrays of the strings. The csv scan for the header and the column types is
+    the same as the row engine as well, use type_sample_rows or column_types to shorten it.
+    The chunk which the column conversion does not expect, like: the type mismatch, the ragged row, or the force
+    conversion failure, is processed row by row, so the points are the same as the row engine.
+    """
+
+    chunk_rows = 10000
+    kind_int = 0
+    kind_float = 1
+    kind_string = 2
+    digits_pattern = re.compile(r'[1-9][0-9]*\Z')
+    int64_max = 2 ** 63 - 1
+    float_exact_max = 2 ** 53
+    microsecond = datetime.timedelta(microseconds=1)
+
+    def __init__(self,
+                 csv_object,
+                 conf,
+                 int_type,
+                 float_type,
+                 added_columns,
+                 match_object,
+                 filter_object,
+                 timestamp_object,
+                 line_protocol_object):
+        """Function: __init__
+
+        :param csv_object: the CSVObject, which has the csv charset
+        :param conf: the configuration
+        :param int_type: the column int type dict
+        :param float_type: the column float type dict
+        :param added_columns: the added columns dict, the column and the value of each row, like: the csv modified
+            time as the time column
+        :param match_object: the match MatchObject
+        :param filter_object: the filter MatchObject
+        :param timestamp_object: the TimestampObject
+        :param line_protocol_object: the LineProtocolObject, which has the tag and field columns
+        """
+
+        if np is None or csv_object.python_version == 2:
+            error_message = 'Error: The columnar engine requires Python3 and numpy: pip install numpy'
+            sys.exit(error_message)
+
+        self.csv_object = csv_object
+        self.conf = conf
+        self.int_type = int_type
+        self.float_type = float_type
+        self.added_columns = added_columns
+        self.match_object = match_object
+        self.filter_object = filter_object
+        self.timestamp_object = timestamp_object
+        self.line_protocol_object = line_protocol_object
+        self.keys = None
+        self.rows = 0
+        # The seconds of the match_filter and timestamp stages, like the timings of the row engine
+        self.timings = [0.0, 0.0]
+
+    def serialize(self, file_name, row_serializer):
+        """Function: serialize
+
+        :param file_name: the csv file, which has header
+        :param row_serializer: the function to serialize one converted row like the row engine, called with
+            (row, int_type, float_type), return (line, timestamp), None if the row is skipped by the match and filter.
+            The seconds of its match and filter, and time should be added to self.timings
+        :return return the generator, which yields (lines, timestamps) per chunk, the line text has the line
+            terminator, and the timestamp is in nanoseconds
+        """
+
+        with self.csv_object.compatible_open(file_name, encoding=self.csv_object.csv_charset) as f:
+            csv_reader = csv.reader(f, delimiter=self.csv_object.delimiter,
+                                    lineterminator=self.csv_object.lineterminator)
+            fieldnames = next(csv_reader, None)
+            if fieldnames is None:
+                return
+            while True:
+                chunk = list(islice(csv_reader, self.chunk_rows))
+                if not chunk:
+                    break
+                # The blank line is not a row, like csv.DictReader
+                chunk = [row for row in chunk if row]
+                if not chunk:
+                    continue
+                if self.keys is None:
+                    self.keys = list(self.__make_row(fieldnames, chunk[0])) + self.__get_added_names()
+
+                serialized = None
+                if self.__is_regular(fieldnames, chunk):
+                    # The match and filter hits are counted again row by row, if the chunk falls back
+                    hits = dict(self.match_object.hits), dict(self.filter_object.hits)
+                    serialized = self.__serialize_chunk(fieldnames, chunk)
+                    if serialized is None:
+                        self.match_object.hits, self.filter_object.hits = hits
+                if serialized is None:
+                    serialized = self.__serialize_chunk_by_rows(fieldnames, chunk, row_serializer)
+                self.rows += len(chunk)
+
+                yield serialized
+
+    def __get_added_names(self):
+        """Private Function: the added column names"""
+
+        return list(self.added_columns.keys())
+
+    def __is_regular(self, fieldnames, chunk):
+        """Private Function: check the chunk could be converted by columns: each row has all the fields, and the
+        fieldnames are unique"""
+
+        if len(set(fieldnames)) != len(fieldnames) or self.keys != fieldnames + self.__get_added_names():
+            return False
+        size = len(fieldnames)
+
+        return all(len(row) == size for row in chunk)
+
+    @staticmethod
+    def __make_row(fieldnames, fields):
+        """Private Function: make the row dict like csv.DictReader"""
+
+        row = dict(zip(fieldnames, fields))
+        if len(fieldnames) < len(fields):
+            row[None] = fields[len(fieldnames):]
+        else:
+            for key in fieldnames[len(fields):]:
+                row[key] = None
+
+        return row
+
+    def __make_rows(self, fieldnames, chunk):
+        """Private Function: yield the row dicts with the added columns, like CSVObject.add_columns_to_csv"""
+
+        added_values = list(self.added_columns.values())
+        for fields in chunk:
+            values = list(self.__make_row(fieldnames, fields).values()) + added_values
+            yield dict(zip(self.keys, values))
+
+    def __serialize_chunk_by_rows(self, fieldnames, chunk, row_serializer):
+        """Private Function: serialize the chunk row by row, return (lines, timestamps)"""
+
+        rows = self.csv_object.convert_csv_data_to_int_float(csv_reader=self.__make_rows(fieldnames, chunk),
+                                                             int_type=self.int_type,
+                                                             float_type=self.float_type,
+                                                             mismatch_policy=self.conf.type_mismatch_policy)
+        lines = list()
+        timestamps = list()
+        for row, int_type, float_type in rows:
+            serialized = row_serializer(row, int_type, float_type)
+            if serialized is not None:
+                lines.append(serialized[0])
+                timestamps.append(serialized[1])
+
+        return lines, timestamps
+
+    def __serialize_chunk(self, fieldnames, chunk):
+        """Private Function: serialize the chunk column by column, return (lines, timestamps),
+        None if the chunk should be serialized row by row"""
+
+        # Convert the int and float columns, the mismatch in any column rejects the row
+        size = len(chunk)
+        columns = dict()
+        for name, values in zip(fieldnames, zip(*chunk)):
+            column = self.__convert_column(name, np.array(values, dtype=object))
+            if column is None:
+                return None
+            columns[name] = column
+        for name, value in self.added_columns.items():
+            columns[name] = self.__convert_column(name, np.array([value] * size, dtype=object))
+
+        # Match & Filter
+        start = time.time()
+        match_columns = self.match_object.columns
+        filter_columns = self.filter_object.columns
+        keep = np.ones(size, dtype=bool)
+        match_status = np.array(self.__check_columns(self.match_object, columns, size), dtype=bool)
+        filter_status = np.array(self.__check_columns(self.filter_object, columns, size), dtype=bool)
+        if match_columns and not filter_columns:
+            keep = match_status
+        if not match_columns and filter_columns:
+            keep = ~filter_status
+        if match_columns and filter_columns:
+            keep = match_status | ~filter_status
+        keep = np.flatnonzero(keep)
+        self.timings[0] += time.time() - start
+        if len(keep) == 0:
+            return [], []
+
+        # Time: the string column only, like the row engine
+        time_text, time_kind = columns[self.conf.time_column]
+        if (time_kind[keep] != self.kind_string).any():
+            return None
+        start = time.time()
+        timestamps = self.__convert_times(time_text[keep])
+        self.timings[1] += time.time() - start
+
+        # Line protocol: measurement, tags, fields and timestamp
+        line_protocol_object = self.line_protocol_object
+        lines = np.full(len(keep), line_protocol_object.measurement, dtype=object)
+        for key, column in zip(line_protocol_object.tag_keys, line_protocol_object.tag_columns):
+            processed = self.__process_column(column, columns, keep)
+            if processed is None:
+                return None
+            text, kind = processed
+            text = self.__escape(text, kind == self.kind_string, LineProtocolObject.tag_escape_table)
+            if key:
+                lines += np.where(text != '', (',' + key + '=') + text, '')
+        separator = ' '
+        for key, column in zip(line_protocol_object.field_keys, line_protocol_object.field_columns):
+            processed = self.__process_column(column, columns, keep)
+            if processed is None:
+                return None
+            text, kind = processed
+            if key:
+                is_string = kind == self.kind_string
+                text = self.__escape(text, is_string, LineProtocolObject.string_escape_table)
+                text[is_string] = '"' + text[is_string] + '"'
+                text[kind == self.kind_int] += 'i'
+                lines += (separator + key + '=') + text
+                separator = ','
+        lines += ' ' + np.array(timestamps, dtype=object).astype(str).astype(object) + '\n'
+
+        return lines.tolist(), timestamps
+
+    def __convert_column(self, name, values):
+        """Private Function: convert the column like CSVObject.convert_csv_data_to_int_float, return (text, kind),
+        the text is like str(value) of the converted value. None if any value does not match the column type"""
+
+        text = values
+        kind = np.full(len(values), self.kind_string, dtype=np.int8)
+        is_int = self.int_type.get(name) is True
+        if not is_int and self.float_type.get(name) is not True:
+            return text, kind
+
+        not_empty = values != ''
+        try:
+            numbers = values[not_empty].astype(np.float64)
+        except (ValueError, TypeError):
+            return None
+        if is_int:
+            # The int64_max is rounded up to 2 ** 63 in float64, which overflows int64, so the bound is exclusive
+            is_integer = np.isfinite(numbers) & (numbers == np.floor(numbers)) & (np.abs(numbers) < 2.0 ** 63)
+            if not is_integer.all():
+                return None
+            numbers = numbers.astype(np.int64)
+        text = values.copy()
+        text[not_empty] = numbers.astype(str)
+        kind[not_empty] = self.kind_int if is_int else self.kind_float
+
+        return text, kind
+
+    @staticmethod
+    def __check_columns(match_object, columns, size):
+        """Private Function: check the rows by the match or filter columns"""
+
+        text_columns = dict((column, columns[column][0]) for column in match_object.columns if column in columns)
+
+        return match_object.check_columns(text_columns, size)
+
+    def __process_column(self, column, columns, keep):
+        """Private Function: process the tag or field column of the kept rows, like __process_tags_fields of the
+        exporter, return (text, kind), None if the force conversion fails"""
+
+        conf = self.conf
+        size = len(keep)
+        if conf.unique and column == 'uniq':
+            text = np.array(['uniq-{0}'.format(str(uuid.uuid4())[:8]) for _ in range(size)], dtype=object)
+            return text, np.full(size, self.kind_string, dtype=np.int8)
+        if column not in columns:
+            return np.full(size, '0', dtype=object), np.full(size, self.kind_int, dtype=np.int8)
+
+        text, kind = columns[column]
+        text = text[keep]
+        kind = kind[keep]
+        if conf.limit_string_length_columns and column in conf.limit_string_length_columns:
+            text = np.array([value[:conf.limit_length + 1] for value in text.tolist()], dtype=object)
+            kind[:] = self.kind_string
+        if conf.force_string_columns and column in conf.force_string_columns:
+            kind[:] = self.kind_string
+        if conf.force_int_columns and column in conf.force_int_columns:
+            text = self.__force(text, kind, int)
+            if text is None:
+                return None
+            kind[:] = self.kind_int
+        if conf.force_float_columns and column in conf.force_float_columns:
+            text = self.__force(text, kind, float)
+            if text is None:
+                return None
+            kind[:] = self.kind_float
+
+        # The empty value: by the column type, then by the force type
+        empty = (kind == self.kind_string) & (text == '')
+        if empty.any():
+            if self.int_type[column] is True:
+                value, value_kind = '-999', self.kind_int
+            elif self.float_type[column] is True:
+                value, value_kind = '-999.0', self.kind_float
+            else:
+                value, value_kind = '-', self.kind_string
+            if conf.force_string_columns and column in conf.force_string_columns:
+                value, value_kind = '-', self.kind_string
+            if conf.force_int_columns and column in conf.force_int_columns:
+                value, value_kind = '-999', self.kind_int
+            if conf.force_float_columns and column in conf.force_float_columns:
+                value, value_kind = '-999.0', self.kind_float
+            text = text.copy()
+            text[empty] = value
+            kind[empty] = value_kind
+
+        return text, kind
+
+    def __force(self, text, kind, convert):
+        """Private Function: force the values to int or float, return the text, None if any value fails"""
+
+        parsers = {self.kind_int: int, self.kind_float: float, self.kind_string: str}
+        forced = list()
+        try:
+            for value, value_kind in zip(text.tolist(), kind.tolist()):
+                forced.append(str(convert(parsers[value_kind](value))))
+        except (ValueError, OverflowError):
+            return None
+
+        return np.array(forced, dtype=object)
+
+    @staticmethod
+    def __escape(text, is_string, escape_table):
+        """Private Function: escape the string values by the escape table"""
+
+        if not is_string.any():
+            return text
+        values = text[is_string].tolist()
+        # Escape the whole column once to check, most of the columns have nothing to escape
+        joined = ''.join(values)
+        if joined.translate(escape_table) == joined:
+            return text
+        text = text.copy()
+        text[is_string] = [value.translate(escape_table) for value in values]
+
+        return text
+
+    def __convert_times(self, values):
+        """Private Function: convert the time column like TimestampObject.convert, return the timestamp list"""
+
+        timestamp_object = self.timestamp_object
+        if timestamp_object.kind is None:
+            timestamp_object.convert(values[0])
+        values = values.tolist()
+
+        timestamps = None
+        if timestamp_object.kind.startswith('epoch_'):
+            timestamps = self.__convert_epoch_times(values)
+        elif timestamp_object.kind == 'datetime' and timestamp_object.datetime_pattern is not None:
+            timestamps = self.__convert_datetime_times(values)
+        if timestamps is None:
+            timestamps = [timestamp_object.convert(value) for value in values]
+
+        return timestamps
+
+    def __convert_epoch_times(self, values):
+        """Private Function: convert the pure timestamps in the same length, None if not expected"""
+
+        length = len(values[0])
+        if length > 19 or not all(len(value) == length for value in values):
+            return None
+        if not all(self.digits_pattern.match(value) for value in values):
+            return None
+
+        try:
+            numbers = np.array(values).astype(np.int64)
+        except OverflowError:
+            return None
+        scale = 10 ** (19 - length)
+        if (numbers > self.int64_max // scale).any():
+            return None
+
+        return (numbers * scale).tolist()
+
+    def __convert_datetime_times(self, values):
+        """Private Function: convert the fixed layout times in the same length, None if not expected"""
+
+        timestamp_object = self.timestamp_object
+        length = len(values[0])
+        if not all(len(value) == length for value in values):
+            return None
+        matches = [timestamp_object.datetime_pattern.match(value) for value in values]
+        if not all(matches):
+            return None
+
+        # The same layout: the digits are at the same positions in all the values
+        digits = np.array(values).astype('S').view(np.uint8).reshape(len(values), -1).astype(np.int64) - ord('0')
+        groups = list()
+        for start, end in [matches[0].span(i + 1) for i in range(len(matches[0].groups()))]:
+            group = np.zeros(len(values), dtype=np.int64)
+            for position in range(start, end):
+                group = group * 10 + digits[:, position]
+            groups.append(group * 10 ** (6 - (end - start)) if len(groups) == 6 else group)
+        year, month, day = groups[:3]
+        hour, minute, second, microsecond = (groups[3:] + [np.zeros(len(values), dtype=np.int64)] * 4)[:4]
+
+        # The invalid date is converted by the row engine, like: 2022-02-30
+        months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+        month_days = (months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')
+        valid = (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days.astype(np.int64))
+        valid = valid & (hour < 24) & (minute < 60) & (second < 60)
+        if not valid.all():
+            return None
+        days = months.astype('datetime64[D]').astype(np.int64) + day - 1
+        local = (((days * 24 + hour) * 60 + minute) * 60 + second) * 1000000 + microsecond
+
+        # The utc offset is looked up once per time zone period
+        offsets = np.zeros(len(values), dtype=np.int64)
+        pending = np.ones(len(values), dtype=bool)
+        while pending.any():
+            index = np.flatnonzero(pending)[0]
+            datetime_naive = timestamp_object.epoch_naive + datetime.timedelta(microseconds=int(local[index]))
+            offset, period = timestamp_object.get_utc_offset(datetime_naive)
+            offset = offset // self.microsecond
+            if period is None:
+                offsets[index] = offset
+                pending[index] = False
+                continue
+            start, end = [(bound - timestamp_object.epoch_naive) // self.microsecond for bound in period]
+            in_period = pending & (local >= start) & (local < end)
+            offsets[in_period] = offset
+            pending &= ~in_period
+
+        # In milliseconds precision, like the float arithmetic of the row engine
+        microseconds = local - offsets
+        if (np.abs(microseconds) >= self.float_exact_max).any():
+            return None
+        milliseconds = (microseconds.astype(np.float64) / 1e6 * 1000).astype(np.int64)
+
+        return (milliseconds * 1000000).tolist()
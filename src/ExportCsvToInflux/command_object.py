@@ -1,30 +1,21 @@
 from .exporter_object import ExporterObject
+from .profile_object import ProfileObject
 from .influx_object import InfluxObject
 from .__version__ import __version__
 import argparse
 
 
-class UserNamespace(object):
-    pass
-
-
 def export_csv_to_influx():
     parser = argparse.ArgumentParser(description='CSV to InfluxDB.')
 
-    # Parse: Parse the server name, and judge the influx version
+    # Parse: Parse the server name, the influx version is judged after parsing
     parser.add_argument('-s', '--server', nargs='?', default='localhost:8086', const='localhost:8086',
                         help='InfluxDB Server address. Default: localhost:8086')
     parser.add_argument('-v', '--version', action="version", version=__version__)
-    user_namespace = UserNamespace()
-    parser.parse_known_args(namespace=user_namespace)
-    influx_object = InfluxObject(db_server_name=user_namespace.server)
-    influx_version = influx_object.get_influxdb_version()
-    print('Info: The influxdb version is {influx_version}'.format(influx_version=influx_version))
 
     # influxdb 0.x, 1.x
     parser.add_argument('-db', '--dbname',
-                        required=True if influx_version.startswith('0') or influx_version.startswith('1') else False,
-                        help='For 0.x, 1.x only, InfluxDB Database name.')
+                        help='For 0.x, 1.x only, InfluxDB Database name. Required for 0.x, 1.x')
     parser.add_argument('-u', '--user', nargs='?', default='admin', const='admin',
                         help='For 0.x, 1.x only, InfluxDB User name.')
     parser.add_argument('-p', '--password', nargs='?', default='admin', const='admin',
@@ -38,8 +29,7 @@ def export_csv_to_influx():
     parser.add_argument('-bucket', '--bucket', nargs='?', default='my-bucket', const='my-bucket',
                         help='For 2.x only, the bucket. Default: my-bucket.')
     parser.add_argument('-token', '--token',
-                        required=True if influx_version.startswith('2') else False,
-                        help='For 2.x only, the access token')
+                        help='For 2.x only, the access token. Required for 2.x')
 
     # Parse: Parse the others
     parser.add_argument('-c', '--csv', required=True,
@@ -100,12 +90,106 @@ def export_csv_to_influx():
                         help='Write duplicated points. Default: False.')
     parser.add_argument('--csv_charset', '--csv_charset', nargs='?', default=None, const=None,
                         help='The csv charset. Default: None, which will auto detect')
+    parser.add_argument('-tsr', '--type_sample_rows', nargs='?', default=0, const=0,
+                        help='Detect the column types from the first rows only. Default: 0, which means all rows')
+    parser.add_argument('-ct', '--column_types', nargs='?', default=None, const=None,
+                        help='Pin the column types, separated by comma, '
+                             'like: column_1:int,column_2:float,column_3:string. Default: None')
+    parser.add_argument('-tmp', '--type_mismatch_policy', nargs='?', default='reject', const='reject',
+                        help='When the value does not match the sampled or pinned column type: '
+                             'coerce, reject or stringify. Default: reject')
+    parser.add_argument('-w', '--workers', nargs='?', default=1, const=1,
+                        help='Export the csv files by the process pool with the workers. Default: 1')
+    parser.add_argument('-cs', '--chunk_size', nargs='?', default=64 * 1024 * 1024, const=64 * 1024 * 1024,
+                        help='With workers, split the csv file larger than the chunk size in bytes to chunks, '
+                             'which are parsed in parallel. Default: 67108864, 0 means no chunk')
+    parser.add_argument('-mif', '--max_in_flight', nargs='?', default=0, const=0,
+                        help='Post the batches by the background threads, at most max_in_flight batches at the '
+                             'same time. Default: 0, which means the batch is posted when it is written')
+    parser.add_argument('-gz', '--gzip', nargs='?', default=False, const=True,
+                        help='Gzip the write request body, and print the compression ratio and time. Default: False')
+    parser.add_argument('-r', '--retries', nargs='?', default=3, const=3,
+                        help='Retry the timeout, connection error, 429 and 5xx with the exponential backoff. '
+                             'Default: 3')
+    parser.add_argument('-ri', '--retry_interval', nargs='?', default=1.0, const=1.0,
+                        help='The first retry interval in seconds, doubled for each retry. Default: 1.0')
+    parser.add_argument('-vs', '--verify_ssl', nargs='?', default=True, const=True,
+                        help='Verify the server certificate when the influx server is https. False is only for '
+                             'the self-signed certificate of the trusted server. Default: True')
+    parser.add_argument('-sd', '--spool_dir', nargs='?', default=None, const=None,
+                        help='Save the batch failed after the retries to the dir and go on, '
+                             'replay them later by replay_spool_to_influx. Default: None, which means exit')
+    parser.add_argument('-inc', '--incremental', nargs='?', default=False, const=True,
+                        help='Export only the rows appended since the last export, by the byte offset saved in '
+                             'the manifest. The truncated or rewritten csv is fully exported. Default: False')
+    parser.add_argument('-mf', '--manifest', nargs='?', default=None, const=None,
+                        help='The manifest file, which saves the state of the exported csv files for --incremental '
+                             'and --force_insert_even_csv_no_update False. '
+                             'Default: .export_csv_to_influx_manifest.jsonl in the csv dir')
+    parser.add_argument('-wt', '--watch', nargs='?', default=False, const=True,
+                        help='After the export, keep watching the csv file or dir, and export the new and changed '
+                             'csv files until interrupted. Use with --incremental to export the appended rows only. '
+                             'Default: False')
+    parser.add_argument('-wi', '--watch_interval', nargs='?', default=5.0, const=5.0,
+                        help='The polling interval in seconds, or the seconds to collect more inotify events. '
+                             'Default: 5.0')
+    parser.add_argument('-ha', '--hash_algorithm', nargs='?', default='md5', const='md5',
+                        help='The hash to check the csv file is changed or not, when the size or modified time is '
+                             'changed: md5, blake2b or xxhash (pip install xxhash). Default: md5')
+    parser.add_argument('-en', '--engine', nargs='?', default='row', const='row',
+                        help='Convert the rows one by one: row, or convert and serialize the columns chunk by chunk '
+                             'by NumPy, the csv is still parsed by the csv reader: columnar (pip install numpy). '
+                             'Default: row')
+    parser.add_argument('-ms', '--match_suffix', nargs='?', default='.csv', const='.csv',
+                        help='Match the files in the csv dir by the suffix, separated by comma, like: .csv,.parquet. '
+                             'The .parquet, .pq, .arrow, .feather and .ipc files are read by pyarrow '
+                             '(pip install pyarrow), with the column types from the schema. Default: .csv')
+    parser.add_argument('-o', '--output', nargs='?', default=None, const='-',
+                        help='Write the line protocol to the file instead of influx, without connecting influx. '
+                             '- means stdout, and the messages are printed to stderr. The file ends with .gz, '
+                             'or with --gzip, is gzip compressed. Default: None')
+    parser.add_argument('-mtf', '--metrics_file', nargs='?', default=None, const=None,
+                        help='Save the counters and latency histograms of the export stages, per csv file and per '
+                             'run, to the file. Default: None')
+    parser.add_argument('-mtt', '--metrics_format', nargs='?', default='json', const='json',
+                        help='The metrics file format: json, or prometheus for the node exporter textfile '
+                             'collector. Default: json')
+    parser.add_argument('-pi', '--progress_interval', nargs='?', default=5.0, const=5.0,
+                        help='Report the progress of the csv file at most once per the seconds: rows read, points '
+                             'written, bytes sent, rows/s and ETA. Default: 5.0')
+    parser.add_argument('-vb', '--verbosity', nargs='?', default=1, const=1,
+                        help='The progress report: 0, no progress; 1, the progress at most once per '
+                             '--progress_interval and the summary of each csv file; 2, the progress of every batch, '
+                             'with the compression ratio and time of the batch with --gzip. Default: 1')
+    parser.add_argument('-lf', '--log_format', nargs='?', default='text', const='text',
+                        help='The progress report format: text, or json, one json object per line. Default: text')
+    parser.add_argument('-pf', '--profile', nargs='?', default=None, const='export_csv_to_influx.prof',
+                        help='Run the export under the profiler, save the stats to the file, and print the top '
+                             'modules and functions by the self time. The workers are not profiled. '
+                             'Default: None, export_csv_to_influx.prof if no value')
+    parser.add_argument('-pfr', '--profiler', nargs='?', default='cprofile', const='cprofile',
+                        help='The profiler: cprofile, the stats file is for python -m pstats, or sample, the '
+                             'sampling profiler with the lower overhead, the stats file is the folded stacks for '
+                             'flamegraph.pl or speedscope. Default: cprofile')
+    parser.add_argument('-pft', '--profile_top', nargs='?', default=20, const=20,
+                        help='The top N modules and functions of the profile report. Default: 20')
+
+    args = parser.parse_args()
+
+    # Judge the influx version after parsing, so the --help and --output do not connect the influx
+    if args.output is None:
+        influx_object = InfluxObject(db_server_name=args.server)
+        influx_version = influx_object.get_influxdb_version()
+        print('Info: The influxdb version is {influx_version}'.format(influx_version=influx_version))
+        if (influx_version.startswith('0') or influx_version.startswith('1')) and args.dbname is None:
+            parser.error('the following arguments are required for influx {0}: -db/--dbname'.format(influx_version))
+        if influx_version.startswith('2') and args.token is None:
+            parser.error('the following arguments are required for influx {0}: -token/--token'.format(influx_version))
 
-    args = parser.parse_args(namespace=user_namespace)
     exporter = ExporterObject()
     input_data = {
         'csv_file': args.csv,
-        'db_server_name': user_namespace.server,
+        'db_server_name': args.server,
         'db_user': args.user,
         'db_password': args.password,
         'db_name': 'None' if args.dbname is None else args.dbname,
@@ -138,6 +222,91 @@ def export_csv_to_influx():
         'bucket_name': args.bucket,
         'token': 'None' if args.token is None else args.token,
         'unique': args.unique,
-        'csv_charset': args.csv_charset
+        'csv_charset': args.csv_charset,
+        'type_sample_rows': args.type_sample_rows,
+        'column_types': args.column_types,
+        'type_mismatch_policy': args.type_mismatch_policy,
+        'workers': args.workers,
+        'chunk_size': args.chunk_size,
+        'max_in_flight': args.max_in_flight,
+        'gzip': args.gzip,
+        'retries': args.retries,
+        'retry_interval': args.retry_interval,
+        'spool_dir': args.spool_dir,
+        'verify_ssl': args.verify_ssl,
+        'incremental': args.incremental,
+        'manifest': args.manifest,
+        'watch': args.watch,
+        'watch_interval': args.watch_interval,
+        'hash_algorithm': args.hash_algorithm,
+        'engine': args.engine,
+        'match_suffix': args.match_suffix,
+        'output': args.output,
+        'metrics_file': args.metrics_file,
+        'metrics_format': args.metrics_format,
+        'progress_interval': args.progress_interval,
+        'verbosity': args.verbosity,
+        'log_format': args.log_format
+    }
+    if args.profile:
+        profile_object = ProfileObject(args.profile,
+                                       profiler=args.profiler,
+                                       top=args.profile_top,
+                                       stderr=args.output == '-')
+        profile_object.run(exporter.export_csv_to_influx, **input_data)
+    else:
+        exporter.export_csv_to_influx(**input_data)
+
+
+def replay_spool_to_influx():
+    parser = argparse.ArgumentParser(description='Replay the spooled batches to InfluxDB.')
+    parser.add_argument('-s', '--server', nargs='?', default='localhost:8086', const='localhost:8086',
+                        help='InfluxDB Server address. Default: localhost:8086')
+    parser.add_argument('-v', '--version', action="version", version=__version__)
+    parser.add_argument('-sd', '--spool_dir', required=True,
+                        help='The spool dir, which has the batches saved by export_csv_to_influx --spool_dir')
+
+    # influxdb 0.x, 1.x
+    parser.add_argument('-db', '--dbname', nargs='?', default=None, const=None,
+                        help='For 0.x, 1.x only, InfluxDB Database name.')
+    parser.add_argument('-u', '--user', nargs='?', default='admin', const='admin',
+                        help='For 0.x, 1.x only, InfluxDB User name.')
+    parser.add_argument('-p', '--password', nargs='?', default='admin', const='admin',
+                        help='For 0.x, 1.x only, InfluxDB Password.')
+
+    # influxdb 2.x
+    parser.add_argument('-http_schema', '--http_schema', nargs='?', default='http', const='http',
+                        help='For 2.x only, the influxdb http schema, could be http or https. Default: http.')
+    parser.add_argument('-org', '--org', nargs='?', default='my-org', const='my-org',
+                        help='For 2.x only, the org. Default: my-org.')
+    parser.add_argument('-bucket', '--bucket', nargs='?', default='my-bucket', const='my-bucket',
+                        help='For 2.x only, the bucket. Default: my-bucket.')
+    parser.add_argument('-token', '--token', nargs='?', default=None, const=None,
+                        help='For 2.x only, the access token')
+
+    parser.add_argument('-r', '--retries', nargs='?', default=3, const=3,
+                        help='Retry the timeout, connection error, 429 and 5xx with the exponential backoff. '
+                             'Default: 3')
+    parser.add_argument('-ri', '--retry_interval', nargs='?', default=1.0, const=1.0,
+                        help='The first retry interval in seconds, doubled for each retry. Default: 1.0')
+    parser.add_argument('-vs', '--verify_ssl', nargs='?', default=True, const=True,
+                        help='Verify the server certificate when the influx server is https. False is only for '
+                             'the self-signed certificate of the trusted server. Default: True')
+
+    args = parser.parse_args()
+    exporter = ExporterObject()
+    input_data = {
+        'spool_dir': args.spool_dir,
+        'db_server_name': args.server,
+        'db_user': args.user,
+        'db_password': args.password,
+        'db_name': args.dbname,
+        'http_schema': args.http_schema,
+        'org_name': args.org,
+        'bucket_name': args.bucket,
+        'token': args.token,
+        'retries': args.retries,
+        'retry_interval': args.retry_interval,
+        'verify_ssl': args.verify_ssl
     }
-    exporter.export_csv_to_influx(**input_data)
+    exporter.replay_spool(**input_data)
@@ -44,6 +44,30 @@ class Configuration(object):
         self.token = kwargs.get('token', None)
         self.unique = kwargs.get('unique', False)
         self.csv_charset = kwargs.get('csv_charset', None)
+        self.type_sample_rows = kwargs.get('type_sample_rows', 0)
+        self.column_types = kwargs.get('column_types', None)
+        self.type_mismatch_policy = kwargs.get('type_mismatch_policy', 'reject')
+        self.workers = kwargs.get('workers', 1)
+        self.chunk_size = kwargs.get('chunk_size', 64 * 1024 * 1024)
+        self.max_in_flight = kwargs.get('max_in_flight', 0)
+        self.gzip = kwargs.get('gzip', False)
+        self.retries = kwargs.get('retries', 3)
+        self.retry_interval = kwargs.get('retry_interval', 1.0)
+        self.spool_dir = kwargs.get('spool_dir', None)
+        self.verify_ssl = kwargs.get('verify_ssl', True)
+        self.incremental = kwargs.get('incremental', False)
+        self.manifest = kwargs.get('manifest', None)
+        self.watch = kwargs.get('watch', False)
+        self.watch_interval = kwargs.get('watch_interval', 5.0)
+        self.hash_algorithm = kwargs.get('hash_algorithm', 'md5')
+        self.engine = kwargs.get('engine', 'row')
+        self.match_suffix = kwargs.get('match_suffix', '.csv')
+        self.output = kwargs.get('output', None)
+        self.metrics_file = kwargs.get('metrics_file', None)
+        self.metrics_format = kwargs.get('metrics_format', 'json')
+        self.progress_interval = kwargs.get('progress_interval', 5.0)
+        self.verbosity = kwargs.get('verbosity', 1)
+        self.log_format = kwargs.get('log_format', 'text')
 
         # Validate conf
         base_object = BaseObject()
@@ -52,6 +76,8 @@ class Configuration(object):
         base_object.validate_str(self.db_measurement, target_name='db_measurement')
         base_object.validate_str(self.time_format, target_name='time_format')
         base_object.validate_str(self.delimiter, target_name='delimiter')
+        base_object.validate_str(self.match_suffix, target_name='match_suffix')
+        base_object.validate_str(self.output, target_name='output')
         base_object.validate_str(self.lineterminator, target_name='lineterminater')
         base_object.validate_str(self.time_zone, target_name='time_zone')
         self.tag_columns = base_object.str_to_list(self.tag_columns)
@@ -76,6 +102,14 @@ class Configuration(object):
         base_object.validate_str(self.token, target_name='token')
         self.unique = self.__validate_bool_string(self.unique)
         base_object.validate_str(self.csv_charset, target_name='csv_charset')
+        self.column_types = self.__validate_column_types(self.column_types)
+        self.gzip = self.__validate_bool_string(self.gzip)
+        base_object.validate_str(self.spool_dir, target_name='spool_dir')
+        self.verify_ssl = self.__validate_bool_string(self.verify_ssl)
+        self.incremental = self.__validate_bool_string(self.incremental)
+        base_object.validate_str(self.manifest, target_name='manifest')
+        self.watch = self.__validate_bool_string(self.watch)
+        base_object.validate_str(self.type_mismatch_policy, target_name='type_mismatch_policy')
 
         # Fields should not duplicate in force_string_columns, force_int_columns, force_float_columns
         all_force_columns = self.force_string_columns + self.force_int_columns + self.force_float_columns
@@ -115,6 +149,100 @@ class Configuration(object):
             error_message = 'Error: The limit_length should be int, current is: {0}'.format(self.limit_length)
             sys.exit(error_message)
 
+        # Validate: type_sample_rows
+        try:
+            self.type_sample_rows = int(self.type_sample_rows)
+        except ValueError:
+            error_message = 'Error: The type_sample_rows should be int, current is: {0}'.format(self.type_sample_rows)
+            sys.exit(error_message)
+
+        # Validate: workers
+        try:
+            self.workers = int(self.workers)
+        except ValueError:
+            error_message = 'Error: The workers should be int, current is: {0}'.format(self.workers)
+            sys.exit(error_message)
+
+        # Validate: chunk_size
+        try:
+            self.chunk_size = int(self.chunk_size)
+        except ValueError:
+            error_message = 'Error: The chunk_size should be int, current is: {0}'.format(self.chunk_size)
+            sys.exit(error_message)
+
+        # Validate: max_in_flight
+        try:
+            self.max_in_flight = int(self.max_in_flight)
+        except ValueError:
+            error_message = 'Error: The max_in_flight should be int, current is: {0}'.format(self.max_in_flight)
+            sys.exit(error_message)
+
+        # Validate: retries, retry_interval
+        try:
+            self.retries = int(self.retries)
+        except ValueError:
+            error_message = 'Error: The retries should be int, current is: {0}'.format(self.retries)
+            sys.exit(error_message)
+        try:
+            self.retry_interval = float(self.retry_interval)
+        except ValueError:
+            error_message = 'Error: The retry_interval should be float, current is: {0}'.format(self.retry_interval)
+            sys.exit(error_message)
+
+        # Validate: watch_interval
+        try:
+            self.watch_interval = float(self.watch_interval)
+        except ValueError:
+            error_message = 'Error: The watch_interval should be float, current is: {0}'.format(self.watch_interval)
+            sys.exit(error_message)
+
+        # Validate: progress_interval, verbosity
+        try:
+            self.progress_interval = float(self.progress_interval)
+        except ValueError:
+            error_message = 'Error: The progress_interval should be float, ' \
+                            'current is: {0}'.format(self.progress_interval)
+            sys.exit(error_message)
+        try:
+            self.verbosity = int(self.verbosity)
+        except ValueError:
+            error_message = 'Error: The verbosity should be int, current is: {0}'.format(self.verbosity)
+            sys.exit(error_message)
+
+        # Validate: type_mismatch_policy
+        expected = ['coerce', 'reject', 'stringify']
+        if self.type_mismatch_policy not in expected:
+            error_message = 'Error: The type_mismatch_policy should be one of {0}, ' \
+                            'current is: {1}'.format(expected, self.type_mismatch_policy)
+            sys.exit(error_message)
+
+        # Validate: hash_algorithm
+        expected = ['md5', 'blake2b', 'xxhash']
+        if self.hash_algorithm not in expected:
+            error_message = 'Error: The hash_algorithm should be one of {0}, ' \
+                            'current is: {1}'.format(expected, self.hash_algorithm)
+            sys.exit(error_message)
+
+        # Validate: metrics_format
+        expected = ['json', 'prometheus']
+        if self.metrics_format not in expected:
+            error_message = 'Error: The metrics_format should be one of {0}, ' \
+                            'current is: {1}'.format(expected, self.metrics_format)
+            sys.exit(error_message)
+
+        # Validate: log_format
+        expected = ['text', 'json']
+        if self.log_format not in expected:
+            error_message = 'Error: The log_format should be one of {0}, ' \
+                            'current is: {1}'.format(expected, self.log_format)
+            sys.exit(error_message)
+
+        # Validate: engine
+        expected = ['row', 'columnar']
+        if self.engine not in expected:
+            error_message = 'Error: The engine should be one of {0}, current is: {1}'.format(expected, self.engine)
+            sys.exit(error_message)
+
         # Validate csv
         current_dir = os.path.curdir
         csv_file = os.path.join(current_dir, self.csv_file)
@@ -123,6 +251,15 @@ class Configuration(object):
             error_message = 'Error: CSV file not found, exiting...'
             sys.exit(error_message)
 
+        # Validate spool_dir: None means the batch failed after the retries is an error
+        if self.spool_dir is None or str(self.spool_dir).lower() == 'none':
+            self.spool_dir = None
+
+        # Validate manifest: default in the csv dir
+        if self.manifest is None or str(self.manifest).lower() == 'none':
+            csv_dir = self.csv_file if os.path.isdir(self.csv_file) else os.path.dirname(self.csv_file)
+            self.manifest = os.path.join(csv_dir, '.export_csv_to_influx_manifest.jsonl')
+
     @staticmethod
     def __validate_bool_string(target, alias=''):
         """Private Function: Validate bool string
@@ -137,3 +274,27 @@ class Configuration(object):
             sys.exit(error_message)
 
         return True if target == 'true' else False
+
+    @staticmethod
+    def __validate_column_types(target):
+        """Private Function: Validate column types
+
+        :param target: the column types, dict or string like: column_1:int,column_2:float,column_3:string
+        :return the column types dict
+        """
+
+        expected = ['int', 'float', 'string']
+        if isinstance(target, dict):
+            column_types = target
+        else:
+            column_types = dict()
+            for item in BaseObject().str_to_list(target):
+                column, _, column_type = item.rpartition(':')
+                column_types[column.strip()] = column_type.strip().lower()
+        for column, column_type in column_types.items():
+            if not column or column_type not in expected:
+                error_message = 'Error: The column_types should be like: ' \
+                                'column_1:int,column_2:float,column_3:string, current is: {0}'.format(target)
+                sys.exit(error_message)
+
+        return column_types
@@ -1,17 +1,38 @@
 from chardet.universaldetector import UniversalDetector
-from collections import defaultdict
 from .base_object import BaseObject
-from itertools import tee
+from itertools import islice, chain
 from glob import glob
+import tempfile
 import hashlib
+import gzip
+import bz2
+import pickle
 import codecs
+import mmap
+import io
 import types
 import time
 import json
 import csv
+import re
 import sys
 import os
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None  # Optional: --hash_algorithm xxhash
+
+try:
+    import lzma
+except ImportError:
+    lzma = None  # Python2.7: .xz is not supported
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # Optional: .zst requires the zstandard package
+
 
 class UTF8Recoder:
     """
@@ -48,15 +69,134 @@ class UnicodeDictReader:
         return self
 
 
+class HashReader(io.RawIOBase):
+    """
+    Raw stream which updates the hash object with every byte read from the file object "f"
+    """
+
+    def __init__(self, f, hash_object):
+        self.f = f
+        self.hash_object = hash_object
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        size = self.f.readinto(b)
+        if size:
+            self.hash_object.update(memoryview(b)[:size])
+        return size
+
+
+class ZstdReader(io.RawIOBase):
+    """
+    Raw stream which decompresses the zstandard file "file_name", the backward seek reopens the file
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.f = None
+        self.position = 0
+        self.__reopen()
+
+    def __reopen(self):
+        if self.f is not None:
+            self.f.close()
+        self.f = zstandard.open(self.file_name, 'rb')
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        size = self.f.readinto(b)
+        self.position += size
+        return size
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('can not seek from the end of zstd decompression stream')
+        if offset < self.position:
+            self.__reopen()
+        if offset > self.position:
+            self.f.seek(offset - self.position, io.SEEK_CUR)
+            self.position = offset
+        return self.position
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+        super(ZstdReader, self).close()
+
+
+class CSVScanResult(object):
+    """CSV Scan Result: the csv file info collected by CSVObject.scan_csv"""
+
+    def __init__(self,
+                 csv_charset=None,
+                 file_hash=None,
+                 headers=None,
+                 lines_count=0,
+                 int_type=None,
+                 float_type=None,
+                 single_line_records=False,
+                 timings=None):
+        self.csv_charset = csv_charset
+        self.file_hash = file_hash
+        self.headers = headers if headers is not None else list()
+        self.lines_count = lines_count
+        self.int_type = int_type if int_type is not None else dict()
+        self.float_type = float_type if float_type is not None else dict()
+        self.single_line_records = single_line_records
+        self.timings = timings if timings is not None else dict()
+
+
 class CSVObject(object):
     """CSV Object"""
 
     python_version = sys.version_info.major
-
-    def __init__(self, delimiter=',', lineterminator='\n', csv_charset=None):
+    mismatch_policies = ['coerce', 'reject', 'stringify']
+    hash_algorithms = ['md5', 'blake2b', 'xxhash']
+    compressed_suffixes = ['.gz', '.bz2', '.xz', '.zst']
+    read_buffer_size = 1024 * 1024
+    charset_detect_size = 1024 * 1024
+    map_slice_size = 8 * 1024 * 1024
+    # The line terminator of the blank line, which is just after another line terminator
+    blank_line_pattern = re.compile(b'(?:(?<=\n)|(?<=\n\r))\n')
+
+    def __init__(self, delimiter=',', lineterminator='\n', csv_charset=None, hash_algorithm='md5'):
         self.delimiter = delimiter
         self.lineterminator = lineterminator
         self.csv_charset = csv_charset
+        self.hash_algorithm = hash_algorithm
+
+    @staticmethod
+    def new_hash(hash_algorithm='md5'):
+        """Function: new_hash
+
+        :param hash_algorithm: md5, blake2b (Python3.6+) or xxhash (the xxhash package is required)
+            (default md5)
+        :return return the new hash object
+        """
+
+        if hash_algorithm == 'md5':
+            return hashlib.md5()
+        if hash_algorithm == 'blake2b' and hasattr(hashlib, 'blake2b'):
+            return hashlib.blake2b(digest_size=16)
+        if hash_algorithm == 'xxhash' and xxhash is not None:
+            return xxhash.xxh64()
+        error_message = 'Error: The hash algorithm {0} is not available, ' \
+                        'blake2b requires Python3.6+, xxhash requires: pip install xxhash'.format(hash_algorithm)
+        sys.exit(error_message)
 
     @classmethod
     def detect_csv_charset(cls, file_name, **csv_object):
@@ -66,19 +206,33 @@ class CSVObject(object):
         :return return csv charset
         """
 
+        with cls.open_binary(file_name) as f:
+            encoding = cls.__detect_charset(f)
+        csv_object['csv_charset'] = encoding
+
+        return cls(**csv_object)
+
+    @staticmethod
+    def __detect_charset(f, limit=None):
+        """Private Function: detect the charset from the binary file object
+
+        :param f: the binary file object
+        :param limit: stop feeding the detector after the bytes (default None, which means no limit)
+        :return return the charset
+        """
+
         detector = UniversalDetector()
         detector.reset()
 
-        with open(file_name, 'rb') as f:
-            for row in f:
-                detector.feed(row)
-                if detector.done:
-                    break
+        size = 0
+        for row in f:
+            detector.feed(row)
+            size += len(row)
+            if detector.done or (limit is not None and size >= limit):
+                break
         detector.close()
-        encoding = detector.result.get('encoding')
-        csv_object['csv_charset'] = encoding
 
-        return cls(**csv_object)
+        return detector.result.get('encoding')
 
     def compatible_dict_reader(self, f, encoding, **kwargs):
         """Function: compatible_dict_reader
@@ -99,14 +253,58 @@ class CSVObject(object):
         :param file_name: the file name
         :param mode: the open mode
         :param encoding: the encoding charset
-        :return return file object
+        :return return file object, the compressed file is decompressed when reading, see open_binary
         """
 
+        if mode == 'r' and self.get_compression(file_name) is not None:
+            if self.python_version == 2:
+                return self.open_binary(file_name)
+            return io.TextIOWrapper(self.open_binary(file_name), encoding=encoding)
         if self.python_version == 2:
             return open(file_name, mode=mode)
         else:
             return open(file_name, mode=mode, encoding=encoding)
 
+    @classmethod
+    def get_compression(cls, file_name):
+        """Function: get_compression
+
+        :param file_name: the file name
+        :return return the compressed suffix of the file name, like: .gz, None if not compressed
+        """
+
+        for suffix in cls.compressed_suffixes:
+            if file_name.lower().endswith(suffix):
+                return suffix
+
+        return None
+
+    @classmethod
+    def open_binary(cls, file_name):
+        """Function: open_binary
+
+        The compressed file (.gz, .bz2, .xz or .zst) is decompressed when reading, not to the disk.
+        The .xz requires Python3.3+, the .zst requires: pip install zstandard
+
+        :param file_name: the file name
+        :return return the binary file object
+        """
+
+        compression = cls.get_compression(file_name)
+        if compression is None:
+            return open(file_name, 'rb')
+        if compression == '.gz':
+            return gzip.open(file_name, 'rb')
+        if compression == '.bz2':
+            return bz2.BZ2File(file_name, 'rb')
+        if compression == '.xz' and lzma is not None:
+            return lzma.open(file_name, 'rb')
+        if compression == '.zst' and zstandard is not None:
+            return io.BufferedReader(ZstdReader(file_name), buffer_size=cls.read_buffer_size)
+        error_message = 'Error: The {0} file is not supported, .xz requires Python3.3+, ' \
+                        '.zst requires: pip install zstandard: {1}'.format(compression, file_name)
+        sys.exit(error_message)
+
     def get_csv_header(self, file_name):
         """Function: get_csv_header.
 
@@ -130,8 +328,10 @@ class CSVObject(object):
             f.seek(0)
             csv_reader = self.compatible_dict_reader(f, encoding=self.csv_charset, delimiter=self.delimiter,
                                                      lineterminator=self.lineterminator)
+            headers = list()
             for row in csv_reader:
                 headers = list(row.keys())
+                break
             is_header = not any(field.isdigit() for field in headers)
             headers = headers if has_header or is_header else []
 
@@ -142,14 +342,11 @@ class CSVObject(object):
         """Function: search_files_in_dir
 
         :param directory: the directory
-        :param match_suffix: match the file suffix, use comma to separate, only string, not support regex
+        :param match_suffix: match the file suffix, use comma to separate, only string, not support regex.
+            The compressed files are matched as well, like: .csv matches .csv.gz
         :param filter_pattern: filter the files, only string, not support regex
         """
 
-        base_object = BaseObject()
-        match_suffix = base_object.str_to_list(match_suffix, lower=True)
-        filter_pattern = base_object.str_to_list(filter_pattern, lower=True)
-
         # Is file
         is_file = os.path.isfile(directory)
         if is_file:
@@ -168,11 +365,27 @@ class CSVObject(object):
                 if check_directory is True:
                     continue
                 # Filter Out
-                match_suffix_status = any(the_filter in y.lower() for the_filter in match_suffix)
-                filter_pattern_status = any(the_filter in y.lower() for the_filter in filter_pattern)
-                if match_suffix_status is True and filter_pattern_status is False:
+                if CSVObject.match_file(y, match_suffix, filter_pattern):
                     yield y
 
+    @staticmethod
+    def match_file(file_name, match_suffix='.csv', filter_pattern='_influx.csv'):
+        """Function: match_file
+
+        :param file_name: the file name
+        :param match_suffix: match the file suffix, use comma to separate, only string, not support regex
+        :param filter_pattern: filter the files, only string, not support regex
+        :return return True if the file matches the suffix, and is not filtered
+        """
+
+        base_object = BaseObject()
+        match_suffix = base_object.str_to_list(match_suffix, lower=True)
+        filter_pattern = base_object.str_to_list(filter_pattern, lower=True)
+        match_suffix_status = any(the_filter in file_name.lower() for the_filter in match_suffix)
+        filter_pattern_status = any(the_filter in file_name.lower() for the_filter in filter_pattern)
+
+        return match_suffix_status is True and filter_pattern_status is False
+
     @staticmethod
     def valid_file_exist(file_name):
         """Function: valid_file_exist
@@ -185,21 +398,68 @@ class CSVObject(object):
             error_message = 'Error: The file does not exist: {0}'.format(file_name)
             sys.exit(error_message)
 
-    def get_file_md5(self, file_name):
+    def get_file_md5(self, file_name, start=0, end=None):
         """Function: get_file_md5
 
         :param file_name: the file name
+        :param start: the start byte (default 0)
+        :param end: the end byte (default None, which means the file end)
         :return return the file md5
         """
 
+        return self.get_file_hash(file_name, start, end, hash_algorithm='md5')
+
+    def get_file_hash(self, file_name, start=0, end=None, hash_algorithm=None):
+        """Function: get_file_hash
+
+        :param file_name: the file name
+        :param start: the start byte (default 0)
+        :param end: the end byte (default None, which means the file end)
+        :param hash_algorithm: md5, blake2b or xxhash (default None, which means the hash_algorithm of the object)
+        :return return the file hash hex digest, of the decompressed bytes if the file is compressed
+        """
+
         self.valid_file_exist(file_name)
 
-        hash_md5 = hashlib.md5()
-        with open(file_name, "rb") as f:
-            for chunk in iter(lambda: f.read(40960), b""):
-                hash_md5.update(chunk)
+        file_hash = self.new_hash(hash_algorithm or self.hash_algorithm)
+        with self.open_binary(file_name) as f:
+            if start:
+                f.seek(start)
+            left = end - start if end is not None else None
+            while left is None or left > 0:
+                size = self.read_buffer_size if left is None else min(self.read_buffer_size, left)
+                chunk = f.read(size)
+                if not chunk:
+                    break
+                file_hash.update(chunk)
+                if left is not None:
+                    left -= len(chunk)
+
+        return file_hash.hexdigest()
 
-        return hash_md5.hexdigest()
+    @staticmethod
+    def get_line_end_offset(file_name, size=None):
+        """Function: get_line_end_offset
+
+        :param file_name: the file name
+        :param size: look for the line end before the size (default None, which means the file size)
+        :return return the byte offset after the last line terminator, 0 if no line terminator
+        """
+
+        size = os.path.getsize(file_name) if size is None else size
+        block_size = 40960
+        with open(file_name, 'rb') as f:
+            end = size
+            while end > 0:
+                start = max(0, end - block_size)
+                f.seek(start)
+                block = f.read(end - start)
+                index = block.rfind(b'\n')
+                if index >= 0:
+                    return start + index + 1
+                end = start
+
+        return 0
 
     def get_file_modify_time(self, file_name, enable_ms=False):
         """Function: get_file_modify_time
@@ -220,6 +480,109 @@ class CSVObject(object):
 
         return modified_pretty
 
+    @staticmethod
+    def is_ascii_compatible(csv_charset):
+        """Function: is_ascii_compatible
+
+        :param csv_charset: the csv charset
+        :return return True if the line terminator, comma and quote are the same bytes as ascii in the charset,
+            and never a part of the other characters, like: ascii, utf-8, latin-1, gbk
+        """
+
+        try:
+            return u'\n,"'.encode(csv_charset) == b'\n,"'
+        except (LookupError, TypeError, UnicodeEncodeError):
+            return False
+
+    @staticmethod
+    def is_ascii_delimiter(delimiter):
+        """Function: is_ascii_delimiter
+
+        :param delimiter: the csv delimiter
+        :return return True if the delimiter is a single ascii byte, other than the line terminator and quote,
+            so the memory mapped scan could find it in the bytes
+        """
+
+        return len(delimiter) == 1 and ord(delimiter) < 128 and delimiter not in '\r\n"'
+
+    def scan_file(self, file_name, hash_algorithm=None, encoding=None):
+        """Function: scan_file
+
+        Hash the file and count the csv records from the memory mapped file, without building the rows.
+        The line terminator in quotes does not end the record, and the blank line is not a record, like csv reader.
+        The file should be in the ascii compatible charset, see is_ascii_compatible, and not compressed
+
+        :param file_name: the file name
+        :param hash_algorithm: md5, blake2b or xxhash (default None, which means the hash_algorithm of the object)
+        :param encoding: validate the file could be decoded by the encoding (default None, which means no validation)
+        :return return (file_hash, records_count, lines_count), the records count includes the header, and equals
+            the lines count if each record is one line. The records count is None if the quote is not at the field
+            beginning or end, like: 5" screen, which should be counted by the csv reader
+        """
+
+        self.valid_file_exist(file_name)
+
+        file_hash = self.new_hash(hash_algorithm or self.hash_algorithm)
+        decoder = codecs.getincrementaldecoder(encoding)('strict') if encoding else None
+        boundaries = (self.delimiter.encode('ascii'), b'\n', b'\r', b'"')
+        records_count = 0
+        lines_count = 0
+        in_quotes = False
+        # The last 2 bytes before the slice: the file beginning is like after a line terminator
+        last = b'\n'
+        with open(file_name, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return file_hash.hexdigest(), 0, 0
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for position in range(0, size, self.map_slice_size):
+                    data = mapped[position:position + self.map_slice_size]
+                    file_hash.update(data)
+                    if decoder is not None:
+                        decoder.decode(data, final=position + len(data) >= size)
+                    lines_count += data.count(b'\n')
+                    if records_count is not None:
+                        records_count = self.__count_records(data, last, in_quotes, records_count, boundaries)
+                        in_quotes = in_quotes != (data.count(b'"') % 2 == 1)
+                    last = (last + data)[-2:]
+            finally:
+                mapped.close()
+
+        # The last line without the line terminator
+        if last[-1:] != b'\n':
+            lines_count += 1
+            if records_count is not None:
+                records_count += 1
+
+        return file_hash.hexdigest(), records_count, lines_count
+
+    def __count_records(self, data, last, in_quotes, records_count, boundaries):
+        """Private Function: count the line terminators out of quotes, except the blank lines, in the slice
+
+        :return return the records count, None if the quote is not at the field beginning or end
+        """
+
+        if not in_quotes and b'"' not in data:
+            data = last + data
+            return records_count + data.count(b'\n', len(last)) - len(self.blank_line_pattern.findall(data, len(last)))
+
+        # Split by the quote: the parts out of quotes are at the odd index if in quotes at the slice beginning
+        parts = data.split(b'"')
+        for index in range(int(in_quotes), len(parts), 2):
+            part = parts[index]
+            before = last if index == 0 else b'"'
+            # Just after the closing quote: the field end, or the escaped quote
+            if before[-1:] == b'"' and part[:1] not in boundaries + (b'',):
+                return None
+            # Just before the opening quote: the field beginning, or the escaped quote
+            if index + 1 < len(parts) and (before + part)[-1:] not in boundaries:
+                return None
+            records_count += part.count(b'\n')
+            records_count -= len(self.blank_line_pattern.findall(before + part, len(before)))
+
+        return records_count
+
     def get_csv_lines_count(self, file_name):
         """Function: get_csv_lines_count.
 
@@ -229,6 +592,12 @@ class CSVObject(object):
         """
 
         has_header = self.get_csv_header(file_name)
+        mapped = self.get_compression(file_name) is None and self.is_ascii_compatible(self.csv_charset)
+        if mapped and self.is_ascii_delimiter(self.delimiter):
+            _, records_count, _ = self.scan_file(file_name)
+            if records_count is not None:
+                return records_count - 1 if has_header else records_count
+
         with self.compatible_open(file_name, encoding=self.csv_charset) as f:
             count = 0 if has_header else 1
             csv_reader = self.compatible_dict_reader(f, encoding=self.csv_charset, delimiter=self.delimiter,
@@ -238,7 +607,285 @@ class CSVObject(object):
 
             return count
 
-    def convert_csv_data_to_int_float(self, file_name=None, csv_reader=None, ignore_filed=None):
+    def scan_csv(self, file_name, ignore_filed=None, detect_charset=None, sample_rows=0, column_types=None):
+        """Function: scan_csv
+
+        Read the csv file only once, and get the charset, hash, header, lines count and column types together.
+        The charset is detected from the first charset_detect_size bytes, and falls back to the whole file
+        detection if the content could not be decoded.
+
+        :param file_name: the file name
+        :param ignore_filed: ignore the certain column when detecting the type, case sensitive (default None)
+        :param detect_charset: detect the csv charset (default None, which means detect if csv_charset is None)
+        :param sample_rows: detect the column types from the first rows only (default 0, which means all rows)
+        :param column_types: the pinned column types dict, the value is int, float or string (default None)
+        :return return CSVScanResult, the csv_charset of the object is updated as well
+        """
+
+        self.valid_file_exist(file_name)
+
+        if detect_charset is None:
+            detect_charset = self.csv_charset is None
+
+        try:
+            csv_scan = self.__scan_csv(file_name, ignore_filed, detect_charset, self.charset_detect_size,
+                                       sample_rows, column_types)
+        except (UnicodeDecodeError, UnicodeEncodeError):
+            if detect_charset is False:
+                raise
+            print('Warning: Failed to decode {0} with the charset {1}, '
+                  'detect the charset with the whole file...'.format(file_name, self.csv_charset))
+            csv_scan = self.__scan_csv(file_name, ignore_filed, detect_charset, None, sample_rows, column_types)
+        self.__pin_column_types(column_types, csv_scan.int_type, csv_scan.float_type)
+
+        return csv_scan
+
+    def __scan_csv(self, file_name, ignore_filed, detect_charset, detect_limit, sample_rows, column_types):
+        """Private Function: scan the csv file in one pass, see scan_csv"""
+
+        stream_hash = self.new_hash(self.hash_algorithm)
+        file_hash = None
+        # The pinned columns are marked as string to skip the detection, and pinned after scan
+        int_type = dict.fromkeys(column_types or [], False)
+        float_type = dict.fromkeys(column_types or [], False)
+        headers = None
+        count = 0
+        # The seconds of the scan stages: charset_detection, header_type_inference and hash_count
+        timings = dict()
+
+        with self.open_binary(file_name) as f:
+            # Detect charset from the file beginning
+            if detect_charset:
+                start = time.time()
+                self.csv_charset = self.__detect_charset(f, limit=detect_limit)
+                f.seek(0)
+                timings['charset_detection'] = time.time() - start
+            start = time.time()
+
+            # All the following reads go through the hash reader
+            buffered = io.BufferedReader(HashReader(f, stream_hash), buffer_size=self.read_buffer_size)
+            if self.python_version == 2:
+                text = buffered
+                sample = buffered.peek(self.read_buffer_size)
+            else:
+                text = io.TextIOWrapper(buffered, encoding=self.csv_charset)
+                sample = buffered.peek(self.read_buffer_size).decode(text.encoding, 'ignore')
+            sample = sample.replace('\r\n', '\n').replace('\r', '\n')[:40960]
+            try:
+                has_header = csv.Sniffer().has_header(sample)
+            except csv.Error:
+                has_header = False
+
+            # Header, lines count and column types.
+            # Once the column types are settled by the sample rows or the pinned types, the rest of the file is
+            # hashed and counted by the memory mapped scan, if the charset is ascii compatible and not compressed
+            csv_reader = self.compatible_dict_reader(text, encoding=self.csv_charset, delimiter=self.delimiter,
+                                                     lineterminator=self.lineterminator)
+            settled_rows = sample_rows
+            mapped = self.get_compression(file_name) is None and self.is_ascii_compatible(self.csv_charset)
+            mapped = mapped and self.is_ascii_delimiter(self.delimiter)
+            records_count = None
+            for row in csv_reader:
+                if headers is None:
+                    headers = list(row.keys())
+                    if not settled_rows and column_types and all(header in column_types for header in headers):
+                        settled_rows = 1
+                if not settled_rows or count < settled_rows:
+                    self.__update_column_types(row, int_type, float_type, ignore_filed)
+                count += 1
+                if mapped and settled_rows and count >= settled_rows:
+                    timings['header_type_inference'] = time.time() - start
+                    start = time.time()
+                    file_hash, records_count, lines_count = self.scan_file(file_name, encoding=self.csv_charset)
+                    break
+            if 'header_type_inference' not in timings:
+                timings['header_type_inference'] = time.time() - start
+                start = time.time()
+
+            if records_count is not None:
+                count = records_count - 1
+                single_line_records = records_count == lines_count
+            else:
+                # Count the rest rows: not mapped, or the quotes could not be counted by the mapped scan
+                for _ in csv_reader:
+                    count += 1
+
+                # Each record is one line: no line break in quotes, no blank line
+                single_line_records = getattr(csv_reader, 'line_num', None) == count + 1
+
+            # Make sure all the bytes are hashed
+            if file_hash is None:
+                for _ in iter(lambda: buffered.read(self.read_buffer_size), b''):
+                    pass
+                file_hash = stream_hash.hexdigest()
+            timings['hash_count'] = time.time() - start
+
+        headers = headers if headers is not None else list()
+        is_header = not any(field.isdigit() for field in headers)
+        headers = headers if has_header or is_header else []
+        count = count if headers else count + 1
+
+        return CSVScanResult(csv_charset=self.csv_charset,
+                             file_hash=file_hash,
+                             headers=headers,
+                             lines_count=count,
+                             int_type=int_type,
+                             float_type=float_type,
+                             single_line_records=single_line_records,
+                             timings=timings)
+
+    def scan_csv_range(self, file_name, start, end, headers, int_type, float_type, ignore_filed=None,
+                       column_types=None):
+        """Function: scan_csv_range
+
+        Scan the rows in the byte range, such as the rows appended since the last export
+
+        :param file_name: the file name
+        :param start: the range start byte, at the row beginning
+        :param end: the range end byte, at the row end
+        :param headers: the csv headers
+        :param int_type: the known column int type dict, such as the types written by the last export
+        :param float_type: the known column float type dict, such as the types written by the last export.
+            The known column types are kept, so the field types do not conflict with the points written,
+            the values which do not match are processed by the mismatch policy when converting.
+            Only the new columns are detected from the rows in the range
+        :param ignore_filed: ignore the certain column when detecting the type, case sensitive (default None)
+        :param column_types: the pinned column types dict, the value is int, float or string (default None)
+        :return return CSVScanResult of the range, the file_hash is the hash of the range bytes
+        """
+
+        int_type = dict(int_type)
+        float_type = dict(float_type)
+        new_columns = [header for header in headers if header not in int_type or header not in float_type]
+        count = 0
+        csv_reader = self.read_csv_chunk(file_name, start, end, headers)
+        for row in csv_reader:
+            if new_columns:
+                row = dict((column, row.get(column) or '') for column in new_columns)
+                self.__update_column_types(row, int_type, float_type, ignore_filed)
+            count += 1
+        self.__pin_column_types(column_types, int_type, float_type)
+
+        return CSVScanResult(csv_charset=self.csv_charset,
+                             file_hash=self.get_file_hash(file_name, start, end),
+                             headers=headers,
+                             lines_count=count,
+                             int_type=int_type,
+                             float_type=float_type,
+                             single_line_records=csv_reader.line_num == count)
+
+    def is_chunkable(self, csv_scan):
+        """Function: is_chunkable
+
+        :param csv_scan: the CSVScanResult
+        :return return True if the csv rows could be split by the line terminator to byte ranges:
+            the csv has header, each record is one line, and the charset is ascii compatible
+        """
+
+        if self.python_version == 2 or not csv_scan.headers or not csv_scan.single_line_records:
+            return False
+        return self.is_ascii_compatible(csv_scan.csv_charset)
+
+    @staticmethod
+    def get_header_end_offset(file_name):
+        """Function: get_header_end_offset
+
+        :param file_name: the file name
+        :return return the byte offset after the header line
+        """
+
+        with open(file_name, 'rb') as f:
+            f.readline()
+            return f.tell()
+
+    @staticmethod
+    def get_csv_chunks(file_name, chunk_size):
+        """Function: get_csv_chunks
+
+        :param file_name: the file name
+        :param chunk_size: the chunk size in bytes
+        :return return the byte ranges [(start, end), ...] of the rows after the header,
+            each range ends with the line terminator or the file end
+        """
+
+        file_size = os.path.getsize(file_name)
+        chunks = list()
+        with open(file_name, 'rb') as f:
+            f.readline()
+            start = f.tell()
+            while start < file_size:
+                f.seek(start + chunk_size)
+                f.readline()
+                end = min(f.tell(), file_size)
+                chunks.append((start, end))
+                start = end
+
+        return chunks
+
+    def read_csv_chunk(self, file_name, start, end, headers):
+        """Function: read_csv_chunk
+
+        :param file_name: the file name
+        :param start: the chunk start byte
+        :param end: the chunk end byte
+        :param headers: the csv headers
+        :return return the csv dict reader of the chunk rows
+        """
+
+        with open(file_name, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        text = io.StringIO(data.decode(self.csv_charset), newline=None)
+
+        return csv.DictReader(text, fieldnames=headers, delimiter=self.delimiter, lineterminator=self.lineterminator)
+
+    @staticmethod
+    def __update_column_types(row, int_type, float_type, ignore_filed=None):
+        """Private Function: update the running column types with one row
+
+        :param row: the csv row dict
+        :param int_type: the column int type dict, updated in place
+        :param float_type: the column float type dict, updated in place
+        :param ignore_filed: ignore the certain column, case sensitive
+        """
+
+        for key, value in row.items():
+            # Not float means not int either, nothing could change any more
+            if float_type.get(key) is False:
+                continue
+            float_status = len(value) > 0 and key != ignore_filed
+            int_status = float_status and int_type.get(key, True)
+            if float_status:
+                try:
+                    int_status = float(value).is_integer() and int_status
+                except ValueError:
+                    float_status = False
+                    int_status = False
+            int_type[key] = int_status
+            float_type[key] = float_status
+
+    @staticmethod
+    def __pin_column_types(column_types, int_type, float_type):
+        """Private Function: pin the column types
+
+        :param column_types: the column types dict, the value is int, float or string
+        :param int_type: the column int type dict, updated in place
+        :param float_type: the column float type dict, updated in place
+        """
+
+        for key, column_type in (column_types or {}).items():
+            int_type[key] = column_type == 'int'
+            float_type[key] = column_type in ('int', 'float')
+
+    def convert_csv_data_to_int_float(self,
+                                      file_name=None,
+                                      csv_reader=None,
+                                      ignore_filed=None,
+                                      int_type=None,
+                                      float_type=None,
+                                      sample_rows=0,
+                                      column_types=None,
+                                      mismatch_policy='reject'):
         """Function: convert_csv_data_to_int_float
 
         :param file_name: the file name (default None)
@@ -253,11 +900,23 @@ class CSVObject(object):
                     ...
                 ]
         :param ignore_filed: ignore the certain column, case sensitive
+        :param int_type: the known column int type dict, such as from scan_csv (default None)
+        :param float_type: the known column float type dict, such as from scan_csv (default None)
+            If both int_type and float_type provided, the type detection is skipped, and data is yielded directly
+            Otherwise, the type is detected with a running status per column. The rows from a csv.DictReader
+            or generator are spilled to a temporary file for the second pass, instead of being kept in memory
+        :param sample_rows: detect the type from the first rows only, then yield all the rows in one pass
+            (default 0, which means detect the type from all the rows)
+        :param column_types: the pinned column types dict, the value is int, float or string (default None)
+        :param mismatch_policy: how to process the value which does not match the column type (default reject)
+            coerce: convert the value to the column type, use -999 or -999.0 if it is not a number
+            reject: skip the row
+            stringify: keep the value as string
+            The mismatch only happens when the type is known, sampled or pinned, a warning is printed for each
         """
 
         # init
-        int_type = defaultdict(list)
-        float_type = defaultdict(list)
+        detect_type = int_type is None or float_type is None
         keys = list()
         csv_reader = list() if csv_reader is None else csv_reader
         csv_reader_bk = csv_reader
@@ -270,89 +929,76 @@ class CSVObject(object):
             error_message = 'Error: The csv_reader type is not expected: {0}, ' \
                             'should list type or csv.DictReader'.format(csv_reader_type)
             sys.exit(error_message)
-        if is_generator_type:
-            csv_reader, csv_reader_bk = tee(csv_reader)
+        if mismatch_policy not in self.mismatch_policies:
+            error_message = 'Error: The mismatch_policy should be one of {0}, ' \
+                            'current is: {1}'.format(self.mismatch_policies, mismatch_policy)
+            sys.exit(error_message)
 
         # Get csv_reader from csv file
-        f = None
         if file_name:
             has_header = self.get_csv_header(file_name)
-            with self.compatible_open(file_name, encoding=self.csv_charset) as f:
-                csv_reader = self.compatible_dict_reader(f, encoding=self.csv_charset, delimiter=self.delimiter,
-                                                         lineterminator=self.lineterminator)
-                csv_reader, csv_reader_bk = tee(csv_reader)
+            csv_reader = self.__read_csv_rows(file_name)
+            csv_reader_bk = csv_reader
+
+        # Process: detect the type with the running status of each column
+        if detect_type:
+            # The pinned columns are marked as string to skip the detection, and pinned after detection
+            int_type = dict.fromkeys(column_types or [], False)
+            float_type = dict.fromkeys(column_types or [], False)
+            spill_file = None
+            if sample_rows:
+                # Only the sample rows are kept, then all the rows are yielded in one pass
+                csv_reader = iter(csv_reader)
+                sample = list(islice(csv_reader, sample_rows))
+                csv_reader_bk = chain(sample, csv_reader)
+                csv_reader = sample
+            elif file_name:
+                # The file will be read again when yielding data
+                csv_reader_bk = self.__read_csv_rows(file_name)
+            elif csv_reader_type is not list:
+                # The reader could be iterated only once, spill the rows to disk instead of memory
+                spill_file = tempfile.TemporaryFile()
+                csv_reader_bk = self.__replay_csv_rows(spill_file)
+            for row in csv_reader:
+                keys = row.keys()
+                self.__update_column_types(row, int_type, float_type, ignore_filed)
+                if spill_file is not None:
+                    pickle.dump(row, spill_file, pickle.HIGHEST_PROTOCOL)
 
-        # Process
-        for row in csv_reader:
-            keys = row.keys()
-            for key in keys:
-                value = row[key]
-                len_value = len(value)
-                # Continue If Value Empty
-                if len_value == 0:
-                    int_type[key].append(False)
-                    float_type[key].append(False)
-                    continue
-                # Continue if ignore_filed is provided
-                if ignore_filed is not None and ignore_filed == key:
-                    int_type[key].append(False)
-                    float_type[key].append(False)
-                    continue
-                # Valid Int Type
-                try:
-                    if float(value).is_integer():
-                        int_type[key].append(True)
-                    else:
-                        int_type[key].append(False)
-                except ValueError:
-                    int_type[key].append(False)
-                # Valid Float Type
-                try:
-                    float(value)
-                    float_type[key].append(True)
-                except ValueError:
-                    float_type[key].append(False)
+            # Valid the key if no header
+            if keys and not has_header:
+                self.__update_column_types(dict((key, key) for key in keys if len(key) > 0), int_type, float_type)
 
-        # Valid the key if no header
-        if keys and not has_header:
-            for key in keys:
-                len_key = len(key)
-                # Continue If Key Empty
-                if len_key == 0:
-                    continue
-                # Valid Int Type
-                try:
-                    if float(key).is_integer():
-                        int_type[key].append(True)
-                    else:
-                        int_type[key].append(False)
-                except ValueError:
-                    int_type[key].append(False)
-                # Valid Float Type
-                try:
-                    float(key)
-                    float_type[key].append(True)
-                except ValueError:
-                    float_type[key].append(False)
-
-        # Finalize Type
-        int_type = {k: all(int_type[k]) for k in int_type}
-        float_type = {k: all(float_type[k]) for k in float_type}
+        # Pin the column types
+        if column_types:
+            int_type = dict(int_type)
+            float_type = dict(float_type)
+            self.__pin_column_types(column_types, int_type, float_type)
 
         # Yield Data
         i = 1
         for row in csv_reader_bk:
             keys = row.keys()
+            rejected = False
             for key in keys:
                 value = row[key]
-                int_status = int_type[key]
                 len_value = len(value)
                 if len_value == 0:
                     continue
-                if int_status is True:
-                    row[key] = int(float(value)) if int_type[key] is True else value
-                else:
-                    row[key] = float(value) if float_type[key] is True else value
+                try:
+                    if int_type.get(key) is True:
+                        number = float(value)
+                        if not number.is_integer():
+                            raise ValueError(value)
+                        row[key] = int(number)
+                    elif float_type.get(key) is True:
+                        row[key] = float(value)
+                except ValueError:
+                    rejected = self.__process_type_mismatch(row, key, int_type, mismatch_policy)
+                    if rejected:
+                        break
+            if rejected:
+                continue
             yield row, int_type, float_type
             if not has_header and i == 1:
                 for key in keys:
@@ -367,15 +1013,68 @@ class CSVObject(object):
                 yield row, int_type, float_type
             i += 1
 
-        # Close file
-        if file_name:
-            f.close()
+    @staticmethod
+    def __process_type_mismatch(row, key, int_type, mismatch_policy):
+        """Private Function: process the value which does not match the column type
+
+        :param row: the csv row dict, updated in place
+        :param key: the column
+        :param int_type: the column int type dict
+        :param mismatch_policy: coerce, reject or stringify
+        :return return True if the row is rejected
+        """
+
+        value = row[key]
+        column_type = 'int' if int_type.get(key) is True else 'float'
+        if mismatch_policy == 'stringify':
+            print('Warning: The value "{0}" of column {1} is not {2} type, keep it as string...'.format(value,
+                                                                                                     key,
+                                                                                                     column_type))
+            return False
+        if mismatch_policy == 'coerce':
+            try:
+                row[key] = int(float(value)) if column_type == 'int' else float(value)
+            except (ValueError, OverflowError):
+                row[key] = -999 if column_type == 'int' else -999.0
+            print('Warning: The value "{0}" of column {1} is not {2} type, coerce it to {3}...'.format(value,
+                                                                                                    key,
+                                                                                                    column_type,
+                                                                                                    row[key]))
+            return False
+        print('Warning: The value "{0}" of column {1} is not {2} type, reject the row...'.format(value,
+                                                                                              key,
+                                                                                              column_type))
+        return True
+
+    def __read_csv_rows(self, file_name):
+        """Private Function: yield the csv rows, the file is closed when all rows are read"""
+
+        with self.compatible_open(file_name, encoding=self.csv_charset) as f:
+            csv_reader = self.compatible_dict_reader(f, encoding=self.csv_charset, delimiter=self.delimiter,
+                                                     lineterminator=self.lineterminator)
+            for row in csv_reader:
+                yield row
+
+    @staticmethod
+    def __replay_csv_rows(spill_file):
+        """Private Function: yield the csv rows spilled to the temporary file, the file is closed at the end"""
+
+        try:
+            spill_file.seek(0)
+            while True:
+                try:
+                    yield pickle.load(spill_file)
+                except EOFError:
+                    break
+        finally:
+            spill_file.close()
 
     def add_columns_to_csv(self,
                            file_name,
                            target,
                            data,
-                           save_csv_file=True):
+                           save_csv_file=True,
+                           has_header=None):
         """Function: add_columns_to_csv
 
         :param file_name: the file name
@@ -385,10 +1084,12 @@ class CSVObject(object):
                           {"new_header_2": ["new_value_1", "new_value_2", "new_value_3"]}
                          ]
         :param save_csv_file: save csv file to local (default True)
+        :param has_header: the csv header, such as from scan_csv (default None, which will detect the header)
         :return return the new csv data by dict
         """
 
-        has_header = self.get_csv_header(file_name)
+        if has_header is None:
+            has_header = self.get_csv_header(file_name)
 
         # Process data
         data_type = type(data)
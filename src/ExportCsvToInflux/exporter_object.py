@@ -1,28 +1,39 @@
-from pytz.exceptions import UnknownTimeZoneError
+from .line_protocol_object import LineProtocolObject
+from .timestamp_object import TimestampObject
 from .config_object import Configuration
 from .influx_object import InfluxObject
-from decimal import InvalidOperation
-from collections import defaultdict
+from .manifest_object import ManifestObject
+from .metrics_object import MetricsObject
+from .progress_object import ProgressObject
+from .columnar_object import ColumnarObject
+from .arrow_object import ArrowObject
+from .watcher_object import WatcherObject
+from .writer_object import WriterObject
+from .sink_object import SinkObject
+from .match_object import MatchObject
 from .csv_object import CSVObject
-from decimal import Decimal
-from pytz import timezone
-import datetime
+import multiprocessing.util
+import multiprocessing
+import collections
+import functools
+import signal
 import uuid
+import time
 import sys
 import os
-import re
 
 
 class ExporterObject(object):
     """ExporterObject"""
 
     def __init__(self):
-        self.match_count = defaultdict(int)
-        self.filter_count = defaultdict(int)
         self._write_response = None
+        self._writer = None
+        self._metrics = None
 
     def __error_cb(self, details, data, exception):
         """Private Function: error callback for write api"""
+        print('Error: Failed to write to {0}: {1}'.format(details, exception))
         self._write_response = False
 
     @staticmethod
@@ -32,12 +43,14 @@ class ExporterObject(object):
                               float_type,
                               conf,
                               encoding):
-        """Private function: __process_tags_fields"""
+        """Private function: __process_tags_fields, return the values in the order of the columns"""
 
-        results = dict()
+        results = list()
         for column in columns:
             v = 0
-            if column in row:
+            if conf.unique and column == 'uniq':
+                v = 'uniq-{0}'.format(str(uuid.uuid4())[:8])
+            elif column in row:
                 v = row[column]
                 if conf.limit_string_length_columns and column in conf.limit_string_length_columns:
                     v = str(v)[:conf.limit_length + 1]
@@ -76,73 +89,10 @@ class ExporterObject(object):
                     if conf.force_float_columns and column in conf.force_float_columns:
                         v = -999.0
 
-            results[column] = v
-
-        if conf.unique:
-            results['uniq'] = 'uniq-{0}'.format(str(uuid.uuid4())[:8])
+            results.append(v)
 
         return results
 
-    def __check_match_and_filter(self,
-                                 row,
-                                 check_columns,
-                                 check_by_string,
-                                 check_by_regex,
-                                 check_type,
-                                 csv_file_length=0):
-        """Private Function: check_match_and_filter"""
-
-        check_status = dict()
-        for k, v in row.items():
-            key_status = k in check_columns
-
-            # Init key status
-            if key_status and k not in check_status.keys():
-                check_status[k] = False
-
-            # Init match count
-            if key_status and k not in self.match_count.keys() and check_type == 'match':
-                self.match_count[k] = 0
-
-            # Init filter count
-            if key_status and k not in self.filter_count.keys() and check_type == 'filter':
-                self.filter_count[k] = csv_file_length
-
-            # Check string, regex
-            try:
-                v = str(v)
-            except (UnicodeDecodeError, UnicodeEncodeError):
-                v = v.encode('utf-8')
-            check_by_string_status = v in check_by_string
-            check_by_regex_status = any(re.search(the_match, v, re.IGNORECASE) for the_match in check_by_regex)
-            if key_status and (check_by_string_status or check_by_regex_status):
-                check_status[k] = True
-                if check_type == 'match':
-                    self.match_count[k] += 1
-                if check_type == 'filter':
-                    self.filter_count[k] -= 1
-
-        # Return status
-        value_status = check_status.values()
-        if value_status:
-            # Default match: check all match
-            status = all(value_status)
-            if check_type == 'filter':
-                # If filter type: check any match
-                status = any(value_status)
-        else:
-            status = False
-
-        # print('')
-        # print('-' * 20)
-        # print(check_type)
-        # print(row)
-        # print(check_status)
-        # print(value_status)
-        # print(status)
-
-        return status
-
     @staticmethod
     def __validate_columns(csv_headers, check_columns):
         """Private Function: validate_columns """
@@ -158,105 +108,102 @@ class ExporterObject(object):
 
         return check_columns
 
-    @staticmethod
-    def __unix_time_millis(dt):
-        """Private Function: unix_time_millis"""
-
-        epoch_naive = datetime.datetime.utcfromtimestamp(0)
-        epoch = timezone('UTC').localize(epoch_naive)
-        return int((dt - epoch).total_seconds() * 1000)
+    def __check_write_response(self, error_message='Info: Problem inserting points, exiting...'):
+        """Private function: __check_write_response, exit if failed to write"""
 
-    def __influx2_write(self, client, data_points, conf):
-        """Private function: __influx2_write"""
+        if self._write_response is not False:
+            return
 
-        from influxdb_client import WriteOptions
-
-        with client.write_api(write_options=WriteOptions(batch_size=conf.batch_size),
-                              error_callback=self.__error_cb) as write_client:
-            write_client.write(conf.bucket_name, conf.org_name, data_points)
-
-    def __process_timestamp(self, row, conf):
-        """Private function: __process_timestamp"""
-
-        try:
-            # raise if not posix-time-like
-            timestamp_decimal = Decimal(row[conf.time_column])
-            timestamp_str = str(timestamp_decimal)
-            timestamp_remove_decimal = int(
-                str(timestamp_str).replace('.', '')
-            )
-            # add zeros to convert to nanoseconds: influxdb time is 19 digital length
-            timestamp_influx = '{:<019d}'.format(timestamp_remove_decimal)
-            timestamp_influx = timestamp_influx[:19]  # deal with length > 19 timestamp
-            timestamp = int(timestamp_influx)
-        except (ValueError, InvalidOperation):
-            try:
-                datetime_naive = datetime.datetime.strptime(row[conf.time_column], conf.time_format)
-                datetime_local = timezone(conf.time_zone).localize(datetime_naive)
-                timestamp = self.__unix_time_millis(datetime_local) * 1000000
-            except (TypeError, ValueError):
-                error_message = 'Error: Unexpected time with format: {0}, {1}'.format(row[conf.time_column],
-                                                                                      conf.time_format)
-                sys.exit(error_message)
-
-        return timestamp
-
-    def __write_points(self, count, csv_file_item, data_points_len, influx_version, client, data_points, conf,
-                       influx_object):
-        """Private function: __write_points"""
-
-        print('Info: Read {0} lines from {1}'.format(count, csv_file_item))
-        print('Info: Inserting {0} data_points...'.format(data_points_len))
-        try:
-            if influx_version.startswith('0') or influx_version.startswith('1'):
-                self._write_response = client.write_points(data_points)
-            else:
-                self.__influx2_write(client, data_points, conf)
-        except influx_object.influxdb_client_error as e:
+        error = self._writer.error
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+        if status_code in (400, 422):
             error_message = 'Error: System exited. Encounter data type conflict issue in influx. \n' \
                             '       Please double check the csv data. \n' \
                             '       If would like to force data type to target data type, use: \n' \
                             '       --force_string_columns \n' \
                             '       --force_int_columns \n' \
                             '       --force_float_columns \n' \
-                            '       Error Details: {0}'.format(e)
-            sys.exit(error_message)
+                            '       Error Details: {0}'.format(error)
+        sys.exit(error_message)
 
-        if self._write_response is False:
-            error_message = 'Info: Problem inserting points, exiting...'
-            sys.exit(error_message)
+    def __write_points(self, count, data_points_len, data_points, progress, metrics=None, spooled=(0, 0)):
+        """Private function: __write_points, the progress is reported at most once per interval. With gzip, the
+        compression ratio and seconds of the batch are reported with verbosity 2, and observed by the metrics.
+        The spooled is the (points, bytes) spooled by the writer before the csv file"""
 
-        print('Info: Wrote {0} points'.format(data_points_len))
+        start = time.time()
+        self._write_response = self._writer.write(data_points, data_points_len)
+        if metrics is not None:
+            metrics.observe('write', time.time() - start, items=data_points_len, data_bytes=len(data_points))
+        self.__check_write_response()
+        data_bytes = len(data_points)
+        compression_ratio = None
+        batch_compression = None
+        if self._writer.compress:
+            compression = self._writer.compression
+            data_bytes = compression['batch_compressed_bytes']
+            batch_ratio, compression_ratio = self._writer.compression_ratio
+            batch_compression = (batch_ratio, compression['batch_seconds'])
+            if metrics is not None:
+                metrics.observe('compress', compression['batch_seconds'], items=data_points_len,
+                                data_bytes=compression['batch_bytes'])
+        progress.update(count, data_bytes, compression_ratio, batch_compression, self.__get_spooled(spooled))
 
-    def __write_count_measurement(self, conf, csv_file_length, influx_version, client, timestamp):
+    def __get_spooled(self, spooled=(0, 0)):
+        """Private function: __get_spooled, return the (points, bytes) spooled by the writer since the spooled"""
+
+        return self._writer.spooled_points - spooled[0], self._writer.spooled_bytes - spooled[1]
+
+    def __write_count_measurement(self, conf, result):
         """Private function: __write_count_measurement"""
 
         if conf.enable_count_measurement:
             fields = dict()
-            fields['total'] = csv_file_length
-            for k, v in self.match_count.items():
+            fields['total'] = result['csv_file_length']
+            for k, v in result['match_count'].items():
                 k = 'match_{0}'.format(k)
                 fields[k] = v
-            for k, v in self.filter_count.items():
+            for k, v in result['filter_count'].items():
                 k = 'filter_{0}'.format(k)
                 fields[k] = v
-            count_point = [{'measurement': conf.count_measurement, 'time': timestamp, 'fields': fields, 'tags': {}}]
-            if influx_version.startswith('0') or influx_version.startswith('1'):
-                self._write_response = client.write_points(count_point)
-            else:
-                self.__influx2_write(client, count_point, conf)
+            line_protocol_object = LineProtocolObject(conf.count_measurement, field_columns=fields.keys())
+            values = [fields[k] for k in line_protocol_object.field_columns]
+            line_protocol_object.add([], values, result['timestamp'])
+            count_point = line_protocol_object.flush()
+            self._write_response = self._writer.write(count_point)
+            self.__check_write_response('Error: Problem inserting points, exiting...')
+
+            print('Info: Wrote count measurement {0} points'.format(count_point.decode('utf-8').strip()))
+
+    @staticmethod
+    def __no_change_check(csv_file_item, conf, manifest_record, csv_file_size):
+        """Private function: __no_change_check, check the size and modified time in the manifest record,
+        without reading the csv file"""
 
-            if self._write_response is False:
-                error_message = 'Error: Problem inserting points, exiting...'
-                sys.exit(error_message)
+        if manifest_record is None or not (conf.incremental or conf.force_insert_even_csv_no_update is False):
+            return False
+        no_change_status = manifest_record.get('size') == csv_file_size
+        no_change_status = no_change_status and manifest_record.get('mtime') == os.path.getmtime(csv_file_item)
+        if no_change_status:
+            print('Warning: No new data found, writer stop/jump for {0}...'.format(csv_file_item))
 
-            self.match_count = defaultdict(int)
-            self.filter_count = defaultdict(int)
-            print('Info: Wrote count measurement {0} points'.format(count_point))
+        return no_change_status
 
     @staticmethod
-    def __no_new_data_check(csv_file_item, csv_object, conf, csv_file_md5):
-        """Private function: __no_new_data_check"""
+    def __no_new_data_check(csv_file_item, csv_object, conf, csv_file_hash, manifest_record):
+        """Private function: __no_new_data_check, by the hash in the manifest record, or by the md5 in the legacy
+        <name>_influx.csv copy if the csv file is not in the manifest yet"""
+
+        if conf.force_insert_even_csv_no_update is not False:
+            return False
+        if manifest_record is not None:
+            no_new_data_status = manifest_record.get('hash_algorithm') == csv_object.hash_algorithm
+            no_new_data_status = no_new_data_status and manifest_record.get('hash') == csv_file_hash
+            if no_new_data_status:
+                print('Warning: No new data found, writer stop/jump for {0}...'.format(csv_file_item))
+            return no_new_data_status
+        if csv_object.hash_algorithm != 'md5':
+            return False
 
         new_csv_file = '{0}_influx.csv'.format(csv_file_item.replace('.csv', ''))
         new_csv_file_exists = os.path.exists(new_csv_file)
@@ -272,7 +219,7 @@ class ExporterObject(object):
                         new_csv_file_md5 = row['md5']
                     except KeyError:
                         break
-                    if new_csv_file_md5 == csv_file_md5 and conf.force_insert_even_csv_no_update is False:
+                    if new_csv_file_md5 == csv_file_hash:
                         warning_message = 'Warning: No new data found, ' \
                                           'writer stop/jump for {0}...'.format(csv_file_item)
                         print(warning_message)
@@ -280,7 +227,721 @@ class ExporterObject(object):
                         # sys.exit(warning_message)
                     break
 
-        return no_new_data_status, new_csv_file
+        return no_new_data_status
+
+    @staticmethod
+    def __get_incremental_range(csv_file_item, csv_object, manifest_record, csv_file_size):
+        """Private function: __get_incremental_range, return the byte range (start, end) of the rows appended
+        since the last export, None if the csv file should be fully exported"""
+
+        if not manifest_record or not manifest_record.get('offset'):
+            return None
+        offset = manifest_record['offset']
+        if csv_file_size < offset:
+            print('Warning: The csv file is truncated since the last export, '
+                  'export the whole file for {0}...'.format(csv_file_item))
+            return None
+        fingerprint = ManifestObject.get_fingerprint(csv_object, csv_file_item, offset)
+        if list(fingerprint) != [manifest_record.get('prefix_md5'), manifest_record.get('tail_md5')]:
+            print('Warning: The csv file is rewritten since the last export, '
+                  'export the whole file for {0}...'.format(csv_file_item))
+            return None
+
+        # The partial last row is left to the next export
+        return offset, max(offset, csv_object.get_line_end_offset(csv_file_item, csv_file_size))
+
+    def connect_influx(self, conf):
+        """Function: connect_influx
+
+        :param conf: the configuration
+        :return return the influx object and the influx client, the writer is created as well
+        """
+
+        influx_object = InfluxObject(db_server_name=conf.db_server_name,
+                                     db_user=conf.db_user,
+                                     db_password=conf.db_password,
+                                     http_schema=conf.http_schema,
+                                     token=conf.token)
+        client = influx_object.connect_influx_db(db_name=conf.db_name, org_name=conf.org_name)
+        self._writer = WriterObject(influx_object.influxdb_url,
+                                    influxdb_version=influx_object.influxdb_version,
+                                    db_name=conf.db_name,
+                                    db_user=conf.db_user,
+                                    db_password=conf.db_password,
+                                    token=conf.token,
+                                    org_name=conf.org_name,
+                                    bucket_name=conf.bucket_name,
+                                    max_in_flight=conf.max_in_flight,
+                                    compress=conf.gzip,
+                                    retries=conf.retries,
+                                    retry_interval=conf.retry_interval,
+                                    spool_dir=conf.spool_dir,
+                                    verify_ssl=conf.verify_ssl,
+                                    error_callback=self.__error_cb)
+
+        return influx_object, client
+
+    def __export_csv_files_parallel(self, csv_files, conf, pool, manifest=None):
+        """Private function: __export_csv_files_parallel, export the csv files by the process pool
+
+        Each worker has its own influx client and writer, the results are yielded in the file order.
+        The csv file larger than the chunk size is exported by the parent, with the chunks serialized in the pool.
+        With the output, all the csv files are exported by the parent, which has the only output sink
+        """
+
+        pending = collections.deque()
+        for csv_file_item in csv_files:
+            manifest_record = manifest.get(csv_file_item) if manifest is not None else None
+            chunkable = CSVObject.get_compression(csv_file_item) is None
+            chunkable = chunkable and ArrowObject.get_format(csv_file_item) is None
+            if conf.output is not None or (chunkable and 0 < conf.chunk_size < os.path.getsize(csv_file_item)):
+                while pending:
+                    yield pending.popleft().get()
+                yield self.export_csv_file(csv_file_item, conf, pool=pool, manifest_record=manifest_record)
+            else:
+                pending.append(pool.apply_async(_export_csv_file_worker, (csv_file_item, manifest_record)))
+            while pending and pending[0].ready():
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def __export_csv_files(self, csv_files, conf, pool=None, manifest=None):
+        """Private function: __export_csv_files, export the csv files, one by one or by the process pool"""
+
+        if pool is not None:
+            results = self.__export_csv_files_parallel(csv_files, conf, pool, manifest)
+        else:
+            results = (self.export_csv_file(csv_file_item,
+                                            conf,
+                                            manifest_record=manifest.get(csv_file_item) if manifest else None)
+                       for csv_file_item in csv_files)
+        for result in results:
+            if result is None or result.get('skipped'):
+                if self._metrics is not None:
+                    self._metrics.counters['skipped_files'] += 1
+            if result is None:
+                continue
+            if result['error']:
+                sys.exit(result['error'])
+            if result.get('skipped'):
+                manifest.update(result['csv_file'], result['manifest'])
+                continue
+            if self._metrics is not None and result.get('metrics'):
+                self._metrics.add_file(result['csv_file'], result['metrics'])
+            if result.get('writer_counters'):
+                self._writer.add_counters(result['writer_counters'])
+
+            # Write count measurement
+            self.__write_count_measurement(conf, result)
+
+            # Save the exported offset
+            if manifest is not None and result.get('manifest'):
+                manifest.update(result['csv_file'], result['manifest'])
+
+            print('Info: Done')
+            print('')
+
+        if manifest is not None:
+            manifest.save()
+        if self._metrics is not None:
+            self._metrics.save(conf.metrics_file, conf.metrics_format)
+
+    def __serialize_rows(self, rows, conf, match_object, filter_object, timestamp_object, line_protocol_object,
+                         metrics=None, progress=None):
+        """Private function: __serialize_rows, yield (count, timestamp, data_points_len, data_points) per batch.
+        With the metrics, the seconds of the match_filter and timestamp stages are observed per batch.
+        With the progress, the rows read are counted per batch"""
+
+        count = 0
+        timestamp = 0
+        timings = [0.0, 0.0] if metrics is not None else None
+        rows_len = 0
+        for row, int_type, float_type in rows:
+            rows_len += 1
+            serialized = self.__serialize_row(row, int_type, float_type, conf, match_object, filter_object,
+                                              timestamp_object, line_protocol_object, timings)
+            if serialized is None:
+                continue
+            line, timestamp = serialized
+            line_protocol_object.add_lines(line.encode('utf-8'))
+            count += 1
+
+            # Batch points
+            data_points_len = line_protocol_object.count
+            if data_points_len % conf.batch_size == 0:
+                if metrics is not None:
+                    self.__observe_row_timings(metrics, timings, rows_len, data_points_len)
+                if progress is not None:
+                    progress.rows += rows_len
+                rows_len = 0
+                yield count, timestamp, data_points_len, line_protocol_object.flush()
+
+        # Rest points
+        data_points_len = line_protocol_object.count
+        if metrics is not None and rows_len:
+            self.__observe_row_timings(metrics, timings, rows_len, data_points_len)
+        if progress is not None:
+            progress.rows += rows_len
+        if data_points_len > 0:
+            yield count, timestamp, data_points_len, line_protocol_object.flush()
+
+    @staticmethod
+    def __observe_row_timings(metrics, timings, rows_len, data_points_len):
+        """Private function: __observe_row_timings, observe the match_filter seconds of the rows and the timestamp
+        seconds of the points, then reset the timings"""
+
+        metrics.observe('match_filter', timings[0], items=rows_len)
+        metrics.observe('timestamp', timings[1], items=data_points_len)
+        timings[0] = timings[1] = 0.0
+
+    @staticmethod
+    def __observe_chunk_timings(chunks, columnar_object, metrics):
+        """Private function: __observe_chunk_timings, observe the match_filter and timestamp seconds of the
+        ColumnarObject per chunk, and yield the chunks"""
+
+        rows = 0
+        for lines, timestamps in chunks:
+            ExporterObject.__observe_row_timings(metrics, columnar_object.timings, columnar_object.rows - rows,
+                                                 len(lines))
+            rows = columnar_object.rows
+            yield lines, timestamps
+
+    @staticmethod
+    def __serialize_lines(chunks, conf, line_protocol_object):
+        """Private function: __serialize_lines, batch the lines serialized chunk by chunk, like: ColumnarObject,
+        yield (count, timestamp, data_points_len, data_points) per batch, the same as __serialize_rows"""
+
+        count = 0
+        timestamp = 0
+        for lines, timestamps in chunks:
+            start = 0
+            while start < len(lines):
+                end = min(len(lines), start + conf.batch_size - line_protocol_object.count)
+                line_protocol_object.add_lines(''.join(lines[start:end]).encode('utf-8'), end - start)
+                count += end - start
+                timestamp = timestamps[end - 1]
+                start = end
+
+                # Batch points
+                data_points_len = line_protocol_object.count
+                if data_points_len % conf.batch_size == 0:
+                    yield count, timestamp, data_points_len, line_protocol_object.flush()
+
+        # Rest points
+        data_points_len = line_protocol_object.count
+        if data_points_len > 0:
+            yield count, timestamp, data_points_len, line_protocol_object.flush()
+
+    @staticmethod
+    def __is_skipped(row, match_object, filter_object):
+        """Private function: __is_skipped, return True if the row is skipped by the match and filter"""
+
+        match_columns = match_object.columns
+        filter_columns = filter_object.columns
+
+        # Process Match & Filter: If match_columns exists and filter_columns not exists
+        match_status = match_object.check(row)
+        filter_status = filter_object.check(row)
+        if match_columns and not filter_columns:
+            if match_status is False:
+                return True
+
+        # Process Match & Filter: If match_columns not exists and filter_columns exists
+        if not match_columns and filter_columns:
+            if filter_status is True:
+                return True
+
+        # Process Match & Filter: If match_columns, filter_columns both exists
+        if match_columns and filter_columns:
+            if match_status is False and filter_status is True:
+                return True
+
+        return False
+
+    def __serialize_row(self, row, int_type, float_type, conf, match_object, filter_object, timestamp_object,
+                        line_protocol_object, timings=None):
+        """Private function: __serialize_row, return (line, timestamp), None if the row is skipped by the match
+        and filter. The seconds of the match and filter, and the time are added to timings, if not None"""
+
+        # Process Match & Filter
+        start = time.time() if timings is not None else None
+        skipped = self.__is_skipped(row, match_object, filter_object)
+        if start is not None:
+            timings[0] += time.time() - start
+        if skipped:
+            return None
+
+        # Process Time
+        start = time.time() if timings is not None else None
+        timestamp = timestamp_object.convert(row[conf.time_column])
+        if start is not None:
+            timings[1] += time.time() - start
+
+        # Process tags
+        tags = self.__process_tags_fields(columns=line_protocol_object.tag_columns,
+                                          row=row,
+                                          int_type=int_type,
+                                          float_type=float_type,
+                                          conf=conf,
+                                          encoding=None)
+
+        # Process fields
+        fields = self.__process_tags_fields(columns=line_protocol_object.field_columns,
+                                            row=row,
+                                            int_type=int_type,
+                                            float_type=float_type,
+                                            conf=conf,
+                                            encoding=None)
+
+        return line_protocol_object.make_line(tags, fields, timestamp), timestamp
+
+    @staticmethod
+    def __serialize_csv_chunks(csv_file_item, csv_object, pool, conf, context, match_object, filter_object,
+                               progress, metrics=None):
+        """Private function: __serialize_csv_chunks, serialize the byte-range chunks in the process pool
+
+        The chunks are submitted ahead at most 2 per worker, and the batches are yielded in the chunk order,
+        as (count, timestamp, data_points_len, data_points). The stage metrics of the workers are merged to metrics
+        """
+
+        chunks = csv_object.get_csv_chunks(csv_file_item, conf.chunk_size)
+        print('Info: Split {0} to {1} chunks'.format(csv_file_item, len(chunks)))
+        pending = collections.deque()
+        index = 0
+        count = 0
+        while index < len(chunks) or pending:
+            while index < len(chunks) and len(pending) < conf.workers * 2:
+                start, end = chunks[index]
+                pending.append(pool.apply_async(_serialize_csv_chunk_worker, (csv_file_item, start, end, context)))
+                index += 1
+            result = pending.popleft().get()
+            if result['error']:
+                sys.exit(result['error'])
+            for column, hits in result['match_hits'].items():
+                match_object.hits[column] += hits
+            for column, hits in result['filter_hits'].items():
+                filter_object.hits[column] += hits
+            progress.rows += result['rows']
+            if metrics is not None and result['metrics']:
+                metrics.merge(result['metrics'])
+            for data_points_len, data_points in result['batches']:
+                count += data_points_len
+                yield count, result['timestamp'], data_points_len, data_points
+
+    def serialize_csv_chunk(self, csv_file_item, start, end, conf, context):
+        """Function: serialize_csv_chunk
+
+        :param csv_file_item: the csv file
+        :param start: the chunk start byte
+        :param end: the chunk end byte
+        :param conf: the configuration
+        :param context: the csv file context from the scan: csv_charset, headers, int_type, float_type,
+            added_columns, tag_columns, field_columns, match_columns, filter_columns
+        :return return the result dict: batches [(data_points_len, data_points), ...], count, timestamp,
+            match_hits, filter_hits, metrics, the metrics dict of the match_filter and timestamp stages if
+            conf.metrics_file, else None, and error
+        """
+
+        csv_object = CSVObject(delimiter=conf.delimiter,
+                               lineterminator=conf.lineterminator,
+                               csv_charset=context['csv_charset'])
+        match_object = MatchObject(context['match_columns'], conf.match_by_string, conf.match_by_regex,
+                                   check_type='match')
+        filter_object = MatchObject(context['filter_columns'], conf.filter_by_string, conf.filter_by_regex,
+                                    check_type='filter')
+        line_protocol_object = LineProtocolObject(conf.db_measurement,
+                                                  tag_columns=context['tag_columns'],
+                                                  field_columns=context['field_columns'],
+                                                  unique=conf.unique)
+        timestamp_object = TimestampObject(time_format=conf.time_format, time_zone=conf.time_zone)
+        progress = ProgressObject(verbosity=0)
+        metrics = MetricsObject() if conf.metrics_file else None
+
+        csv_reader = csv_object.read_csv_chunk(csv_file_item, start, end, context['headers'])
+        csv_reader = (dict(row, **context['added_columns']) for row in csv_reader)
+        convert_csv_data_to_int_float = csv_object.convert_csv_data_to_int_float(
+            csv_reader=csv_reader,
+            int_type=context['int_type'],
+            float_type=context['float_type'],
+            mismatch_policy=conf.type_mismatch_policy)
+        batches = list()
+        count = 0
+        timestamp = 0
+        for count, timestamp, data_points_len, data_points in self.__serialize_rows(convert_csv_data_to_int_float,
+                                                                                    conf,
+                                                                                    match_object,
+                                                                                    filter_object,
+                                                                                    timestamp_object,
+                                                                                    line_protocol_object,
+                                                                                    metrics=metrics,
+                                                                                    progress=progress):
+            batches.append((data_points_len, data_points))
+
+        return {'batches': batches,
+                'rows': progress.rows,
+                'count': count,
+                'timestamp': timestamp,
+                'match_hits': match_object.hits,
+                'filter_hits': filter_object.hits,
+                'metrics': metrics.to_dict() if metrics is not None else None,
+                'error': None}
+
+    def export_csv_file(self, csv_file_item, conf, pool=None, manifest_record=None):
+        """Function: export_csv_file
+
+        :param csv_file_item: the csv file
+        :param conf: the configuration
+        :param pool: the process pool, the csv file larger than the chunk size is serialized by byte-range chunks
+            in the pool (default None)
+        :param manifest_record: the manifest record of the last export, with incremental, only the rows appended
+            since then are exported (default None, which means the csv file is not exported before)
+        :return return the result dict: csv_file, csv_file_length, count, timestamp, match_count, filter_count, error,
+            and manifest, the manifest record of this export. None if the csv file is skipped, or the result dict
+            with skipped True and the refreshed manifest record only, if the csv file is touched but not changed
+        """
+
+        metrics = MetricsObject() if conf.metrics_file else None
+        progress = ProgressObject(conf.progress_interval, conf.verbosity, conf.log_format)
+        state = dict(metrics=metrics, progress=progress)
+        spooled = self.__get_spooled()
+        for count, timestamp, data_points_len, data_points in self.__iter_csv_file(csv_file_item,
+                                                                                  conf,
+                                                                                  pool,
+                                                                                  manifest_record,
+                                                                                  state):
+            self.__write_points(count, data_points_len, data_points, progress, metrics, spooled)
+        start = time.time()
+        self._write_response = self._writer.flush()
+        if metrics is not None and conf.max_in_flight > 0:
+            # The batches in flight are waited
+            metrics.observe('write', time.time() - start)
+        self.__check_write_response()
+
+        result = state.get('result')
+        if result is not None and not result.get('skipped'):
+            progress.finish(self.__get_spooled(spooled))
+        if metrics is not None and result is not None and not result.get('skipped'):
+            metrics.counters.update(files=1, rows=result['csv_file_length'], points=result['count'])
+            result['metrics'] = metrics.to_dict()
+
+        return result
+
+    def __iter_csv_file(self, csv_file_item, conf, pool, manifest_record, state):
+        """Private function: __iter_csv_file, yield (count, timestamp, data_points_len, data_points) per batch
+        of the csv file, see export_csv_file. The result dict is set to state['result'] when the generator ends,
+        or left None if the csv file is skipped. The stages are observed by state['metrics'] if not None,
+        and the rows read are counted by state['progress'] if not None"""
+
+        metrics = state.get('metrics')
+        progress = state.get('progress') or ProgressObject(verbosity=0)
+
+        csv_object = CSVObject(delimiter=conf.delimiter,
+                               lineterminator=conf.lineterminator,
+                               csv_charset=conf.csv_charset,
+                               hash_algorithm=conf.hash_algorithm)
+
+        # Skip the csv file, which has the same size and modified time as the last export
+        csv_file_size = os.path.getsize(csv_file_item)
+        if self.__no_change_check(csv_file_item, conf, manifest_record, csv_file_size):
+            return
+
+        # Incremental: scan the rows appended since the last export only.
+        # The compressed csv file could not be sought by the byte offset, it is always fully exported,
+        # so is the parquet and arrow file
+        compressed = csv_object.get_compression(csv_file_item) is not None
+        arrow_object = ArrowObject(csv_object) if ArrowObject.get_format(csv_file_item) is not None else None
+        incremental_range = None
+        if conf.incremental and not compressed and arrow_object is None:
+            incremental_range = self.__get_incremental_range(csv_file_item, csv_object, manifest_record,
+                                                             csv_file_size)
+        if incremental_range is not None:
+            start, end = incremental_range
+            if start == end:
+                # The csv file is touched, or has the partial last row appended only: refresh the size and modified
+                # time in the manifest, so the next export is skipped without the fingerprint
+                print('Warning: No new data found, writer stop/jump for {0}...'.format(csv_file_item))
+                state['result'] = {'csv_file': csv_file_item,
+                                   'manifest': dict(manifest_record,
+                                                    size=csv_file_size,
+                                                    mtime=os.path.getmtime(csv_file_item)),
+                                   'skipped': True,
+                                   'error': None}
+                return
+            csv_object.csv_charset = manifest_record['csv_charset']
+            csv_scan = csv_object.scan_csv_range(csv_file_item,
+                                                 start,
+                                                 end,
+                                                 manifest_record['headers'],
+                                                 manifest_record['int_type'],
+                                                 manifest_record['float_type'],
+                                                 ignore_filed=conf.time_column,
+                                                 column_types=conf.column_types)
+            print('Info: Export the {0} bytes appended since the last export for {1}'.format(end - start,
+                                                                                         csv_file_item))
+            if not csv_scan.single_line_records:
+                print('Warning: The appended rows have line breaks in quotes, '
+                      'export the whole file for {0}...'.format(csv_file_item))
+                incremental_range = None
+
+        # Scan the csv once: charset, hash, header, lines count and column types.
+        # The parquet and arrow file has the column types in the schema
+        if arrow_object is not None:
+            csv_scan = arrow_object.scan_file(csv_file_item,
+                                              ignore_filed=conf.time_column,
+                                              column_types=conf.column_types)
+        elif incremental_range is None:
+            csv_scan = csv_object.scan_csv(csv_file_item,
+                                           ignore_filed=conf.time_column,
+                                           detect_charset=conf.csv_charset is None,
+                                           sample_rows=conf.type_sample_rows,
+                                           column_types=conf.column_types)
+        csv_file_length = csv_scan.lines_count
+        csv_file_hash = csv_scan.file_hash
+        csv_headers = csv_scan.headers
+        if metrics is not None:
+            for stage, seconds in csv_scan.timings.items():
+                metrics.observe(stage, seconds, items=csv_file_length, data_bytes=csv_file_size)
+
+        # Incremental: the partial last row of the full export is left to the next export, like the appended rows
+        partial_range = None
+        if incremental_range is None and conf.incremental and not compressed and arrow_object is None \
+                and csv_file_length > 0 and csv_object.is_chunkable(csv_scan):
+            line_end = csv_object.get_line_end_offset(csv_file_item, csv_file_size)
+            if line_end < csv_file_size:
+                # The column types and lines count are of the complete rows, the hash is still of the whole file
+                partial_range = csv_object.get_header_end_offset(csv_file_item), line_end
+                csv_scan = csv_object.scan_csv_range(csv_file_item,
+                                                     partial_range[0],
+                                                     partial_range[1],
+                                                     csv_headers,
+                                                     {},
+                                                     {},
+                                                     ignore_filed=conf.time_column,
+                                                     column_types=conf.column_types)
+                csv_file_length = csv_scan.lines_count
+
+        # Validate csv_headers
+        if not csv_headers:
+            print('Error: The csv file has no header detected. Writer stopping for {0}...'.format(csv_file_item))
+            return
+
+        # Validate field_columns, tag_columns, match_columns, filter_columns
+        field_columns = self.__validate_columns(csv_headers, conf.field_columns)
+        tag_columns = self.__validate_columns(csv_headers, conf.tag_columns)
+        if not field_columns:
+            print('Error: The input --field_columns does not expected. '
+                  'Please check the fields are in csv headers or not. '
+                  'Writer stopping for {0}...'.format(csv_file_item))
+            return
+        if not tag_columns:
+            print('Warning: The input --tag_columns does not expected or leaves None. '
+                  'Please check the fields are in csv headers or not. '
+                  'No tag will be added into influx for {0}...'.format(csv_file_item))
+            # continue
+        match_columns = self.__validate_columns(csv_headers, conf.match_columns)
+        filter_columns = self.__validate_columns(csv_headers, conf.filter_columns)
+        match_object = MatchObject(match_columns, conf.match_by_string, conf.match_by_regex, check_type='match')
+        filter_object = MatchObject(filter_columns,
+                                    conf.filter_by_string,
+                                    conf.filter_by_regex,
+                                    check_type='filter',
+                                    csv_file_length=csv_file_length)
+
+        # Validate time_column
+        time_column_exists = conf.time_column in csv_headers
+        if time_column_exists is False:
+            print('Warning: The time column does not exists. '
+                  'We will use the csv last modified time as time column')
+
+        # Check the hash of the last export: the csv file is touched only, refresh the modified time in the manifest
+        if incremental_range is None:
+            if self.__no_new_data_check(csv_file_item, csv_object, conf, csv_file_hash, manifest_record):
+                if manifest_record is None:
+                    return
+                state['result'] = {'csv_file': csv_file_item,
+                                   'manifest': dict(manifest_record, mtime=os.path.getmtime(csv_file_item)),
+                                   'skipped': True,
+                                   'error': None}
+                return
+        # The added columns have the same value for each row, instead of a list as long as the csv file
+        added_columns = dict()
+        if time_column_exists is False:
+            modified_time = csv_object.get_file_modify_time(csv_file_item)
+            field_columns.append('timestamp')
+            tag_columns.append('timestamp')
+            added_columns[conf.time_column] = modified_time
+
+        # Process influx csv: the added columns are string type
+        int_type = dict(csv_scan.int_type)
+        float_type = dict(csv_scan.float_type)
+        for column in added_columns:
+            int_type[column] = False
+            float_type[column] = False
+        line_protocol_object = LineProtocolObject(conf.db_measurement,
+                                                  tag_columns=tag_columns,
+                                                  field_columns=field_columns,
+                                                  unique=conf.unique)
+
+        # Serialize the rows: by byte-range chunks in the process pool, or one by one
+        columnar_object = None
+        chunkable = pool is not None and not compressed and 0 < conf.chunk_size < os.path.getsize(csv_file_item)
+        if arrow_object is not None:
+            kind = 'timestamp' if conf.time_column in arrow_object.timestamp_columns else None
+            timestamp_object = TimestampObject(time_format=conf.time_format, time_zone=conf.time_zone, kind=kind)
+            rows = arrow_object.read_rows(csv_file_item, int_type, float_type, conf.time_column, added_columns)
+            batches = self.__serialize_rows(rows, conf, match_object, filter_object, timestamp_object,
+                                            line_protocol_object, metrics, progress)
+        elif incremental_range is not None or partial_range is not None:
+            start, end = incremental_range or partial_range
+            csv_reader_data = csv_object.read_csv_chunk(csv_file_item, start, end, csv_headers)
+            csv_reader_data = (dict(row, **added_columns) for row in csv_reader_data)
+            timestamp_object = TimestampObject(time_format=conf.time_format, time_zone=conf.time_zone)
+            convert_csv_data_to_int_float = csv_object.convert_csv_data_to_int_float(
+                csv_reader=csv_reader_data,
+                int_type=int_type,
+                float_type=float_type,
+                mismatch_policy=conf.type_mismatch_policy)
+            batches = self.__serialize_rows(convert_csv_data_to_int_float, conf, match_object, filter_object,
+                                            timestamp_object, line_protocol_object, metrics, progress)
+        elif chunkable and csv_object.is_chunkable(csv_scan):
+            context = {'csv_charset': csv_object.csv_charset,
+                       'headers': csv_headers,
+                       'int_type': int_type,
+                       'float_type': float_type,
+                       'added_columns': added_columns,
+                       'tag_columns': line_protocol_object.tag_columns,
+                       'field_columns': line_protocol_object.field_columns,
+                       'match_columns': match_columns,
+                       'filter_columns': filter_columns}
+            batches = self.__serialize_csv_chunks(csv_file_item, csv_object, pool, conf, context, match_object,
+                                                  filter_object, progress, metrics)
+        elif conf.engine == 'columnar':
+            timestamp_object = TimestampObject(time_format=conf.time_format, time_zone=conf.time_zone)
+            columnar_object = ColumnarObject(csv_object, conf, int_type, float_type, added_columns, match_object,
+                                             filter_object, timestamp_object, line_protocol_object)
+            row_serializer = functools.partial(self.__serialize_row,
+                                               conf=conf,
+                                               match_object=match_object,
+                                               filter_object=filter_object,
+                                               timestamp_object=timestamp_object,
+                                               line_protocol_object=line_protocol_object,
+                                               timings=columnar_object.timings)
+            chunks = columnar_object.serialize(csv_file_item, row_serializer)
+            if metrics is not None:
+                chunks = self.__observe_chunk_timings(chunks, columnar_object, metrics)
+            batches = self.__serialize_lines(chunks, conf, line_protocol_object)
+        else:
+            csv_reader_data = csv_object.add_columns_to_csv(file_name=csv_file_item,
+                                                            target=None,
+                                                            data=list(),
+                                                            save_csv_file=False,
+                                                            has_header=csv_headers)
+            if added_columns:
+                csv_reader_data = (dict(row, **added_columns) for row in csv_reader_data)
+            timestamp_object = TimestampObject(time_format=conf.time_format, time_zone=conf.time_zone)
+            convert_csv_data_to_int_float = csv_object.convert_csv_data_to_int_float(
+                csv_reader=csv_reader_data,
+                int_type=int_type,
+                float_type=float_type,
+                mismatch_policy=conf.type_mismatch_policy)
+            batches = self.__serialize_rows(convert_csv_data_to_int_float, conf, match_object, filter_object,
+                                            timestamp_object, line_protocol_object, metrics, progress)
+
+        # Yield the batches to write
+        count = 0
+        timestamp = 0
+        progress.start(csv_file_item, csv_file_length)
+        start = time.time()
+        for batch in batches:
+            count, timestamp = batch[:2]
+            if columnar_object is not None:
+                progress.rows = columnar_object.rows
+            if metrics is not None:
+                metrics.observe('serialization', time.time() - start, items=batch[2], data_bytes=len(batch[3]))
+            yield batch
+            start = time.time()
+
+        # The manifest record of this export
+        manifest = None
+        if self.use_manifest(conf):
+            lines_count = csv_file_length
+            offset = None
+            if incremental_range is not None:
+                # The hash of the whole file is unknown, as only the appended rows are read
+                csv_file_hash = None
+                lines_count += manifest_record['lines_count']
+                timestamp = timestamp or manifest_record.get('timestamp')
+                offset = end
+            elif conf.incremental and not compressed and arrow_object is None and csv_object.is_chunkable(csv_scan):
+                offset = csv_object.get_line_end_offset(csv_file_item, csv_file_size)
+            elif conf.incremental:
+                print('Warning: The csv file is compressed, parquet or arrow, has no header, line breaks in quotes or '
+                      'not ascii compatible charset, it will be fully exported next time: {0}'.format(csv_file_item))
+            manifest = self.__get_manifest_record(csv_file_item, csv_object, csv_scan, csv_file_size, csv_file_hash,
+                                                  lines_count, timestamp, offset)
+
+        state['result'] = {'csv_file': csv_file_item,
+                           'csv_file_length': csv_file_length,
+                           'count': count,
+                           'timestamp': timestamp,
+                           'match_count': match_object.count,
+                           'filter_count': filter_object.count,
+                           'manifest': manifest,
+                           'error': None}
+
+    @staticmethod
+    def use_manifest(conf):
+        """Function: use_manifest
+
+        :param conf: the configuration
+        :return return True if the export state is saved to the manifest: for the incremental export,
+            or the no new data check
+        """
+
+        return conf.incremental or conf.force_insert_even_csv_no_update is False
+
+    @staticmethod
+    def __get_manifest_record(csv_file_item, csv_object, csv_scan, csv_file_size, csv_file_hash, lines_count,
+                              timestamp, offset=None):
+        """Private function: __get_manifest_record, the state of the export, with the state to resume
+        the export from the offset if the offset is not None"""
+
+        record = {'hash_algorithm': csv_object.hash_algorithm,
+                  'hash': csv_file_hash,
+                  'size': csv_file_size,
+                  'mtime': os.path.getmtime(csv_file_item),
+                  'lines_count': lines_count,
+                  'timestamp': timestamp}
+        if offset is not None:
+            prefix_md5, tail_md5 = ManifestObject.get_fingerprint(csv_object, csv_file_item, offset)
+            record.update(offset=offset,
+                          prefix_md5=prefix_md5,
+                          tail_md5=tail_md5,
+                          headers=csv_scan.headers,
+                          csv_charset=csv_object.csv_charset,
+                          int_type=csv_scan.int_type,
+                          float_type=csv_scan.float_type)
+
+        return record
+
+    def __init_influx(self, conf):
+        """Private function: __init_influx, connect the influx, and drop the database or measurement if required"""
+
+        influx_object, client = self.connect_influx(conf)
+        influx_version = influx_object.influxdb_version
+        if conf.drop_measurement:
+            influx_object.drop_measurement(conf.db_name, conf.db_measurement, conf.bucket_name, conf.org_name, client)
+            influx_object.drop_measurement(conf.db_name, conf.count_measurement, conf.bucket_name, conf.org_name,
+                                           client)
+        if conf.drop_database:
+            if influx_version.startswith('0') or influx_version.startswith('1'):
+                influx_object.drop_database(conf.db_name, client)
+                influx_object.create_influx_db_if_not_exists(conf.db_name, client)
+            else:
+                influx_object.drop_bucket(org_name=conf.org_name, bucket_name=conf.bucket_name)
+                influx_object.create_influx_bucket_if_not_exists(org_name=conf.org_name, bucket_name=conf.bucket_name)
+        if influx_version.startswith('0') or influx_version.startswith('1'):
+            client.switch_user(conf.db_user, conf.db_password)
 
     def export_csv_to_influx(self, **kwargs):
         """Function: export_csv_to_influx
@@ -320,6 +981,44 @@ class ExporterObject(object):
         :key str token: for 2.x only, token (default None)
         :key bool unique: insert the duplicated data (default False)
         :key str csv_charset: the csv charset (default None, which will auto detect)
+        :key int type_sample_rows: detect the column types from the first rows only (default 0, all rows)
+        :key str column_types: pin the column types, like: column_1:int,column_2:float,column_3:string (default None)
+        :key str type_mismatch_policy: the value does not match the column type: coerce, reject or stringify
+            (default reject)
+        :key int workers: export the csv files by the process pool with the workers (default 1, no process pool)
+        :key int chunk_size: with workers, the csv file larger than the chunk size in bytes is split to byte-range
+            chunks, which are parsed in the process pool (default 67108864, 0 means no chunk)
+        :key int max_in_flight: post the batches by the background threads, at most max_in_flight batches
+            at the same time (default 0, which means the batch is posted when it is written)
+        :key bool gzip: gzip the write request body, and print the compression ratio and time (default False)
+        :key int retries: retry the timeout, connection error, 429 and 5xx with the exponential backoff (default 3)
+        :key float retry_interval: the first retry interval in seconds (default 1.0)
+        :key str spool_dir: save the batch failed after the retries to the dir and go on, replay them later by
+            replay_spool (default None, which means exit)
+        :key bool verify_ssl: verify the server certificate when the influx server is https. False is only for the
+            self-signed certificate of the trusted server (default True)
+        :key bool incremental: export only the rows appended since the last export, by the byte offset saved in the
+            manifest. The truncated or rewritten csv file is fully exported (default False)
+        :key str manifest: the manifest file, which saves the hash, size, modified time, lines count, last timestamp
+            and offset of the exported csv files, for the incremental export and the no new data check
+            (default .export_csv_to_influx_manifest.jsonl in the csv dir)
+        :key str hash_algorithm: the hash to check the csv file is changed or not, when the size or modified time
+            is changed: md5, blake2b (Python3.6+) or xxhash (pip install xxhash) (default md5)
+        :key bool watch: after the export, keep watching the csv file or directory, and export the new and changed
+            csv files until interrupted, by inotify if inotify_simple is installed, else by polling (default False)
+        :key float watch_interval: the polling interval, or the seconds to collect more inotify events (default 5.0)
+        :key str engine: row: convert the rows one by one, or columnar: convert and serialize the columns chunk by
+            chunk by NumPy, with the same points as row, the csv is still parsed by the csv reader.
+            The chunk_size split and the incremental export use row (default row)
+        :key str match_suffix: match the files in the csv dir by the suffix, separated by comma, the compressed
+            files are matched as well. The .parquet, .pq, .arrow, .feather and .ipc files are read by pyarrow,
+            with the column types from the schema (default .csv)
+        :key str output: write the line protocol to the file instead of influx, - means stdout, the file ends with
+            .gz or with gzip is gzip compressed. The influx is not connected (default None)
+        :key str metrics_file: save the counters and latency histograms of the export stages, per csv file and per
+            run, to the file after the csv files are exported, and after each watched change (default None)
+        :key str metrics_format: the metrics file format: json, or prometheus for the node exporter textfile
+            collector (default json)
         """
 
         # Init the conf
@@ -329,162 +1028,213 @@ class ExporterObject(object):
         csv_object = CSVObject(delimiter=conf.delimiter,
                                lineterminator=conf.lineterminator,
                                csv_charset=conf.csv_charset)
-        influx_object = InfluxObject(db_server_name=conf.db_server_name,
-                                     db_user=conf.db_user,
-                                     db_password=conf.db_password,
-                                     http_schema=conf.http_schema,
-                                     token=conf.token)
-        client = influx_object.connect_influx_db(db_name=conf.db_name, org_name=conf.org_name)
-        influx_version = influx_object.influxdb_version
 
-        # Init: database behavior
+        # Init: the writer to the output, or to influx with the database behavior
+        self._metrics = MetricsObject() if conf.metrics_file else None
         conf.count_measurement = '{0}.count'.format(conf.db_measurement)
-        if conf.drop_measurement:
-            influx_object.drop_measurement(conf.db_name, conf.db_measurement, conf.bucket_name, conf.org_name, client)
-            influx_object.drop_measurement(conf.db_name, conf.count_measurement, conf.bucket_name, conf.org_name,
-                                           client)
-        if conf.drop_database:
-            if influx_version.startswith('0') or influx_version.startswith('1'):
-                influx_object.drop_database(conf.db_name, client)
-                influx_object.create_influx_db_if_not_exists(conf.db_name, client)
-            else:
-                influx_object.drop_bucket(org_name=conf.org_name, bucket_name=conf.bucket_name)
-                influx_object.create_influx_bucket_if_not_exists(org_name=conf.org_name, bucket_name=conf.bucket_name)
-        if influx_version.startswith('0') or influx_version.startswith('1'):
-            client.switch_user(conf.db_user, conf.db_password)
+        if conf.output is not None:
+            self._writer = SinkObject(conf.output, compress=conf.gzip)
+        else:
+            self.__init_influx(conf)
 
-        # Process csv_file
-        csv_file_generator = csv_object.search_files_in_dir(conf.csv_file)
-        for csv_file_item in csv_file_generator:
-            if conf.csv_charset is None:
-                csv_object = csv_object.detect_csv_charset(file_name=csv_file_item, **csv_object.__dict__)
-            csv_file_length = csv_object.get_csv_lines_count(csv_file_item)
-            csv_file_md5 = csv_object.get_file_md5(csv_file_item)
-            csv_headers = csv_object.get_csv_header(csv_file_item)
-
-            # Validate csv_headers
-            if not csv_headers:
-                print('Error: The csv file has no header detected. Writer stopping for {0}...'.format(csv_file_item))
-                continue
+        # Process csv_file: the influx client, writer and process pool are kept for the watched changes
+        manifest = ManifestObject(conf.manifest) if self.use_manifest(conf) else None
+        watcher = None
+        if conf.watch:
+            watcher = WatcherObject(conf.csv_file, interval=conf.watch_interval, match_suffix=conf.match_suffix)
+        pool = None
+        if conf.workers > 1:
+            pool = multiprocessing.Pool(conf.workers, initializer=_init_worker, initargs=(conf,))
+        try:
+            csv_file_generator = csv_object.search_files_in_dir(conf.csv_file, match_suffix=conf.match_suffix)
+            self.__export_csv_files(csv_file_generator, conf, pool, manifest)
+            if watcher is not None:
+                try:
+                    for csv_files in watcher.watch():
+                        self.__export_csv_files(csv_files, conf, pool, manifest)
+                except KeyboardInterrupt:
+                    print('Info: Stop watching {0}'.format(conf.csv_file))
+            if pool is not None:
+                # The workers close their writers when they exit
+                pool.close()
+                pool.join()
+        finally:
+            if watcher is not None:
+                watcher.close()
+            if pool is not None:
+                pool.terminate()
+                pool.join()
 
-            # Validate field_columns, tag_columns, match_columns, filter_columns
-            field_columns = self.__validate_columns(csv_headers, conf.field_columns)
-            tag_columns = self.__validate_columns(csv_headers, conf.tag_columns)
-            if not field_columns:
-                print('Error: The input --field_columns does not expected. '
-                      'Please check the fields are in csv headers or not. '
-                      'Writer stopping for {0}...'.format(csv_file_item))
-                continue
-            if not tag_columns:
-                print('Warning: The input --tag_columns does not expected or leaves None. '
-                      'Please check the fields are in csv headers or not. '
-                      'No tag will be added into influx for {0}...'.format(csv_file_item))
-                # continue
-            match_columns = self.__validate_columns(csv_headers, conf.match_columns)
-            filter_columns = self.__validate_columns(csv_headers, conf.filter_columns)
-
-            # Validate time_column
-            with csv_object.compatible_open(csv_file_item, encoding=csv_object.csv_charset) as f:
-                csv_reader = csv_object.compatible_dict_reader(f,
-                                                               encoding=csv_object.csv_charset,
-                                                               delimiter=conf.delimiter,
-                                                               lineterminator=conf.lineterminator)
-                time_column_exists = True
-                for row in csv_reader:
-                    try:
-                        time_column_exists = row[conf.time_column]
-                    except KeyError:
-                        print('Warning: The time column does not exists. '
-                              'We will use the csv last modified time as time column')
-                        time_column_exists = False
-                    break
+        # Close the writer: the messages are printed to stderr until the stdout output is closed
+        if conf.output is not None:
+            print('Info: Wrote {0} bytes of line protocol to {1}'.format(self._writer.bytes, conf.output))
+        self._write_response = self._writer.close()
+        self.__check_write_response()
+        if self._writer.compress:
+            compression = self._writer.compression
+            print('Info: Compressed {0} bytes to {1} bytes in total, ratio {2:.2f}, in {3:.2f} s'.format(
+                compression['bytes'],
+                compression['compressed_bytes'],
+                self._writer.compression_ratio[1],
+                compression['seconds']))
+        if self._writer.spooled:
+            print('Warning: {0} batches ({1} points) failed to write are spooled to {2}, '
+                  'replay them by replay_spool_to_influx'.format(self._writer.spooled,
+                                                                 self._writer.spooled_points,
+                                                                 conf.spool_dir))
 
-            # Check the timestamp, and generate the csv with checksum
-            no_new_data_status, new_csv_file = self.__no_new_data_check(csv_file_item, csv_object, conf, csv_file_md5)
-            if no_new_data_status:
-                continue
-            data = [{'md5': [csv_file_md5] * csv_file_length}]
-            if time_column_exists is False:
-                modified_time = csv_object.get_file_modify_time(csv_file_item)
-                field_columns.append('timestamp')
-                tag_columns.append('timestamp')
-                data.append({conf.time_column: [modified_time] * csv_file_length})
-            csv_reader_data = csv_object.add_columns_to_csv(file_name=csv_file_item,
-                                                            target=new_csv_file,
-                                                            data=data,
-                                                            save_csv_file=not conf.force_insert_even_csv_no_update)
-
-            # Process influx csv
-            data_points = list()
-            count = 0
-            timestamp = 0
-            convert_csv_data_to_int_float = csv_object.convert_csv_data_to_int_float(csv_reader=csv_reader_data,
-                                                                                     ignore_filed=conf.time_column)
-            for row, int_type, float_type in convert_csv_data_to_int_float:
-                # Process Match & Filter: If match_columns exists and filter_columns not exists
-                match_status = self.__check_match_and_filter(row,
-                                                             match_columns,
-                                                             conf.match_by_string,
-                                                             conf.match_by_regex,
-                                                             check_type='match')
-                filter_status = self.__check_match_and_filter(row,
-                                                              filter_columns,
-                                                              conf.filter_by_string,
-                                                              conf.filter_by_regex,
-                                                              check_type='filter',
-                                                              csv_file_length=csv_file_length)
-                if match_columns and not filter_columns:
-                    if match_status is False:
-                        continue
-
-                # Process Match & Filter: If match_columns not exists and filter_columns exists
-                if not match_columns and filter_columns:
-                    if filter_status is True:
-                        continue
-
-                # Process Match & Filter: If match_columns, filter_columns both exists
-                if match_columns and filter_columns:
-                    if match_status is False and filter_status is True:
-                        continue
-
-                # Process Time
-                timestamp = self.__process_timestamp(row, conf)
-
-                # Process tags
-                tags = self.__process_tags_fields(columns=tag_columns,
-                                                  row=row,
-                                                  int_type=int_type,
-                                                  float_type=float_type,
-                                                  conf=conf,
-                                                  encoding=csv_object.csv_charset)
-
-                # Process fields
-                fields = self.__process_tags_fields(columns=field_columns,
-                                                    row=row,
-                                                    int_type=int_type,
-                                                    float_type=float_type,
-                                                    conf=conf,
-                                                    encoding=csv_object.csv_charset)
-
-                point = {'measurement': conf.db_measurement, 'time': timestamp, 'fields': fields, 'tags': tags}
-                data_points.append(point)
-                count += 1
-
-                # Write points
-                data_points_len = len(data_points)
-                if data_points_len % conf.batch_size == 0:
-                    self.__write_points(count, csv_file_item, data_points_len, influx_version, client,
-                                        data_points, conf, influx_object)
-                    data_points = list()
+    def serialize_csv_to_influx(self, **kwargs):
+        """Function: serialize_csv_to_influx, yield the line protocol bytes batch by batch, without connecting
+        influx, the batches could be written to influx later, like: influx write, or curl --data-binary
 
-            # Write rest points
-            data_points_len = len(data_points)
-            if data_points_len > 0:
-                self.__write_points(count, csv_file_item, data_points_len, influx_version, client,
-                                    data_points, conf, influx_object)
+        :key: the same as export_csv_to_influx, except the influx settings, the workers, the watch, the count
+            measurement and the output, which are not used. The progress is reported at most once per the
+            progress_interval, as the points serialized and the bytes yielded
+        """
 
-            # Write count measurement
-            self.__write_count_measurement(conf, csv_file_length, influx_version, client, timestamp)
+        conf = Configuration(**kwargs)
+        csv_object = CSVObject(delimiter=conf.delimiter,
+                               lineterminator=conf.lineterminator,
+                               csv_charset=conf.csv_charset)
+        manifest = ManifestObject(conf.manifest) if self.use_manifest(conf) else None
+        for csv_file_item in csv_object.search_files_in_dir(conf.csv_file, match_suffix=conf.match_suffix):
+            progress = ProgressObject(conf.progress_interval, conf.verbosity, conf.log_format)
+            state = dict(progress=progress)
+            manifest_record = manifest.get(csv_file_item) if manifest is not None else None
+            for count, timestamp, data_points_len, data_points in self.__iter_csv_file(csv_file_item,
+                                                                                      conf,
+                                                                                      None,
+                                                                                      manifest_record,
+                                                                                      state):
+                progress.update(count, len(data_points))
+                yield data_points
 
-            print('Info: Done')
-            print('')
+            # Save the exported offset, when the batches of the csv file are all consumed
+            result = state.get('result')
+            if result is not None and not result.get('skipped'):
+                progress.finish()
+            if manifest is not None and result is not None and result.get('manifest'):
+                manifest.update(result['csv_file'], result['manifest'])
+        if manifest is not None:
+            manifest.save()
+
+    def replay_spool(self, **kwargs):
+        """Function: replay_spool
+
+        :key str spool_dir: the spool dir
+        :key str db_server_name: the influx server (default localhost:8086)
+        :key str db_user: for 0.x, 1.x only, the influx db user (default admin)
+        :key str db_password: for 0.x, 1.x only, the influx db password (default admin)
+        :key str db_name: for 0.x, 1.x only, the influx db name
+        :key str http_schema: for 2.x only, influxdb http schema, could be http or https (default http)
+        :key str org_name: for 2.x only, my org (default my-org)
+        :key str bucket_name: for 2.x only, my bucket (default my-bucket)
+        :key str token: for 2.x only, token (default None)
+        :key int retries: retry the timeout, connection error, 429 and 5xx with the exponential backoff (default 3)
+        :key float retry_interval: the first retry interval in seconds (default 1.0)
+        :key bool verify_ssl: verify the server certificate when the influx server is https (default True)
+        :return return the replayed batches count
+        """
+
+        spool_dir = kwargs.get('spool_dir', None)
+        if not spool_dir or not os.path.isdir(spool_dir):
+            sys.exit('Error: Spool dir not found: {0}'.format(spool_dir))
+        try:
+            retries = int(kwargs.get('retries', 3))
+            retry_interval = float(kwargs.get('retry_interval', 1.0))
+        except ValueError:
+            sys.exit('Error: The retries should be int, and the retry_interval should be float')
+        verify_ssl = str(kwargs.get('verify_ssl', True)).lower()
+        if verify_ssl not in ['true', 'false']:
+            sys.exit('Error: The input verify_ssl should be True or False, current is {0}'.format(verify_ssl))
+
+        influx_object = InfluxObject(db_server_name=kwargs.get('db_server_name', 'localhost:8086'),
+                                     db_user=kwargs.get('db_user', 'admin'),
+                                     db_password=kwargs.get('db_password', 'admin'),
+                                     http_schema=kwargs.get('http_schema', 'http'),
+                                     token=kwargs.get('token', None))
+        self._writer = WriterObject(influx_object.influxdb_url,
+                                    influxdb_version=influx_object.influxdb_version,
+                                    db_name=kwargs.get('db_name', None),
+                                    db_user=influx_object.db_user,
+                                    db_password=influx_object.db_password,
+                                    token=influx_object.token,
+                                    org_name=kwargs.get('org_name', 'my-org'),
+                                    bucket_name=kwargs.get('bucket_name', 'my-bucket'),
+                                    retries=retries,
+                                    retry_interval=retry_interval,
+                                    verify_ssl=verify_ssl == 'true',
+                                    error_callback=self.__error_cb)
+        replayed, left = self._writer.replay_spool(spool_dir)
+        self._writer.close()
+        print('Info: Replayed {0} batches from {1}, {2} left'.format(replayed, spool_dir, left))
+        self._write_response = self._writer.error is None
+        self.__check_write_response()
+
+        return replayed
+
+
+_worker_context = dict()
+
+
+def _init_worker(conf):
+    """Function: _init_worker, the process pool initializer, connect the influx once per worker
+
+    :param conf: the configuration
+    """
+
+    # The parent handles the interrupt, like stopping the watch
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        exporter = ExporterObject()
+        if conf.output is None:
+            exporter.connect_influx(conf)
+            multiprocessing.util.Finalize(exporter._writer, exporter._writer.close, exitpriority=10)
+        _worker_context.update(exporter=exporter, conf=conf, error=None)
+    except SystemExit as e:
+        _worker_context['error'] = str(e)
+
+
+def _export_csv_file_worker(csv_file_item, manifest_record=None):
+    """Function: _export_csv_file_worker, export one csv file in the process pool worker
+
+    :param csv_file_item: the csv file
+    :param manifest_record: the manifest record of the last export (default None)
+    :return return the result dict of the csv file, the error is returned instead of exiting the worker.
+        The writer_counters of the result are the spooled batches and the compression of the csv file, see
+        WriterObject.get_counters
+    """
+
+    if _worker_context.get('error'):
+        return {'csv_file': csv_file_item, 'error': _worker_context['error']}
+    writer = _worker_context['exporter']._writer
+    counters = writer.get_counters()
+    try:
+        result = _worker_context['exporter'].export_csv_file(csv_file_item,
+                                                             _worker_context['conf'],
+                                                             manifest_record=manifest_record)
+    except SystemExit as e:
+        return {'csv_file': csv_file_item, 'error': str(e)}
+    if result is not None:
+        result['writer_counters'] = dict((key, value - counters[key]) for key, value in writer.get_counters().items())
+
+    return result
+
+
+def _serialize_csv_chunk_worker(csv_file_item, start, end, context):
+    """Function: _serialize_csv_chunk_worker, serialize one byte-range chunk in the process pool worker
+
+    :param csv_file_item: the csv file
+    :param start: the chunk start byte
+    :param end: the chunk end byte
+    :param context: the csv file context, see ExporterObject.serialize_csv_chunk
+    :return return the result dict of the chunk, the error is returned instead of exiting the worker
+    """
+
+    if _worker_context.get('error'):
+        return {'error': _worker_context['error']}
+    try:
+        return _worker_context['exporter'].serialize_csv_chunk(csv_file_item, start, end, _worker_context['conf'],
+                                                               context)
+    except SystemExit as e:
+        return {'error': str(e)}
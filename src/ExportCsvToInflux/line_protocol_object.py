@@ -0,0 +1,129 @@
+import sys
+
+
+class LineProtocolObject(object):
+    """LineProtocolObject: serialize the points to influx line protocol bytes, escaping as influxdb make_line"""
+
+    python_version = sys.version_info.major
+    tag_escape_table = dict((ord(k), v) for k, v in {'\\': '\\\\', ' ': '\\ ', ',': '\\,', '=': '\\=',
+                                                      '\n': '\\n'}.items())
+    string_escape_table = dict((ord(k), v) for k, v in {'\\': '\\\\', '"': '\\"', '\n': '\\n'}.items())
+
+    def __init__(self, measurement, tag_columns=None, field_columns=None, unique=False):
+        """Function: __init__
+
+        The measurement, tag keys and field keys are escaped once, and sorted like influxdb make_line
+
+        :param measurement: the measurement
+        :param tag_columns: the tag columns
+        :param field_columns: the field columns
+        :param unique: add the uniq column to tags and fields (default False)
+        """
+
+        tag_columns = set(tag_columns or [])
+        field_columns = set(field_columns or [])
+        if unique:
+            tag_columns.add('uniq')
+            field_columns.add('uniq')
+        self.tag_columns = sorted(tag_columns)
+        self.field_columns = sorted(field_columns)
+        self.measurement = self.escape_tag(measurement)
+        self.tag_keys = [self.escape_tag(column) for column in self.tag_columns]
+        self.field_keys = [self.escape_tag(column) for column in self.field_columns]
+        self.buffer = bytearray()
+        self.count = 0
+
+    @classmethod
+    def to_text(cls, value):
+        """Function: to_text
+
+        :param value: the value
+        :return return the text of the value
+        """
+
+        if isinstance(value, bytes):
+            return value.decode('utf-8')
+        if cls.python_version == 2:
+            return unicode(value)  # noqa: F821
+        return str(value)
+
+    @classmethod
+    def escape_tag(cls, value):
+        """Function: escape_tag
+
+        :param value: the measurement, tag key, tag value or field key
+        :return return the escaped text
+        """
+
+        return cls.to_text(value).translate(cls.tag_escape_table)
+
+    @classmethod
+    def escape_field_value(cls, value):
+        """Function: escape_field_value
+
+        :param value: the field value
+        :return return the escaped text: string is quoted, int has suffix i, float is repr
+        """
+
+        if isinstance(value, bool):
+            return str(value)
+        if isinstance(value, int) or (cls.python_version == 2 and isinstance(value, long)):  # noqa: F821
+            return '{0}i'.format(value)
+        if isinstance(value, float):
+            return repr(value)
+        return '"{0}"'.format(cls.to_text(value).translate(cls.string_escape_table))
+
+    def add(self, tags, fields, timestamp):
+        """Function: add
+
+        :param tags: the tag values, in the order of tag_columns
+        :param fields: the field values, in the order of field_columns
+        :param timestamp: the timestamp in nanoseconds
+        """
+
+        self.add_lines(self.make_line(tags, fields, timestamp).encode('utf-8'))
+
+    def make_line(self, tags, fields, timestamp):
+        """Function: make_line
+
+        :param tags: the tag values, in the order of tag_columns
+        :param fields: the field values, in the order of field_columns
+        :param timestamp: the timestamp in nanoseconds
+        :return return the line text, with the line terminator
+        """
+
+        line = [self.measurement]
+        for key, value in zip(self.tag_keys, tags):
+            value = self.escape_tag(value)
+            if key and value:
+                line.append(',{0}={1}'.format(key, value))
+        separator = ' '
+        for key, value in zip(self.field_keys, fields):
+            if key:
+                line.append('{0}{1}={2}'.format(separator, key, self.escape_field_value(value)))
+                separator = ','
+        line.append(' {0}\n'.format(int(timestamp)))
+
+        return ''.join(line)
+
+    def add_lines(self, data, count=1):
+        """Function: add_lines
+
+        :param data: the line protocol bytes of the lines
+        :param count: the lines count (default 1)
+        """
+
+        self.buffer += data
+        self.count += count
+
+    def flush(self):
+        """Function: flush
+
+        :return return the line protocol bytes added since the last flush, and reset the buffer
+        """
+
+        data = bytes(self.buffer)
+        del self.buffer[:]
+        self.count = 0
+
+        return data
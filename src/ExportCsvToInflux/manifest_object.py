@@ -0,0 +1,98 @@
+import json
+import os
+
+
+class ManifestObject(object):
+    """ManifestObject: the persisted export state of the csv files, one json record per line
+
+    The record is appended once the csv file is exported, so the state survives the interruption.
+    The later record of the same file wins, and the manifest is compacted by save.
+    """
+
+    prefix_size = 64 * 1024
+    tail_size = 4 * 1024
+
+    def __init__(self, manifest_file):
+        """Function: __init__
+
+        :param manifest_file: the manifest file, created when the first record is updated
+        """
+
+        self.manifest_file = manifest_file
+        self.records = dict()
+        self.__load()
+
+    @staticmethod
+    def get_key(csv_file):
+        """Function: get_key
+
+        :param csv_file: the csv file
+        :return return the record key of the csv file
+        """
+
+        return os.path.abspath(csv_file)
+
+    def __load(self):
+        """Private Function: load the records, the broken line (like interrupted when appending) is skipped"""
+
+        if not os.path.exists(self.manifest_file):
+            return
+        with open(self.manifest_file) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self.records[record['csv_file']] = record
+                except (ValueError, KeyError, TypeError):
+                    print('Warning: Skip the broken manifest line in {0}'.format(self.manifest_file))
+
+    def get(self, csv_file):
+        """Function: get
+
+        :param csv_file: the csv file
+        :return return the record of the csv file, None if not exported before
+        """
+
+        return self.records.get(self.get_key(csv_file))
+
+    def update(self, csv_file, record):
+        """Function: update
+
+        :param csv_file: the csv file
+        :param record: the record dict, must be json serializable
+        """
+
+        record = dict(record, csv_file=self.get_key(csv_file))
+        self.records[record['csv_file']] = record
+        manifest_dir = os.path.dirname(os.path.abspath(self.manifest_file))
+        if not os.path.isdir(manifest_dir):
+            os.makedirs(manifest_dir)
+        with open(self.manifest_file, 'a') as f:
+            f.write(json.dumps(record, sort_keys=True) + '\n')
+
+    def save(self):
+        """Function: save, compact the manifest to one record per file"""
+
+        if not self.records:
+            return
+        temp_file = '{0}.tmp'.format(self.manifest_file)
+        with open(temp_file, 'w') as f:
+            for key in sorted(self.records):
+                f.write(json.dumps(self.records[key], sort_keys=True) + '\n')
+        # os.replace is atomic on both posix and windows, Python2.7 only has os.rename
+        getattr(os, 'replace', os.rename)(temp_file, self.manifest_file)
+
+    @classmethod
+    def get_fingerprint(cls, csv_object, file_name, offset):
+        """Function: get_fingerprint
+
+        :param csv_object: the CSVObject
+        :param file_name: the file name
+        :param offset: the exported byte offset
+        :return return (prefix_md5, tail_md5): the md5 of the file beginning, which has the header,
+            and the md5 of the bytes just before the offset
+        """
+
+        prefix_md5 = csv_object.get_file_md5(file_name, 0, min(cls.prefix_size, offset))
+        tail_md5 = csv_object.get_file_md5(file_name, max(0, offset - cls.tail_size), offset)
+
+        return prefix_md5, tail_md5
@@ -0,0 +1,120 @@
+import re
+
+
+class MatchObject(object):
+    """MatchObject: the match or filter rule, compiled once per csv file"""
+
+    backreference_pattern = re.compile(r'\\[1-9]|\(\?P=')
+
+    def __init__(self, columns, by_string, by_regex, check_type='match', csv_file_length=0):
+        """Function: __init__
+
+        :param columns: the columns need to be checked
+        :param by_string: check columns by string
+        :param by_regex: check columns by regex, case insensitive
+        :param check_type: match or filter (default match)
+            match: all the columns match, then match
+            filter: any one of the columns matches, then match
+        :param csv_file_length: the csv file length, the filter count is counted down from it (default 0)
+        """
+
+        self.columns = list(columns or [])
+        self.by_string = set(by_string or [])
+        self.by_regex = self.compile_regex(by_regex)
+        self.check_type = check_type
+        self.csv_file_length = csv_file_length
+        self.hits = dict((column, 0) for column in self.columns)
+
+    @classmethod
+    def compile_regex(cls, patterns):
+        """Function: compile_regex
+
+        :param patterns: the regex list
+        :return return the search function of the combined regex, None if no regex.
+            The regex with back reference, or could not be combined, is searched one by one
+        """
+
+        if not patterns:
+            return None
+
+        combined = '|'.join('(?:{0})'.format(pattern) for pattern in patterns)
+        if not cls.backreference_pattern.search(combined):
+            try:
+                return re.compile(combined, re.IGNORECASE).search
+            except re.error:
+                pass
+
+        compiled = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        return lambda value: any(regex.search(value) for regex in compiled)
+
+    @property
+    def count(self):
+        """Function: count
+
+        :return return the count of each column: the match hits, or the csv file length minus the filter hits
+        """
+
+        if self.check_type == 'filter':
+            return dict((column, self.csv_file_length - hits) for column, hits in self.hits.items())
+        return dict(self.hits)
+
+    def check_columns(self, columns, size):
+        """Function: check_columns, check the rows by the columns, the same as check row by row
+
+        :param columns: the column dict, the value is the text list of the column, like str(value) in check
+        :param size: the rows count
+        :return return the check status list of the rows
+        """
+
+        statuses = list()
+        for column in self.columns:
+            if column not in columns:
+                continue
+
+            # Check string, regex
+            status = [value in self.by_string for value in columns[column]]
+            if self.by_regex is not None:
+                status = [hit or bool(self.by_regex(value)) for hit, value in zip(status, columns[column])]
+            self.hits[column] += sum(status)
+            statuses.append(status)
+
+        # Return status
+        if not statuses:
+            return [False] * size
+        if self.check_type == 'filter':
+            # If filter type: check any match
+            return [any(row_statuses) for row_statuses in zip(*statuses)]
+        # Default match: check all match
+        return [all(row_statuses) for row_statuses in zip(*statuses)]
+
+    def check(self, row):
+        """Function: check
+
+        :param row: the csv row dict
+        :return return the check status of the row
+        """
+
+        statuses = list()
+        for column in self.columns:
+            if column not in row:
+                continue
+
+            # Check string, regex
+            value = row[column]
+            try:
+                value = str(value)
+            except (UnicodeDecodeError, UnicodeEncodeError):
+                value = value.encode('utf-8')
+            status = value in self.by_string or (self.by_regex is not None and bool(self.by_regex(value)))
+            if status:
+                self.hits[column] += 1
+            statuses.append(status)
+
+        # Return status
+        if not statuses:
+            return False
+        if self.check_type == 'filter':
+            # If filter type: check any match
+            return any(statuses)
+        # Default match: check all match
+        return all(statuses)
@@ -0,0 +1,154 @@
+from bisect import bisect_left
+import collections
+import json
+import os
+
+
+class MetricsObject(object):
+    """MetricsObject: the counters and latency histograms of the export stages, per csv file and per run
+
+    The stages are:
+    charset_detection, header_type_inference (parse the rows for the header and the column types),
+    hash_count (hash and count the rest of the file), match_filter, timestamp, serialization (from the parsing to
+    the line protocol batch), compress (gzip the batch, the bytes are before the compression) and write (compress
+    and post the batch to influx, or queue it with max_in_flight).
+    Each stage has the count of the observations, the items (rows or points), the bytes, the seconds and the
+    latency histogram of the observations. The scan stages are observed per file, the others per batch.
+    """
+
+    metric_prefix = 'export_csv_to_influx'
+    stages = ['charset_detection', 'header_type_inference', 'hash_count', 'match_filter', 'timestamp',
+              'serialization', 'compress', 'write']
+    buckets = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0]
+    formats = ['json', 'prometheus']
+
+    def __init__(self):
+        self.counters = collections.OrderedDict([('files', 0), ('skipped_files', 0), ('rows', 0), ('points', 0)])
+        self.stage_metrics = collections.OrderedDict((stage, self.new_stage_metrics()) for stage in self.stages)
+        self.files = collections.OrderedDict()
+
+    @classmethod
+    def new_stage_metrics(cls):
+        """Function: new_stage_metrics
+
+        :return return the empty stage metrics dict: count, items, bytes, seconds and the histogram, which is
+            the observations count of each bucket, not cumulative, the last one is +Inf
+        """
+
+        return {'count': 0, 'items': 0, 'bytes': 0, 'seconds': 0.0, 'histogram': [0] * (len(cls.buckets) + 1)}
+
+    def observe(self, stage, seconds, items=0, data_bytes=0):
+        """Function: observe
+
+        :param stage: the stage
+        :param seconds: the latency in seconds
+        :param items: the rows or points processed (default 0)
+        :param data_bytes: the bytes processed (default 0)
+        """
+
+        stage_metrics = self.stage_metrics[stage]
+        stage_metrics['count'] += 1
+        stage_metrics['items'] += items
+        stage_metrics['bytes'] += data_bytes
+        stage_metrics['seconds'] += seconds
+        stage_metrics['histogram'][bisect_left(self.buckets, seconds)] += 1
+
+    def to_dict(self):
+        """Function: to_dict
+
+        :return return the metrics dict: the counters and the stages, which could be merged by merge
+        """
+
+        return {'counters': dict(self.counters),
+                'stages': dict((stage, dict(stage_metrics, histogram=list(stage_metrics['histogram'])))
+                               for stage, stage_metrics in self.stage_metrics.items())}
+
+    def merge(self, metrics):
+        """Function: merge
+
+        :param metrics: the metrics dict from to_dict, like: the metrics of the csv file exported in the worker
+        """
+
+        for key, value in metrics['counters'].items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for stage, stage_metrics in metrics['stages'].items():
+            target = self.stage_metrics.setdefault(stage, self.new_stage_metrics())
+            for key in ('count', 'items', 'bytes', 'seconds'):
+                target[key] += stage_metrics[key]
+            target['histogram'] = [x + y for x, y in zip(target['histogram'], stage_metrics['histogram'])]
+
+    def add_file(self, csv_file, metrics):
+        """Function: add_file, save the metrics of the csv file, and merge it to the run
+
+        :param csv_file: the csv file
+        :param metrics: the metrics dict of the csv file, from to_dict
+        """
+
+        self.files[csv_file] = metrics
+        self.merge(metrics)
+
+    def dumps_json(self):
+        """Function: dumps_json
+
+        :return return the json text: the run metrics, and the metrics of each csv file
+        """
+
+        run = self.to_dict()
+        run['buckets'] = self.buckets
+
+        return json.dumps({'run': run, 'files': self.files}, indent=2, sort_keys=True)
+
+    def dumps_prometheus(self):
+        """Function: dumps_prometheus
+
+        :return return the text in the prometheus exposition format, for the node exporter textfile collector.
+            The histograms are of the run, and the seconds and items of each csv file are labeled by the file
+        """
+
+        prefix = self.metric_prefix
+        lines = list()
+        for key, value in self.counters.items():
+            lines.append('# TYPE {0}_{1}_total counter'.format(prefix, key))
+            lines.append('{0}_{1}_total {2}'.format(prefix, key, value))
+
+        lines.append('# HELP {0}_stage_seconds The latency of the export stage in seconds'.format(prefix))
+        lines.append('# TYPE {0}_stage_seconds histogram'.format(prefix))
+        for stage, stage_metrics in self.stage_metrics.items():
+            cumulative = 0
+            for bucket, count in zip(self.buckets + ['+Inf'], stage_metrics['histogram']):
+                cumulative += count
+                lines.append('{0}_stage_seconds_bucket{{stage="{1}",le="{2}"}} {3}'.format(prefix, stage, bucket,
+                                                                                         cumulative))
+            lines.append('{0}_stage_seconds_sum{{stage="{1}"}} {2!r}'.format(prefix, stage, stage_metrics['seconds']))
+            lines.append('{0}_stage_seconds_count{{stage="{1}"}} {2}'.format(prefix, stage, stage_metrics['count']))
+        for key in ('items', 'bytes'):
+            lines.append('# TYPE {0}_stage_{1}_total counter'.format(prefix, key))
+            for stage, stage_metrics in self.stage_metrics.items():
+                lines.append('{0}_stage_{1}_total{{stage="{2}"}} {3}'.format(prefix, key, stage, stage_metrics[key]))
+
+        for key in ('seconds', 'items'):
+            lines.append('# TYPE {0}_file_stage_{1} gauge'.format(prefix, key))
+            for csv_file, metrics in self.files.items():
+                label = csv_file.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                for stage, stage_metrics in metrics['stages'].items():
+                    lines.append('{0}_file_stage_{1}{{file="{2}",stage="{3}"}} {4!r}'.format(prefix,
+                                                                                         key,
+                                                                                         label,
+                                                                                         stage,
+                                                                                         stage_metrics[key]))
+
+        return '\n'.join(lines) + '\n'
+
+    def save(self, metrics_file, metrics_format='json'):
+        """Function: save, write to the temp file and rename, so the reader never sees the partial file
+
+        :param metrics_file: the metrics file
+        :param metrics_format: json or prometheus (default json)
+        """
+
+        text = self.dumps_prometheus() if metrics_format == 'prometheus' else self.dumps_json()
+        temp_file = '{0}.tmp'.format(metrics_file)
+        with open(temp_file, 'w') as f:
+            f.write(text)
+        # os.replace is atomic on both posix and windows, Python2.7 only has os.rename
+        getattr(os, 'replace', os.rename)(temp_file, metrics_file)
@@ -0,0 +1,219 @@
+import collections
+import threading
+import cProfile
+import pstats
+import signal
+import sys
+import os
+
+
+class ProfileObject(object):
+    """ProfileObject: run the function under the profiler, save the stats file, and report the top modules and
+    functions by the self time
+
+    The profilers are:
+    cprofile: the deterministic profiler, the stats file could be read by: python -m pstats
+    sample: the sampling profiler by the SIGALRM interval timer, or by a background thread where SIGALRM is not
+    available, see SamplerObject. It has lower overhead on the hot path, the stats file is the folded stacks,
+    which could be read by flamegraph.pl or speedscope
+    """
+
+    profilers = ['cprofile', 'sample']
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def __init__(self, stats_file, profiler='cprofile', top=20, interval=0.001, stderr=False):
+        """Function: __init__
+
+        :param stats_file: the stats file
+        :param profiler: cprofile or sample (default cprofile)
+        :param top: the top N modules and functions in the report (default 20)
+        :param interval: the sampling interval in seconds of the sample profiler (default 0.001)
+        :param stderr: print the report to stderr, like: the line protocol is written to stdout (default False)
+        """
+
+        if profiler not in self.profilers:
+            error_message = 'Error: The profiler should be one of {0}, current is: {1}'.format(self.profilers,
+                                                                                              profiler)
+            sys.exit(error_message)
+        try:
+            self.top = int(top)
+        except ValueError:
+            sys.exit('Error: The profile top should be int, current is: {0}'.format(top))
+
+        self.stats_file = stats_file
+        self.profiler = profiler
+        self.interval = interval
+        self.stderr = stderr
+        self._module_names = dict()
+
+    def get_module_name(self, file_name):
+        """Function: get_module_name
+
+        :param file_name: the source file name of the function
+        :return return the module to group by, like: ExportCsvToInflux.csv_object, influxdb_client, requests.
+            The built-in function is grouped to builtins
+        """
+
+        module_name = self._module_names.get(file_name)
+        if module_name is not None:
+            return module_name
+
+        if file_name == '~' or file_name.startswith('<'):
+            module_name = 'builtins'
+        else:
+            path = os.path.abspath(file_name)
+            if os.path.dirname(path) == self.package_dir:
+                module_name = 'ExportCsvToInflux.{0}'.format(os.path.splitext(os.path.basename(path))[0])
+            else:
+                # The top level package or module, by the longest matched sys.path
+                roots = [os.path.abspath(root) for root in sys.path if root and path.startswith(os.path.abspath(root))]
+                relative = os.path.relpath(path, max(roots, key=len)) if roots else os.path.basename(path)
+                module_name = os.path.splitext(relative.split(os.sep)[0])[0]
+        self._module_names[file_name] = module_name
+
+        return module_name
+
+    def run(self, function, *args, **kwargs):
+        """Function: run, the stats are saved and reported even if the function exits
+
+        :param function: the function to profile
+        :param args: the function args
+        :param kwargs: the function kwargs
+        :return return the function return
+        """
+
+        if self.profiler == 'sample':
+            sampler = SamplerObject(self.interval)
+            sampler.start()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                sampler.stop()
+                self.__save_samples(sampler)
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.disable()
+            self.__save_cprofile(profile)
+
+    def __save_cprofile(self, profile):
+        """Private Function: save the cprofile stats, and report by the self time"""
+
+        profile.dump_stats(self.stats_file)
+        functions = dict()
+        for (file_name, line, name), (_, calls, self_seconds, _, _) in pstats.Stats(profile).stats.items():
+            function = '{0}:{1}:{2}'.format(self.get_module_name(file_name), name, line)
+            seconds, total_calls = functions.get(function, (0.0, 0))
+            functions[function] = (seconds + self_seconds, total_calls + calls)
+        self.report(functions, 'calls')
+
+    def __save_samples(self, sampler):
+        """Private Function: save the folded stacks, and report by the self samples"""
+
+        functions = dict()
+        with open(self.stats_file, 'w') as f:
+            for stack, samples in sorted(sampler.stacks.items()):
+                frames = ['{0}:{1}:{2}'.format(self.get_module_name(file_name), name, line)
+                          for file_name, name, line in stack]
+                f.write('{0} {1}\n'.format(';'.join(frames), samples))
+                seconds, total_samples = functions.get(frames[-1], (0.0, 0))
+                functions[frames[-1]] = (seconds + samples * sampler.interval, total_samples + samples)
+        self.report(functions, 'samples')
+
+    def report(self, functions, count_name):
+        """Function: report, print the top modules and functions by the self time
+
+        :param functions: the dict of the function (module:name:line) and (self seconds, count)
+        :param count_name: the name of the count, like: calls or samples
+        """
+
+        modules = collections.defaultdict(lambda: [0.0, 0])
+        for function, (seconds, count) in functions.items():
+            module = modules[function.split(':', 1)[0]]
+            module[0] += seconds
+            module[1] += count
+        total = sum(seconds for seconds, _ in functions.values()) or 1.0
+
+        stdout = sys.stdout
+        if self.stderr:
+            sys.stdout = sys.stderr
+        try:
+            print('Info: Saved the {0} stats to {1}, {2:.2f} s in total'.format(self.profiler, self.stats_file, total))
+            for title, items in (('modules', modules), ('functions', functions)):
+                print('Info: Top {0} {1} by the self time:'.format(self.top, title))
+                print('{0:>10} {1:>7} {2:>12}  {3}'.format('seconds', '%', count_name, title[:-1]))
+                for name, (seconds, count) in sorted(items.items(), key=lambda item: -item[1][0])[:self.top]:
+                    print('{0:>10.3f} {1:>6.1%} {2:>12}  {3}'.format(seconds, seconds / total, count, name))
+        finally:
+            sys.stdout = stdout
+
+
+class SamplerObject(object):
+    """SamplerObject: sample the stack of the thread, count the samples by the stack
+
+    The main thread is sampled by the SIGALRM interval timer, whose handler runs in the sampled thread, so the stack
+    is where the time goes. Otherwise, like on Windows, by a background thread, which only samples when the sampled
+    thread releases the GIL, so the stacks are biased to the io.
+    """
+
+    def __init__(self, interval=0.001, thread_id=None):
+        """Function: __init__
+
+        :param interval: the sampling interval in seconds (default 0.001)
+        :param thread_id: the thread to sample (default None, which means the current thread)
+        """
+
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.current_thread().ident
+        self.stacks = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._handler = None
+
+    def start(self):
+        """Function: start"""
+
+        main_thread_id = getattr(threading, 'main_thread', threading.current_thread)().ident
+        if hasattr(signal, 'setitimer') and self.thread_id == main_thread_id == threading.current_thread().ident:
+            self._handler = signal.signal(signal.SIGALRM, self.__on_signal)
+            signal.setitimer(signal.ITIMER_REAL, self.interval, self.interval)
+        else:
+            self._thread = threading.Thread(target=self.__sample)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Function: stop"""
+
+        if self._handler is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._handler)
+            self._handler = None
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __on_signal(self, signum, frame):
+        """Private Function: the SIGALRM handler"""
+
+        self.__add_stack(frame)
+
+    def __sample(self):
+        """Private Function: sample until stopped"""
+
+        while not self._stopped.wait(self.interval):
+            self.__add_stack(sys._current_frames().get(self.thread_id))
+
+    def __add_stack(self, frame):
+        """Private Function: count the stack, which is from the root to the leaf frame"""
+
+        stack = list()
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+            frame = frame.f_back
+        if stack:
+            self.stacks[tuple(reversed(stack))] += 1
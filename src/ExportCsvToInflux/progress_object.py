@@ -0,0 +1,140 @@
+import datetime
+import json
+import time
+
+
+class ProgressObject(object):
+    """ProgressObject: report the export progress of the csv file at most once per interval, instead of per batch
+
+    The verbosity levels are:
+    0: no progress report
+    1: the progress at most once per interval, and the summary when the csv file is done
+    2: the progress of every batch, with the compression ratio and time of the batch, if gzip
+    The log formats are text, or json: one json object per line, for the log collector.
+    The points and bytes of the batches spooled after the failed retries are reported apart from the written ones
+    """
+
+    log_formats = ['text', 'json']
+
+    def __init__(self, interval=5.0, verbosity=1, log_format='text'):
+        """Function: __init__
+
+        :param interval: report at most once per the seconds (default 5.0)
+        :param verbosity: 0, 1 or 2 (default 1)
+        :param log_format: text or json (default text)
+        """
+
+        self.interval = interval
+        self.verbosity = verbosity
+        self.log_format = log_format
+        self.csv_file = None
+        self.total_rows = 0
+        self.rows = 0
+        self.points = 0
+        self.bytes = 0
+        self.spooled_points = 0
+        self.spooled_bytes = 0
+        self._start = 0.0
+        self._last = 0.0
+
+    def start(self, csv_file, total_rows=0):
+        """Function: start, reset the progress for the csv file
+
+        :param csv_file: the csv file
+        :param total_rows: the rows count of the csv file, for the ETA (default 0, which means unknown)
+        """
+
+        self.csv_file = csv_file
+        self.total_rows = total_rows
+        self.rows = 0
+        self.points = 0
+        self.bytes = 0
+        self.spooled_points = 0
+        self.spooled_bytes = 0
+        self._start = self._last = time.time()
+
+    def update(self, points, data_bytes, compression_ratio=None, batch_compression=None, spooled=None):
+        """Function: update, after the batch is written. The rows read is counted by the serializer to self.rows
+
+        :param points: the points written or spooled of the csv file so far
+        :param data_bytes: the bytes sent of the batch, compressed if gzip
+        :param compression_ratio: the compression ratio of all the batches, if gzip (default None)
+        :param batch_compression: the (compression ratio, compression seconds) of the batch, if gzip, reported with
+            verbosity 2 (default None)
+        :param spooled: the (points, bytes) spooled of the csv file so far (default None, which means not changed)
+        """
+
+        self.points = points
+        self.bytes += data_bytes
+        if spooled is not None:
+            self.spooled_points, self.spooled_bytes = spooled
+        if self.verbosity < 1:
+            return
+        now = time.time()
+        if self.verbosity >= 2 or now - self._last >= self.interval:
+            self._last = now
+            self.__report('progress', now, compression_ratio, batch_compression if self.verbosity >= 2 else None)
+
+    def finish(self, spooled=None):
+        """Function: finish, report the summary of the csv file
+
+        :param spooled: the (points, bytes) spooled of the csv file (default None, which means not changed)
+        """
+
+        if spooled is not None:
+            self.spooled_points, self.spooled_bytes = spooled
+        if self.verbosity >= 1 and self.csv_file is not None:
+            self.__report('done', time.time())
+        self.csv_file = None
+
+    def __report(self, event, now, compression_ratio=None, batch_compression=None):
+        """Private Function: print the progress as text or json"""
+
+        elapsed = now - self._start
+        rate = self.rows / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if event == 'progress' and self.total_rows and rate > 0:
+            eta = max(self.total_rows - self.rows, 0) / rate
+
+        if self.log_format == 'json':
+            record = {'level': 'info',
+                      'event': event,
+                      'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now)),
+                      'csv_file': self.csv_file,
+                      'rows': self.rows,
+                      'total_rows': self.total_rows,
+                      'points': self.points - self.spooled_points,
+                      'bytes': self.bytes - self.spooled_bytes,
+                      'spooled_points': self.spooled_points,
+                      'spooled_bytes': self.spooled_bytes,
+                      'elapsed_seconds': round(elapsed, 3),
+                      'rows_per_second': round(rate, 1),
+                      'eta_seconds': round(eta, 1) if eta is not None else None}
+            if compression_ratio is not None:
+                record['compression_ratio'] = round(compression_ratio, 2)
+            if batch_compression is not None:
+                record['batch_compression_ratio'] = round(batch_compression[0], 2)
+                record['batch_compression_seconds'] = round(batch_compression[1], 6)
+            print(json.dumps(record, sort_keys=True))
+            return
+
+        rows = '{0}'.format(self.rows)
+        if self.total_rows:
+            rows = '{0}/{1} ({2:.1%})'.format(self.rows, self.total_rows, self.rows / float(self.total_rows))
+        message = '{0} rows read, {1} points written, {2} bytes sent'.format(rows,
+                                                                          self.points - self.spooled_points,
+                                                                          self.bytes - self.spooled_bytes)
+        if self.spooled_points or self.spooled_bytes:
+            message += ', {0} points ({1} bytes) spooled'.format(self.spooled_points, self.spooled_bytes)
+        message += ', {0:.0f} rows/s'.format(rate)
+        if event == 'done':
+            print('Info: Exported {0}: {1}, in {2:.2f} s'.format(self.csv_file, message, elapsed))
+            return
+        if eta is not None:
+            message += ', ETA {0}'.format(datetime.timedelta(seconds=int(eta)))
+        if compression_ratio is not None:
+            message += ', compression ratio {0:.2f}'.format(compression_ratio)
+        if batch_compression is not None:
+            message += ', batch compression ratio {0:.2f} in {1:.2f} ms'.format(batch_compression[0],
+                                                                                 batch_compression[1] * 1000)
+        print('Info: Exporting {0}: {1}'.format(self.csv_file, message))
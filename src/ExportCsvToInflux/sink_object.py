@@ -0,0 +1,91 @@
+import gzip
+import sys
+
+
+class SinkObject(object):
+    """SinkObject: write the line protocol batches to the file or stdout instead of influx
+
+    It has the same write, flush and close as WriterObject, so the exporter writes the batches in the same way.
+    The file is overwritten, and gzip compressed if the file name ends with .gz or compress is True,
+    the file could be loaded later, like: influx write --file, or curl --data-binary.
+    """
+
+    def __init__(self, output, compress=False):
+        """Function: __init__
+
+        :param output: the output file name, - means stdout, and the messages are printed to stderr meanwhile
+        :param compress: gzip compress the output (default False, the output file name ends with .gz is gzip
+            compressed as well)
+        """
+
+        self.output = output
+        self.gzip = compress or output.endswith('.gz')
+        self.compress = False
+        self.spooled = 0
+        self.spooled_points = 0
+        self.spooled_bytes = 0
+        self.error = None
+        self.bytes = 0
+        self._stdout = None
+        if output == '-':
+            self._stdout = sys.stdout
+            sys.stdout = sys.stderr
+            stream = getattr(self._stdout, 'buffer', self._stdout)
+            self.file = gzip.GzipFile(fileobj=stream, mode='wb') if self.gzip else stream
+        else:
+            try:
+                self.file = gzip.open(output, 'wb') if self.gzip else open(output, 'wb')
+            except (IOError, OSError) as e:
+                sys.exit('Error: Failed to open the output {0}: {1}'.format(output, e))
+
+    def write(self, data, points=None):
+        """Function: write
+
+        :param data: the line protocol bytes
+        :param points: the points of the batch, not used, like WriterObject.write (default None)
+        :return return True if written, False if this or any previous batch failed
+        """
+
+        if self.error is not None:
+            return False
+        try:
+            self.file.write(data)
+            self.bytes += len(data)
+        except (IOError, OSError) as e:
+            self.error = e
+
+        return self.error is None
+
+    def flush(self):
+        """Function: flush
+
+        :return return True if all the batches written, else False
+        """
+
+        if self.error is None:
+            try:
+                self.file.flush()
+            except (IOError, OSError) as e:
+                self.error = e
+
+        return self.error is None
+
+    def close(self):
+        """Function: close, the stdout is flushed but not closed
+
+        :return return True if all the batches written, else False
+        """
+
+        try:
+            if self._stdout is None or self.gzip:
+                self.file.close()
+            if self._stdout is not None:
+                getattr(self._stdout, 'buffer', self._stdout).flush()
+        except (IOError, OSError) as e:
+            self.error = self.error or e
+        finally:
+            if self._stdout is not None:
+                sys.stdout = self._stdout
+                self._stdout = None
+
+        return self.error is None
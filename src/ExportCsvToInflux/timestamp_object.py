@@ -0,0 +1,219 @@
+from pytz.exceptions import UnknownTimeZoneError
+from decimal import InvalidOperation
+from bisect import bisect_right
+from decimal import Decimal
+from pytz import timezone
+import datetime
+import re
+import sys
+
+
+class TimestampObject(object):
+    """TimestampObject: convert the csv time to the influx timestamp in nanoseconds"""
+
+    epoch_naive = datetime.datetime.utcfromtimestamp(0)
+    epoch_pattern = re.compile(r'0*([1-9][0-9]*)(?:\.([0-9]*))?\Z')
+    epoch_units = {10: 's', 13: 'ms', 16: 'us', 19: 'ns'}
+    fixed_format_pattern = re.compile(r'%Y([-/])%m\1%d(?:([ T])%H:%M:%S(\.%f)?)?(Z?)\Z')
+
+    def __init__(self, time_format='%Y-%m-%d %H:%M:%S', time_zone='UTC', kind=None):
+        self.time_format = time_format
+        self.time_zone = time_zone
+        self.kind = kind
+        self.datetime_pattern = self.compile_fixed_format(time_format)
+        self._tz = None
+        self._period = None
+
+    @classmethod
+    def compile_fixed_format(cls, time_format):
+        """Function: compile_fixed_format
+
+        :param time_format: the time format
+        :return return the fixed layout regex of the time format, None if the format is not fixed layout.
+            The fixed layout is like: %Y-%m-%d, %Y/%m/%d %H:%M:%S, %Y-%m-%dT%H:%M:%S.%f, %Y-%m-%dT%H:%M:%SZ
+        """
+
+        match = cls.fixed_format_pattern.match(time_format)
+        if match is None:
+            return None
+
+        date_separator, time_separator, fraction, suffix = match.groups()
+        pattern = '([0-9]{{4}}){0}([0-9]{{2}}){0}([0-9]{{2}})'.format(re.escape(date_separator))
+        if time_separator:
+            pattern += '{0}([0-9]{{2}}):([0-9]{{2}}):([0-9]{{2}})'.format(re.escape(time_separator))
+        if fraction:
+            pattern += r'\.([0-9]{1,6})'
+        pattern += re.escape(suffix) + r'\Z'
+
+        return re.compile(pattern)
+
+    @property
+    def tz(self):
+        """Function: tz
+
+        :return return the time zone
+        """
+
+        if self._tz is None:
+            try:
+                self._tz = timezone(self.time_zone)
+            except UnknownTimeZoneError:
+                error_message = 'Error: Unknown time zone: {0}'.format(self.time_zone)
+                sys.exit(error_message)
+        return self._tz
+
+    def detect(self, value):
+        """Function: detect
+
+        :param value: the time value
+        :return return the time kind: epoch_s, epoch_ms, epoch_us, epoch_ns, epoch or datetime
+        """
+
+        match = self.epoch_pattern.match(value)
+        if match:
+            unit = self.epoch_units.get(len(match.group(1)))
+            return 'epoch_{0}'.format(unit) if unit else 'epoch'
+        return 'datetime'
+
+    def convert(self, value):
+        """Function: convert
+
+        The time kind is detected from the first value, then the value is converted by the kind parser.
+        The value which the parser does not expect is converted by Decimal or datetime.strptime.
+
+        :param value: the time value, the pure timestamp or the time with time_format.
+            With the kind timestamp, the value is the int timestamp in nanoseconds already, like: the parquet
+            timestamp column
+        :return return the timestamp in nanoseconds
+        """
+
+        if self.kind is None:
+            self.kind = self.detect(value)
+            print('Info: The time is detected as {0}, e.g.: {1}'.format(self.kind, value))
+
+        try:
+            if self.kind == 'timestamp':
+                return int(value)
+            if self.kind.startswith('epoch'):
+                return self.__convert_epoch(value)
+            if self.datetime_pattern is not None:
+                return self.__convert_fixed_format(value)
+        except ValueError:
+            pass
+
+        return self.__convert_any(value)
+
+    def get_utc_offset(self, datetime_naive):
+        """Function: get_utc_offset
+
+        :param datetime_naive: the local naive datetime
+        :return return (offset, period): the utc offset, and the local time period (start, end) which has the same
+            utc offset, the period is None if unknown, like near the transition
+        """
+
+        offset = self.__utc_offset(datetime_naive)
+        period = self._period
+        if period is None or not period[0] <= datetime_naive < period[1]:
+            return offset, None
+
+        return offset, period[:2]
+
+    def __convert_epoch(self, value):
+        """Private Function: convert the pure timestamp, pad to 19 digits as nanoseconds"""
+
+        match = self.epoch_pattern.match(value)
+        if match is None:
+            raise ValueError(value)
+        digits = match.group(1) + (match.group(2) or '')
+        if len(digits) >= 19:
+            return int(digits[:19])
+        return int(digits) * 10 ** (19 - len(digits))
+
+    def __convert_fixed_format(self, value):
+        """Private Function: convert the fixed layout time"""
+
+        match = self.datetime_pattern.match(value)
+        if match is None:
+            raise ValueError(value)
+        groups = match.groups()
+        if len(groups) == 7:
+            groups = groups[:6] + (groups[6].ljust(6, '0'),)
+        datetime_naive = datetime.datetime(*[int(group) for group in groups])
+
+        return self.__datetime_to_timestamp(datetime_naive)
+
+    def __convert_any(self, value):
+        """Private Function: convert the pure timestamp by Decimal, or the time by datetime.strptime"""
+
+        try:
+            # raise if not posix-time-like
+            timestamp_decimal = Decimal(value)
+            timestamp_str = str(timestamp_decimal)
+            timestamp_remove_decimal = int(
+                str(timestamp_str).replace('.', '')
+            )
+            # add zeros to convert to nanoseconds: influxdb time is 19 digital length
+            timestamp_influx = '{:<019d}'.format(timestamp_remove_decimal)
+            timestamp_influx = timestamp_influx[:19]  # deal with length > 19 timestamp
+            timestamp = int(timestamp_influx)
+        except (ValueError, InvalidOperation):
+            try:
+                datetime_naive = datetime.datetime.strptime(value, self.time_format)
+                if datetime_naive.tzinfo is not None:
+                    raise ValueError('Not naive datetime: {0}'.format(value))
+                timestamp = self.__datetime_to_timestamp(datetime_naive)
+            except (TypeError, ValueError):
+                error_message = 'Error: Unexpected time with format: {0}, {1}'.format(value, self.time_format)
+                sys.exit(error_message)
+
+        return timestamp
+
+    def __datetime_to_timestamp(self, datetime_naive):
+        """Private Function: convert the local naive datetime to the timestamp, in milliseconds precision"""
+
+        delta = datetime_naive - self.__utc_offset(datetime_naive) - self.epoch_naive
+        return int(delta.total_seconds() * 1000) * 1000000
+
+    def __utc_offset(self, datetime_naive):
+        """Private Function: get the utc offset of the local naive datetime
+
+        The offset is cached for the transition period of the time zone, and only looked up again
+        when the datetime is out of the period, or near the period boundary.
+        """
+
+        period = self._period
+        if period is not None and period[0] <= datetime_naive < period[1]:
+            return period[2]
+
+        offset = self.tz.localize(datetime_naive).utcoffset()
+        self._period = self.__transition_period(datetime_naive, offset)
+
+        return offset
+
+    def __transition_period(self, datetime_naive, offset):
+        """Private Function: get the local time period (start, end, offset) which has the same utc offset"""
+
+        transition_times = getattr(self.tz, '_utc_transition_times', None)
+        transition_info = getattr(self.tz, '_transition_info', None)
+        if not transition_times or not transition_info:
+            # Static time zone: the offset never changes
+            return datetime.datetime.min, datetime.datetime.max, offset
+
+        i = bisect_right(transition_times, datetime_naive - offset) - 1
+        if i < 0 or transition_info[i][0] != offset:
+            return None
+
+        # The period boundary is moved by the offset change, so the ambiguous or missing local time is excluded
+        start = datetime.datetime.min
+        end = datetime.datetime.max
+        try:
+            if i > 0:
+                start = transition_times[i] + max(offset, transition_info[i - 1][0])
+            if i + 1 < len(transition_times):
+                end = transition_times[i + 1] + min(offset, transition_info[i + 1][0])
+        except OverflowError:
+            return None
+        if not start <= datetime_naive < end:
+            return None
+
+        return start, end, offset
@@ -0,0 +1,127 @@
+from .csv_object import CSVObject
+import time
+import os
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None  # Not linux, or inotify_simple not installed: polling
+
+
+class WatcherObject(object):
+    """WatcherObject: watch the csv file or directory, and yield the new and changed csv files
+
+    The changes are watched by inotify if inotify_simple is installed (Linux only), else by polling the file
+    size and modified time. The watch starts when the object is created, so the changes meanwhile are not missed.
+    """
+
+    def __init__(self, csv_file, interval=5.0, match_suffix='.csv', filter_pattern='_influx.csv'):
+        """Function: __init__
+
+        :param csv_file: the csv file or directory
+        :param interval: polling: the seconds between the polls. inotify: the seconds to collect more events
+            after the first one, so the file being written is exported once (default 5.0)
+        :param match_suffix: match the file suffix, use comma to separate, only string, not support regex
+        :param filter_pattern: filter the files, only string, not support regex
+        """
+
+        self.csv_file = csv_file
+        self.interval = interval
+        self.match_suffix = match_suffix
+        self.filter_pattern = filter_pattern
+        self.inotify = None
+        self.watch_dirs = dict()
+        self.snapshot = dict()
+        if INotify is not None:
+            try:
+                self.inotify = INotify()
+                self.mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.MODIFY | flags.CREATE
+                if os.path.isdir(csv_file):
+                    for root, _, _ in os.walk(csv_file):
+                        self.__add_watch(root)
+                else:
+                    self.__add_watch(os.path.dirname(os.path.abspath(csv_file)))
+            except OSError as e:
+                # Like: the inotify watches limit reached
+                print('Warning: Failed to watch by inotify, fall back to polling: {0}'.format(e))
+                self.inotify = None
+        if self.inotify is None:
+            self.snapshot = self.__take_snapshot()
+        print('Info: Watching {0} by {1}'.format(csv_file, 'inotify' if self.inotify else 'polling'))
+
+    def __add_watch(self, directory):
+        """Private Function: watch the directory by inotify"""
+
+        wd = self.inotify.add_watch(directory, self.mask)
+        self.watch_dirs[wd] = directory
+
+    def __is_watched_file(self, file_name):
+        """Private Function: check the file is the csv file to export"""
+
+        if os.path.isfile(self.csv_file):
+            return os.path.abspath(file_name) == os.path.abspath(self.csv_file)
+        return CSVObject.match_file(file_name, self.match_suffix, self.filter_pattern)
+
+    def __take_snapshot(self):
+        """Private Function: the size and modified time of the csv files"""
+
+        snapshot = dict()
+        for csv_file_item in CSVObject.search_files_in_dir(self.csv_file, self.match_suffix, self.filter_pattern):
+            try:
+                stat = os.stat(csv_file_item)
+            except OSError:
+                continue
+            snapshot[csv_file_item] = (stat.st_size, stat.st_mtime)
+
+        return snapshot
+
+    def __poll(self):
+        """Private Function: poll the changed csv files"""
+
+        time.sleep(self.interval)
+        snapshot = self.__take_snapshot()
+        changed = [csv_file_item for csv_file_item, stat in snapshot.items()
+                   if self.snapshot.get(csv_file_item) != stat]
+        self.snapshot = snapshot
+
+        return sorted(changed)
+
+    def __read_events(self):
+        """Private Function: read the inotify events, return the changed csv files"""
+
+        changed = set()
+        # Wake up every second, so the interrupt is handled even if the signal goes to another thread
+        for event in self.inotify.read(timeout=1000, read_delay=int(self.interval * 1000)):
+            directory = self.watch_dirs.get(event.wd)
+            if directory is None or not event.name:
+                continue
+            path = os.path.join(directory, event.name)
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO) and os.path.isdir(self.csv_file):
+                    # The files could be created before the new directory is watched
+                    for root, _, _ in os.walk(path):
+                        self.__add_watch(root)
+                    changed.update(CSVObject.search_files_in_dir(path, self.match_suffix, self.filter_pattern))
+                continue
+            if self.__is_watched_file(path) and os.path.isfile(path):
+                changed.add(path)
+
+        return sorted(changed)
+
+    def watch(self):
+        """Function: watch
+
+        :return return the generator, which yields the list of the new and changed csv files, forever
+        """
+
+        while True:
+            changed = self.__read_events() if self.inotify else self.__poll()
+            if changed:
+                yield changed
+
+    def close(self):
+        """Function: close, stop watching"""
+
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
@@ -0,0 +1,372 @@
+from requests.adapters import HTTPAdapter
+from requests import ConnectionError
+from glob import glob
+import threading
+import requests
+import random
+import gzip
+import json
+import time
+import io
+import os
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue  # Python2.7
+
+
+class WriterObject(object):
+    """WriterObject: the long-lived line protocol writer, shared by all batches and files
+
+    The batches are posted to /write (influx 0.x, 1.x) or /api/v2/write (influx 2.x) over the keep-alive session.
+    With max_in_flight, the batches are posted by the background threads, so the parsing goes on meanwhile.
+    """
+
+    compress_level = 6
+    retry_max_interval = 60
+
+    def __init__(self,
+                 influxdb_url,
+                 influxdb_version='2',
+                 db_name=None,
+                 db_user=None,
+                 db_password=None,
+                 token=None,
+                 org_name=None,
+                 bucket_name=None,
+                 precision='ns',
+                 timeout=120,
+                 max_in_flight=0,
+                 compress=False,
+                 retries=3,
+                 retry_interval=1.0,
+                 spool_dir=None,
+                 verify_ssl=True,
+                 error_callback=None):
+        """Function: __init__
+
+        :param influxdb_url: the influx url, like: http://127.0.0.1:8086/
+        :param influxdb_version: the influx version (default 2)
+        :param db_name: for 0.x, 1.x only, the db name
+        :param db_user: for 0.x, 1.x only, the db user
+        :param db_password: for 0.x, 1.x only, the db password
+        :param token: for 2.x only, the influx token
+        :param org_name: for 2.x only, the org name
+        :param bucket_name: for 2.x only, the bucket name
+        :param precision: for 2.x only, the timestamp precision (default ns)
+        :param timeout: the request timeout in seconds (default 120)
+        :param max_in_flight: the max batches posted at the same time by the background threads
+            (default 0, which means the batch is posted when it is written)
+        :param compress: gzip the request body (default False)
+        :param retries: retry the transient error: timeout, connection error, 429 and 5xx (default 3)
+        :param retry_interval: the first retry interval in seconds, doubled for each retry, with jitter (default 1.0)
+        :param spool_dir: save the batch failed after the retries to the dir, and go on (default None, which means
+            the batch failed is an error)
+        :param verify_ssl: verify the server certificate for the https url (default True)
+        :param error_callback: the callback when failed to write, called with (details, data, exception),
+            details is (db_name,) for 0.x, 1.x, or (bucket_name, org_name, precision) for 2.x
+        """
+
+        self.session = requests.Session()
+        self.session.verify = verify_ssl
+        if influxdb_version.startswith('0') or influxdb_version.startswith('1'):
+            self.url = '{0}write'.format(influxdb_url)
+            self.params = {'db': db_name}
+            self.details = (db_name,)
+            self.session.auth = (db_user, db_password)
+            self.session.headers.update({'Content-Type': 'application/octet-stream'})
+        else:
+            self.url = '{0}api/v2/write'.format(influxdb_url)
+            self.params = {'org': org_name, 'bucket': bucket_name, 'precision': precision}
+            self.details = (bucket_name, org_name, precision)
+            self.session.headers.update({'Authorization': 'Token {0}'.format(token),
+                                         'Content-Type': 'text/plain; charset=utf-8'})
+        if compress:
+            self.session.headers.update({'Content-Encoding': 'gzip'})
+        self.session.mount(self.url, HTTPAdapter(pool_connections=1, pool_maxsize=max(10, max_in_flight)))
+        self.compress = compress
+        self.compression = {'batch_bytes': 0, 'batch_compressed_bytes': 0, 'batch_seconds': 0.0,
+                            'bytes': 0, 'compressed_bytes': 0, 'seconds': 0.0}
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.retry_interval = retry_interval
+        self.spool_dir = spool_dir
+        self.spooled = 0
+        self.spooled_points = 0
+        self.spooled_bytes = 0
+        self.error_callback = error_callback
+        self.error = None
+        self._spool_lock = threading.Lock()
+        self._spool_sequence = 0
+        self._queue = None
+        self._threads = list()
+
+    def write(self, data, points=None):
+        """Function: write
+
+        :param data: the line protocol bytes
+        :param points: the points of the batch, counted to spooled_points if the batch is spooled (default None,
+            which means the lines of the data)
+        :return return True if written (or queued with max_in_flight), False if this or any previous batch failed
+        """
+
+        if self.error is not None:
+            return False
+        if points is None:
+            points = data.count(b'\n') + (0 if data.endswith(b'\n') or not data else 1)
+        if self.compress:
+            data = self.__compress(data)
+        if self.max_in_flight <= 0:
+            return self.__post(data, points)
+
+        if self._queue is None:
+            self._queue = queue.Queue(maxsize=self.max_in_flight)
+            for _ in range(self.max_in_flight):
+                thread = threading.Thread(target=self.__post_queued)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        self._queue.put((data, points))
+
+        return self.error is None
+
+    def flush(self):
+        """Function: flush
+
+        :return return True if all the batches written, else False
+        """
+
+        if self._queue is not None:
+            self._queue.join()
+
+        return self.error is None
+
+    def close(self):
+        """Function: close
+
+        :return return True if all the batches written, else False
+        """
+
+        status = self.flush()
+        if self._queue is not None:
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._queue = None
+            self._threads = list()
+        self.session.close()
+
+        return status
+
+    def get_counters(self):
+        """Function: get_counters
+
+        :return return the counters dict: spooled, spooled_points, spooled_bytes, and the bytes, compressed_bytes
+            and seconds of the compression
+        """
+
+        compression = self.compression
+        return {'spooled': self.spooled,
+                'spooled_points': self.spooled_points,
+                'spooled_bytes': self.spooled_bytes,
+                'bytes': compression['bytes'],
+                'compressed_bytes': compression['compressed_bytes'],
+                'seconds': compression['seconds']}
+
+    def add_counters(self, counters):
+        """Function: add_counters, add the counters of the other writer, like the writer of the pool worker
+
+        :param counters: the counters dict from get_counters
+        """
+
+        self.spooled += counters['spooled']
+        self.spooled_points += counters['spooled_points']
+        self.spooled_bytes += counters['spooled_bytes']
+        for key in ('bytes', 'compressed_bytes', 'seconds'):
+            self.compression[key] += counters[key]
+
+    @property
+    def compression_ratio(self):
+        """Function: compression_ratio
+
+        :return return the compression ratio of the last batch and all the batches: (batch_ratio, ratio)
+        """
+
+        compression = self.compression
+        batch_ratio = compression['batch_bytes'] / float(compression['batch_compressed_bytes'] or 1)
+        ratio = compression['bytes'] / float(compression['compressed_bytes'] or 1)
+
+        return batch_ratio, ratio
+
+    def __compress(self, data):
+        """Private Function: gzip the batch, and record the size and time"""
+
+        start = time.time()
+        compressed = io.BytesIO()
+        with gzip.GzipFile(fileobj=compressed, mode='wb', compresslevel=self.compress_level) as f:
+            f.write(data)
+        compressed = compressed.getvalue()
+        seconds = time.time() - start
+
+        compression = self.compression
+        compression['batch_bytes'] = len(data)
+        compression['batch_compressed_bytes'] = len(compressed)
+        compression['batch_seconds'] = seconds
+        compression['bytes'] += len(data)
+        compression['compressed_bytes'] += len(compressed)
+        compression['seconds'] += seconds
+
+        return compressed
+
+    def __post_queued(self):
+        """Private Function: post the queued batches until None is got"""
+
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                if self.error is None:
+                    self.__post(*item)
+            finally:
+                self._queue.task_done()
+
+    def __send(self, data, headers=None, params=None):
+        """Private Function: send the batch with retries, return (exception, transient), exception is None if written.
+        The batch is sent with the params of the writer, if the params are None
+
+        The timeout, connection error, 429 and 5xx are transient, and retried with the exponential backoff and jitter
+        """
+
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = self.session.post(self.url, params=params or self.params, data=data, headers=headers,
+                                             timeout=self.timeout)
+                if 200 <= response.status_code < 300:
+                    return None, False
+                exception = requests.HTTPError('{0} {1}: {2}'.format(response.status_code,
+                                                                      response.reason,
+                                                                      response.text.strip()),
+                                               response=response)
+                transient = response.status_code == 429 or response.status_code >= 500
+                retry_after = response.headers.get('Retry-After')
+            except (ConnectionError, requests.exceptions.Timeout) as e:
+                exception = e
+                transient = True
+
+            if not transient or attempt >= self.retries:
+                return exception, transient
+
+            interval = random.uniform(0, min(self.retry_max_interval, self.retry_interval * 2 ** attempt))
+            try:
+                interval = max(interval, min(self.retry_max_interval, float(retry_after)))
+            except (TypeError, ValueError):
+                pass
+            attempt += 1
+            print('Warning: Failed to write: {0}, retry {1}/{2} in {3:.2f} s'.format(exception,
+                                                                                   attempt,
+                                                                                   self.retries,
+                                                                                   interval))
+            time.sleep(interval)
+
+    def __post(self, data, points):
+        """Private Function: post the batch, return True if written or spooled"""
+
+        exception, transient = self.__send(data)
+        if exception is None:
+            return True
+        if transient and self.spool_dir:
+            spool_file = self.__spool(data, points, exception)
+            print('Warning: Failed to write after {0} retries, spooled to {1}: {2}'.format(self.retries,
+                                                                                          spool_file,
+                                                                                          exception))
+            return True
+
+        if self.error is None:
+            self.error = exception
+            if self.error_callback:
+                self.error_callback(self.details, data, exception)
+        return False
+
+    def __spool(self, data, points, exception):
+        """Private Function: save the batch to the spool dir: the line protocol file, and the json meta file"""
+
+        with self._spool_lock:
+            self._spool_sequence += 1
+            name = '{0}-{1}-{2:06d}'.format(time.strftime('%Y%m%d%H%M%S'), os.getpid(), self._spool_sequence)
+            self.spooled += 1
+            self.spooled_points += points
+            self.spooled_bytes += len(data)
+        if not os.path.isdir(self.spool_dir):
+            try:
+                os.makedirs(self.spool_dir)
+            except OSError:
+                if not os.path.isdir(self.spool_dir):
+                    raise
+        spool_file = os.path.join(self.spool_dir, '{0}.lp'.format(name))
+        with open(spool_file, 'wb') as f:
+            f.write(data)
+        meta = {'url': self.url,
+                'params': self.params,
+                'content_encoding': 'gzip' if self.compress else None,
+                'points': points,
+                'error': str(exception),
+                'time': time.time()}
+        with open(os.path.join(self.spool_dir, '{0}.json'.format(name)), 'w') as f:
+            json.dump(meta, f)
+
+        return spool_file
+
+    def replay_spool(self, spool_dir):
+        """Function: replay_spool
+
+        Post the spooled batches in the spool dir by the spooled order, the batch is removed once written.
+        Each batch is posted to the influx of the writer, with the params it was spooled for: the db, or the org,
+        bucket and precision, a warning is printed if they are not the same as given to the writer.
+        The batch spooled for the other influx version is skipped. The replay stops at the first batch failed to write
+
+        :param spool_dir: the spool dir
+        :return return (replayed count, left count)
+        """
+
+        meta_files = sorted(glob(os.path.join(spool_dir, '*.json')))
+        replayed = 0
+        warned_targets = set()
+        for meta_file in meta_files:
+            spool_file = '{0}.lp'.format(meta_file[:-len('.json')])
+            if not os.path.exists(spool_file):
+                continue
+            with open(meta_file) as f:
+                meta = json.load(f)
+            with open(spool_file, 'rb') as f:
+                data = f.read()
+            headers = {'Content-Encoding': meta.get('content_encoding') or 'identity'}
+            params = meta.get('params') or self.params
+            if sorted(params) != sorted(self.params):
+                print('Warning: The batch was spooled for the other influx version: {0} {1}, '
+                      'skip {2}'.format(meta.get('url'), params, spool_file))
+                continue
+            # The params not given to the writer, like the db of replay_spool_to_influx, are taken from the spool
+            target = json.dumps(params, sort_keys=True)
+            changed = any(self.params[key] is not None and self.params[key] != params[key] for key in params)
+            if changed and target not in warned_targets:
+                warned_targets.add(target)
+                print('Warning: The batches were spooled for {0}, not {1}, '
+                      'replay them with the spooled {0}'.format(params, self.params))
+            exception, transient = self.__send(data, headers=headers, params=params)
+            if exception is not None:
+                self.error = exception
+                if self.error_callback:
+                    self.error_callback(self.details, data, exception)
+                return replayed, len(meta_files) - replayed
+            os.remove(spool_file)
+            os.remove(meta_file)
+            replayed += 1
+            print('Info: Replayed {0}'.format(spool_file))
+
+        return replayed, len(meta_files) - replayed
@@ -0,0 +1,19 @@
+import pytest
+import sys
+import os
+
+# Run the tests against the source tree, without installing the package
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'src'))
+sys.path.insert(0, os.path.join(root, 'benchmarks'))
+
+
+@pytest.fixture
+def fake_influx():
+    """The local fake influx, which keeps the write requests"""
+
+    from fake_influx import FakeInfluxServer
+
+    server = FakeInfluxServer(keep_writes=True).start(poll_interval=0.05)
+    yield server
+    server.stop()
@@ -0,0 +1,83 @@
+from ExportCsvToInflux import ExporterObject
+from ExportCsvToInflux import ArrowObject
+import datetime
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+rows = [(datetime.datetime(2021, 1, 1, 0, 0, i), 'h{0}'.format(i % 3) if i % 4 else None, i * 10, i / 4.0,
+         'name {0}'.format(i) if i % 5 else None, i % 2 == 0)
+        for i in range(25)]
+columns = ['timestamp', 'host', 'value', 'ratio', 'name', 'ok']
+
+
+def make_table():
+    arrays = [pa.array([row[i] for row in rows], type=data_type)
+              for i, data_type in enumerate([pa.timestamp('ns'), pa.string(), pa.int64(), pa.float64(), pa.string(),
+                                             pa.bool_()])]
+    return pa.Table.from_arrays(arrays, names=columns)
+
+
+def make_csv(csv_file):
+    lines = [','.join(columns)]
+    for row in rows:
+        values = [row[0].strftime('%Y-%m-%d %H:%M:%S')] + ['' if value is None else str(value) for value in row[1:]]
+        lines.append(','.join(values))
+    csv_file.write_text(u'\n'.join(lines) + u'\n')
+
+
+def write_ipc(file_name, table, stream=False):
+    with pa.OSFile(file_name, 'wb') as sink:
+        writer = (pa.ipc.new_stream if stream else pa.ipc.new_file)(sink, table.schema)
+        for batch in table.to_batches(max_chunksize=7):
+            writer.write_batch(batch)
+        writer.close()
+
+
+def export(tmp_path, file_name, **kwargs):
+    output = tmp_path / 'output.lp'
+    args = dict(csv_file=str(tmp_path / file_name),
+                db_measurement='demo',
+                tag_columns='host',
+                field_columns='value,ratio,name',
+                batch_size=10,
+                output=str(output))
+    args.update(kwargs)
+    ExporterObject().export_csv_to_influx(**args)
+    return output.read_text().splitlines()
+
+
+@pytest.mark.parametrize('file_name', ['demo.parquet', 'demo.arrow', 'demo.ipc'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_matches_csv(tmp_path, monkeypatch, file_name, workers):
+    monkeypatch.setattr(ArrowObject, 'batch_rows', 4)
+    table = make_table()
+    if file_name.endswith('.parquet'):
+        pq.write_table(table, str(tmp_path / file_name), row_group_size=9)
+    else:
+        write_ipc(str(tmp_path / file_name), table, stream=file_name.endswith('.ipc'))
+    make_csv(tmp_path / 'demo.csv')
+
+    expected = export(tmp_path, 'demo.csv')
+    assert len(expected) == len(rows)
+    assert export(tmp_path, file_name, workers=workers) == expected
+
+
+def test_timestamp_with_time_zone(tmp_path):
+    times = [datetime.datetime(2021, 3, 14, 1, 30), datetime.datetime(2021, 3, 14, 3, 30)]
+    table = pa.Table.from_arrays([pa.array(times, type=pa.timestamp('us', tz='America/New_York')),
+                                  pa.array([1, 2], type=pa.int32())], names=['timestamp', 'value'])
+    pq.write_table(table, str(tmp_path / 'demo.parquet'))
+
+    # The timestamp with time zone is the utc instant already
+    assert export(tmp_path, 'demo.parquet', tag_columns=None, field_columns='value') == [
+        'demo value={0}i {1}'.format(i + 1, int((time - datetime.datetime(1970, 1, 1)).total_seconds()) * 10 ** 9)
+        for i, time in enumerate(times)]
+
+
+def test_get_format():
+    assert ArrowObject.get_format('a.parquet') == 'parquet'
+    assert ArrowObject.get_format('a.PQ') == 'parquet'
+    assert ArrowObject.get_format('a.feather') == 'ipc'
+    assert ArrowObject.get_format('a.csv') is None
@@ -0,0 +1,75 @@
+from run_benchmarks import run_scenarios
+from run_benchmarks import print_result
+from run_benchmarks import run_stage
+from generate_csv import generate_csv
+from generate_csv import time_formats
+import pytest
+import csv
+import os
+
+src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+
+def read_csv(csv_file):
+    with open(str(csv_file)) as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize('time_format', sorted(time_formats))
+def test_generate_csv(tmp_path, time_format):
+    export_args = generate_csv(str(tmp_path / 'a.csv'), rows=50, columns=4, tag_columns=3, tag_cardinality=2,
+                               empty_ratio=0.5, time_format=time_format, seed=1)
+    generate_csv(str(tmp_path / 'b.csv'), rows=50, columns=4, tag_columns=3, tag_cardinality=2,
+                 empty_ratio=0.5, time_format=time_format, seed=1)
+    generate_csv(str(tmp_path / 'c.csv'), rows=50, columns=4, tag_columns=3, tag_cardinality=2,
+                 empty_ratio=0.5, time_format=time_format, seed=2)
+
+    # The same arguments generate the same csv
+    rows = read_csv(tmp_path / 'a.csv')
+    assert rows == read_csv(tmp_path / 'b.csv')
+    assert rows != read_csv(tmp_path / 'c.csv')
+    assert rows[0] == ['timestamp', 'tag_0', 'tag_1', 'tag_2', 'field_0', 'field_1', 'field_2', 'field_3']
+    assert len(rows) == 51
+    assert set(row[1] for row in rows[1:]) <= {'tag_0-0', 'tag_0-1'}
+    assert any(value == '' for row in rows[1:] for value in row[4:])
+    assert export_args == {'time_column': 'timestamp',
+                           'time_format': time_formats[time_format] or '%Y-%m-%d %H:%M:%S',
+                           'tag_columns': 'tag_0,tag_1,tag_2',
+                           'field_columns': 'field_0,field_1,field_2,field_3'}
+
+
+def test_generate_csv_unknown_time_format(tmp_path):
+    with pytest.raises(ValueError):
+        generate_csv(str(tmp_path / 'a.csv'), time_format='rfc3339')
+
+
+@pytest.mark.parametrize('stage', ['scan', 'convert', 'serialize', 'export'])
+def test_run_stage(tmp_path, fake_influx, capsys, stage):
+    csv_file = str(tmp_path / 'benchmark.csv')
+    export_args = generate_csv(csv_file, rows=100)
+    result = run_stage(stage, csv_file, fake_influx.url, export_args)
+
+    assert result['rows'] == 100
+    assert result['bytes'] == os.path.getsize(csv_file)
+    assert result['seconds'] > 0
+    assert fake_influx.lines == (100 if stage == 'export' else 0)
+
+    result.update(scenario='baseline', stage=stage)
+    print_result(result, baseline=dict(result, seconds=result['seconds'] * 2))
+    out = capsys.readouterr().out
+    assert out.startswith('baseline')
+    assert '+100.0% rows/s' in out
+
+
+def test_run_scenarios(tmp_path, monkeypatch):
+    # The stages run in the new processes, which import the package from the source tree
+    monkeypatch.setenv('PYTHONPATH', os.pathsep.join(path for path in [src, os.environ.get('PYTHONPATH')] if path))
+    results = run_scenarios(['gzip', 'influx_2'], rows=100, repeat=1, work_dir=str(tmp_path))
+
+    assert [(result['scenario'], result['stage']) for result in results] == [('gzip', 'export'),
+                                                                            ('influx_2', 'export')]
+    for result in results:
+        assert result['rows'] == result['points'] == 100
+        assert result['written_bytes'] > 0
+    # The csv file is generated once for the scenarios of the same csv arguments
+    assert os.listdir(str(tmp_path)) == ['benchmark_0.csv']
@@ -0,0 +1,88 @@
+from ExportCsvToInflux import ExporterObject
+from ExportCsvToInflux import ColumnarObject
+import datetime
+import random
+import pytest
+
+pytest.importorskip('numpy')
+
+# Around the DST transitions of America/New_York: spring forward and fall back
+start_times = [datetime.datetime(2021, 3, 14, 0, 0, 0), datetime.datetime(2021, 11, 7, 0, 0, 0)]
+
+
+def make_csv(csv_file, seed, rows=200):
+    rng = random.Random(seed)
+    lines = ['timestamp,host,region,value,ratio,name,count,load']
+    time = start_times[seed % len(start_times)]
+    for _ in range(rows):
+        time += datetime.timedelta(seconds=rng.randint(0, 180))
+        host = rng.choice(['h0', 'h1', 'h2', 'h3', 'h4', ''])
+        region = rng.choice(['"us east"', '"eu,west"', 'ap=1', ''])
+        value = rng.choice([str(rng.randint(-1000, 1000)), ''])
+        ratio = rng.choice([str(rng.randint(0, 100)), '{0:.3f}'.format(rng.uniform(-10, 10)), ''])
+        name = rng.choice(['"say ""hi"""', 'back\\slash', str(rng.randint(0, 9)), 'a b', ''])
+        count = str(rng.randint(0, 10 ** 6))
+        load = '{0:.2f}'.format(rng.uniform(0, 100))
+        lines.append(','.join([time.strftime('%Y-%m-%d %H:%M:%S'), host, region, value, ratio, name, count,
+                                load]))
+    csv_file.write_text(u'\n'.join(lines) + u'\n')
+
+
+def export(tmp_path, engine, **kwargs):
+    output = tmp_path / '{0}.lp'.format(engine)
+    args = dict(csv_file=str(tmp_path / 'demo.csv'),
+                db_measurement='demo',
+                time_column='timestamp',
+                tag_columns='host,region',
+                field_columns='value,ratio,name,count,load',
+                batch_size=7,
+                engine=engine,
+                output=str(output))
+    args.update(kwargs)
+    ExporterObject().export_csv_to_influx(**args)
+    return output.read_text().splitlines()
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('options, by_columns', [
+    ({}, True),
+    ({'force_string_columns': 'value,ratio', 'force_int_columns': 'load', 'force_float_columns': 'count'}, True),
+    # The name is not always an int, nor the empty value, the chunks fall back to row by row
+    ({'force_int_columns': 'name'}, False),
+    ({'match_columns': 'host', 'match_by_regex': 'h[0-2]'}, True),
+    ({'filter_columns': 'region,name', 'filter_by_string': 'us east,a b'}, True),
+    ({'match_columns': 'host', 'match_by_string': 'h1', 'filter_columns': 'value', 'filter_by_regex': '^-'}, True),
+    ({'time_zone': 'America/New_York'}, True),
+    ({'time_zone': 'America/New_York', 'match_columns': 'name', 'match_by_regex': '^[0-9]$',
+      'force_float_columns': 'count'}, True),
+], ids=['plain', 'force', 'force_fallback', 'match', 'filter', 'match_filter', 'time_zone', 'time_zone_match_force'])
+def test_columnar_matches_row(tmp_path, monkeypatch, seed, options, by_columns):
+    make_csv(tmp_path / 'demo.csv', seed)
+    # The small chunks, so the regular and the row by row chunks are mixed
+    monkeypatch.setattr(ColumnarObject, 'chunk_rows', 16)
+    serialize_chunk = ColumnarObject._ColumnarObject__serialize_chunk
+    columnar_chunks = list()
+
+    def count_serialize_chunk(self, fieldnames, chunk):
+        serialized = serialize_chunk(self, fieldnames, chunk)
+        columnar_chunks.append(serialized is not None)
+        return serialized
+
+    monkeypatch.setattr(ColumnarObject, '_ColumnarObject__serialize_chunk', count_serialize_chunk)
+
+    row_lines = export(tmp_path, 'row', **options)
+    assert row_lines
+    assert export(tmp_path, 'columnar', **options) == row_lines
+    assert any(columnar_chunks) is by_columns
+
+
+@pytest.mark.parametrize('value', ['9223372036854775808', '9223372036854775807', '-9223372036854775808',
+                                   '9007199254740993', '1e300'])
+def test_columnar_matches_row_int64_bound(tmp_path, value):
+    (tmp_path / 'demo.csv').write_text(u'timestamp,host,value\n2021-01-01 00:00:00,h0,1\n'
+                                       u'2021-01-01 00:00:01,h1,{0}\n'.format(value))
+    options = dict(tag_columns='host', field_columns='value')
+
+    row_lines = export(tmp_path, 'row', **options)
+    assert len(row_lines) == 2
+    assert export(tmp_path, 'columnar', **options) == row_lines
@@ -0,0 +1,20 @@
+from ExportCsvToInflux import Configuration
+import pytest
+
+
+@pytest.mark.parametrize('spool_dir, expected', [(None, None), ('None', None), ('none', None), ('spool', 'spool')])
+def test_spool_dir(tmp_path, spool_dir, expected):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,value\n')
+    conf = Configuration(csv_file=str(csv_file), db_measurement='demo', field_columns='value', spool_dir=spool_dir)
+
+    assert conf.spool_dir == expected
+
+
+@pytest.mark.parametrize('verify_ssl, expected', [(True, True), ('True', True), ('False', False), (False, False)])
+def test_verify_ssl(tmp_path, verify_ssl, expected):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,value\n')
+    conf = Configuration(csv_file=str(csv_file), db_measurement='demo', field_columns='value', verify_ssl=verify_ssl)
+
+    assert conf.verify_ssl is expected
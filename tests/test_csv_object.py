@@ -0,0 +1,119 @@
+from ExportCsvToInflux import CSVObject
+import hashlib
+import pytest
+import gzip
+import bz2
+
+contents = {
+    'plain': u'timestamp,tag,value\n2021-01-01 00:00:00,a,1\n2021-01-01 00:00:01,b,2\n',
+    'no_line_end': u'timestamp,tag,value\n2021-01-01 00:00:00,a,1\n2021-01-01 00:00:01,b,2',
+    'crlf': u'timestamp,tag,value\r\n2021-01-01 00:00:00,a,1\r\n2021-01-01 00:00:01,b,2\r\n',
+    'blank_lines': u'timestamp,tag,value\n2021-01-01 00:00:00,a,1\n\n2021-01-01 00:00:01,b,2\n\n',
+    'quoted_line_break': u'timestamp,tag,value\n2021-01-01 00:00:00,"a\nb",1\n2021-01-01 00:00:01,"c,d",2\n',
+    'header_only': u'timestamp,tag,value\n',
+}
+
+
+def scan(csv_file, delimiter=','):
+    csv_object = CSVObject(delimiter=delimiter, csv_charset='utf-8')
+    csv_scan = csv_object.scan_csv(str(csv_file), ignore_filed='timestamp', detect_charset=False)
+    return (csv_scan.lines_count, csv_scan.file_hash, csv_scan.single_line_records,
+            csv_object.get_csv_lines_count(str(csv_file)))
+
+
+@pytest.mark.parametrize('delimiter', [',', ';', '\t', '|'])
+def test_is_ascii_delimiter(delimiter):
+    assert CSVObject.is_ascii_delimiter(delimiter)
+
+
+@pytest.mark.parametrize('delimiter', [u'§', '\n', '"', ',,'])
+def test_is_not_ascii_delimiter(delimiter):
+    assert not CSVObject.is_ascii_delimiter(delimiter)
+
+
+@pytest.mark.parametrize('name', sorted(contents))
+@pytest.mark.parametrize('delimiter', [',', ';'])
+def test_mapped_scan_runs_and_matches_reader(tmp_path, monkeypatch, name, delimiter):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_bytes(contents[name].replace(u',', delimiter).encode('utf-8'))
+
+    calls = []
+    scan_file = CSVObject.scan_file
+
+    def counted_scan_file(self, *args, **kwargs):
+        calls.append(args)
+        return scan_file(self, *args, **kwargs)
+
+    monkeypatch.setattr(CSVObject, 'scan_file', counted_scan_file)
+    mapped = scan(csv_file, delimiter)
+    assert calls, 'the memory mapped scan did not run'
+
+    # The csv reader path, as the reference
+    monkeypatch.setattr(CSVObject, 'is_ascii_delimiter', staticmethod(lambda delimiter: False))
+    del calls[:]
+    assert scan(csv_file, delimiter) == mapped
+    assert not calls
+
+
+def reference_hash(hash_algorithm, data):
+    if hash_algorithm == 'xxhash':
+        return pytest.importorskip('xxhash').xxh64(data).hexdigest()
+    if hash_algorithm == 'blake2b':
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+    return hashlib.md5(data).hexdigest()
+
+
+@pytest.mark.parametrize('hash_algorithm', CSVObject.hash_algorithms)
+def test_file_hash(tmp_path, monkeypatch, hash_algorithm):
+    data = contents['quoted_line_break'].encode('utf-8') * 1000
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_bytes(data)
+    expected = reference_hash(hash_algorithm, data)
+    monkeypatch.setattr(CSVObject, 'read_buffer_size', 4096)
+    csv_object = CSVObject(csv_charset='utf-8', hash_algorithm=hash_algorithm)
+
+    assert csv_object.get_file_hash(str(csv_file)) == expected
+    assert csv_object.get_file_hash(str(csv_file), 10, 5000) == reference_hash(hash_algorithm, data[10:5000])
+    assert csv_object.get_file_md5(str(csv_file)) == hashlib.md5(data).hexdigest()
+    # The hash of the scan, by the memory mapped scan and by the csv reader
+    assert csv_object.scan_csv(str(csv_file), detect_charset=False).file_hash == expected
+    monkeypatch.setattr(CSVObject, 'is_ascii_delimiter', staticmethod(lambda delimiter: False))
+    assert csv_object.scan_csv(str(csv_file), detect_charset=False).file_hash == expected
+
+
+def test_unknown_hash():
+    with pytest.raises(SystemExit, match='The hash algorithm sha1 is not available'):
+        CSVObject.new_hash('sha1')
+
+
+def compress(suffix, data):
+    if suffix == '.gz':
+        return gzip.compress(data)
+    if suffix == '.bz2':
+        return bz2.compress(data)
+    if suffix == '.xz':
+        return pytest.importorskip('lzma').compress(data)
+    return pytest.importorskip('zstandard').ZstdCompressor().compress(data)
+
+
+@pytest.mark.parametrize('suffix', CSVObject.compressed_suffixes)
+def test_compressed_csv(tmp_path, monkeypatch, suffix):
+    data = contents['quoted_line_break'].encode('utf-8') * 1000
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_bytes(data)
+    compressed_file = tmp_path / 'demo.csv{0}'.format(suffix.upper())
+    compressed_file.write_bytes(compress(suffix, data))
+    monkeypatch.setattr(CSVObject, 'read_buffer_size', 4096)
+
+    assert CSVObject.get_compression(str(compressed_file)) == suffix
+    assert CSVObject.get_compression(str(csv_file)) is None
+    with CSVObject.open_binary(str(compressed_file)) as f:
+        assert f.read() == data
+        # The backward seek, like the range read
+        f.seek(10)
+        assert f.read(100) == data[10:110]
+    # The scan and the hash are of the decompressed bytes, the same as the plain csv file
+    assert scan(compressed_file) == scan(csv_file)
+    csv_object = CSVObject()
+    assert csv_object.get_file_hash(str(compressed_file), 10, 5000) == hashlib.md5(data[10:5000]).hexdigest()
+    assert sorted(CSVObject.search_files_in_dir(str(tmp_path))) == sorted([str(csv_file), str(compressed_file)])
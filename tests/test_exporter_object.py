@@ -0,0 +1,140 @@
+from ExportCsvToInflux import ExporterObject
+from ExportCsvToInflux import ManifestObject
+from ExportCsvToInflux import WriterObject
+import pytest
+import json
+import gzip
+import bz2
+import os
+
+
+def export(tmp_path, **kwargs):
+    output = tmp_path / 'output.lp'
+    args = dict(csv_file=str(tmp_path / 'demo.csv'),
+                db_measurement='demo',
+                time_column='timestamp',
+                tag_columns='host',
+                field_columns='value',
+                batch_size=2,
+                incremental=True,
+                manifest=str(tmp_path / 'manifest.json'),
+                output=str(output))
+    args.update(kwargs)
+    ExporterObject().export_csv_to_influx(**args)
+    return output.read_text().splitlines()
+
+
+def test_incremental_leaves_partial_last_row(tmp_path):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n2021-01-01 00:00:00,h1,1\n2021-01-01 00:00:01,h2,2')
+    assert export(tmp_path) == ['demo,host=h1 value=1i 1609459200000000000']
+
+    with csv_file.open('a') as f:
+        f.write(u'5\n2021-01-01 00:00:02,h3,3\n')
+    assert export(tmp_path) == ['demo,host=h2 value=25i 1609459201000000000',
+                                'demo,host=h3 value=3i 1609459202000000000']
+    # The manifest is json lines, the last record of the csv file wins
+    manifest = [json.loads(line) for line in (tmp_path / 'manifest.json').read_text().splitlines() if line]
+    assert manifest[-1]['lines_count'] == 3
+
+
+def test_incremental_touched_refreshes_the_manifest(tmp_path, monkeypatch):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n2021-01-01 00:00:00,h1,1\n')
+    assert export(tmp_path) == ['demo,host=h1 value=1i 1609459200000000000']
+
+    mtime = os.path.getmtime(str(csv_file)) + 60
+    os.utime(str(csv_file), (mtime, mtime))
+    assert export(tmp_path) == []
+    manifest = [json.loads(line) for line in (tmp_path / 'manifest.json').read_text().splitlines() if line]
+    assert manifest[-1]['mtime'] == mtime
+
+    # The next export is skipped by the size and modified time, without the fingerprint
+    def get_fingerprint(*args):
+        raise AssertionError('The fingerprint should not be read')
+
+    monkeypatch.setattr(ManifestObject, 'get_fingerprint', staticmethod(get_fingerprint))
+    assert export(tmp_path) == []
+
+
+def test_incremental_keeps_the_column_types(tmp_path):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n2021-01-01 00:00:00,h1,1\n')
+    assert export(tmp_path) == ['demo,host=h1 value=1i 1609459200000000000']
+
+    with csv_file.open('a') as f:
+        f.write(u'2021-01-01 00:00:01,h2,2.5\n2021-01-01 00:00:02,h3,3\n')
+    assert export(tmp_path, type_mismatch_policy='coerce') == ['demo,host=h2 value=2i 1609459201000000000',
+                                                               'demo,host=h3 value=3i 1609459202000000000']
+
+
+@pytest.mark.parametrize('options', [{'engine': 'columnar'}, {'workers': 2, 'chunk_size': 64}])
+def test_stage_metrics_of_columnar_and_chunks(tmp_path, options):
+    if options.get('engine') == 'columnar':
+        pytest.importorskip('numpy')
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n' + u''.join(u'2021-01-01 00:00:{0:02d},h{1},{0}\n'.format(i, i % 2)
+                                                              for i in range(20)))
+    metrics_file = tmp_path / 'metrics.json'
+    lines = export(tmp_path, incremental=False, match_columns='host', match_by_string='h0',
+                   metrics_file=str(metrics_file), **options)
+    assert len(lines) == 10
+
+    stages = json.loads(metrics_file.read_text())['run']['stages']
+    assert stages['match_filter']['count'] > 0
+    assert stages['match_filter']['items'] == 20
+    assert stages['timestamp']['items'] == 10
+
+
+def test_workers_report_spooled_batches(tmp_path, fake_influx, monkeypatch, capsys):
+    # The pool workers are forked, and write to the closed file when their writer is closed
+    closed_file = tmp_path / 'closed'
+    close = WriterObject.close
+
+    def record_close(self):
+        with open(str(closed_file), 'a') as f:
+            f.write(u'{0}\n'.format(os.getpid()))
+        return close(self)
+
+    monkeypatch.setattr(WriterObject, 'close', record_close)
+    for name in ('a', 'b', 'c'):
+        (tmp_path / '{0}.csv'.format(name)).write_text(u'timestamp,host,value\n' + u''.join(
+            u'2021-01-01 00:00:{0:02d},{1},{0}\n'.format(i, name) for i in range(3)))
+    fake_influx.responses = [503] * 6
+    ExporterObject().export_csv_to_influx(csv_file=str(tmp_path),
+                                          db_server_name=fake_influx.url,
+                                          db_name='demo',
+                                          db_measurement='demo',
+                                          tag_columns='host',
+                                          field_columns='value',
+                                          batch_size=2,
+                                          workers=2,
+                                          gzip=True,
+                                          retries=0,
+                                          spool_dir=str(tmp_path / 'spool'),
+                                          force_insert_even_csv_no_update=True)
+
+    out = capsys.readouterr().out
+    assert 'Warning: 6 batches (9 points) failed to write are spooled to' in out
+    assert len(os.listdir(str(tmp_path / 'spool'))) == 12
+    raw_bytes = sum(len(write['data']) for write in fake_influx.writes)
+    assert 'Info: Compressed {0} bytes to '.format(raw_bytes) in out
+    # The parent, and the workers which exported the csv files
+    pids = closed_file.read_text().split()
+    assert str(os.getpid()) in pids
+    assert len(set(pids)) >= 2
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_export_compressed_csv_files(tmp_path, workers):
+    rows = [u'2021-01-01 00:00:{0:02d},h{0},{0}\n'.format(i).encode('utf-8') for i in range(60)]
+    (tmp_path / 'demo.csv').write_bytes(b'timestamp,host,value\n' + b''.join(rows))
+    csv_dir = tmp_path / 'compressed'
+    csv_dir.mkdir()
+    (csv_dir / 'a.csv.gz').write_bytes(gzip.compress(b'timestamp,host,value\n' + b''.join(rows[:30])))
+    (csv_dir / 'b.csv.bz2').write_bytes(bz2.compress(b'timestamp,host,value\n' + b''.join(rows[30:])))
+    # The compressed file is not split to the byte range chunks
+    expected = export(tmp_path, incremental=False, workers=workers)
+    assert len(expected) == 60
+    assert sorted(export(tmp_path, csv_file=str(csv_dir), incremental=False, workers=workers,
+                         chunk_size=100)) == sorted(expected)
@@ -0,0 +1,50 @@
+from ExportCsvToInflux import LineProtocolObject
+from influxdb.line_protocol import make_lines
+import pytest
+
+points = [
+    ({'host': 'h0', 'region': 'us east'}, {'value': 1, 'ratio': 0.5, 'name': 'plain'}),
+    ({'host': 'h,1', 'region': 'a=b'}, {'value': -2, 'ratio': 1e-07, 'name': 'say "hi"'}),
+    ({'host': 'back\\slash', 'region': ''}, {'value': 0, 'ratio': 3.0, 'name': 'back\\slash\nline'}),
+    ({'host': '', 'region': 'ap'}, {'value': 10 ** 18, 'ratio': -1.25, 'name': u'中文'}),
+    ({'host': 'h4', 'region': 'eu'}, {'value': True, 'ratio': 2.5, 'name': ''}),
+]
+
+
+@pytest.mark.parametrize('measurement', ['demo', 'my measurement', 'a,b'])
+def test_matches_influxdb_make_lines(measurement):
+    line_protocol = LineProtocolObject(measurement, tag_columns=['region', 'host'],
+                                       field_columns=['value', 'ratio', 'name'])
+    expected = list()
+    for i, (tags, fields) in enumerate(points):
+        timestamp = 1609459200000000000 + i
+        line_protocol.add([tags[column] for column in line_protocol.tag_columns],
+                          [fields[column] for column in line_protocol.field_columns],
+                          timestamp)
+        expected.append(make_lines({'points': [{'measurement': measurement, 'tags': tags, 'fields': fields,
+                                                'time': timestamp}]}))
+
+    assert line_protocol.count == len(points)
+    assert line_protocol.flush() == ''.join(expected).encode('utf-8')
+    assert line_protocol.count == 0
+    assert line_protocol.flush() == b''
+
+
+def test_escape_keys_and_unique():
+    line_protocol = LineProtocolObject('demo', tag_columns=['my tag'], field_columns=['my,field'], unique=True)
+    assert line_protocol.tag_columns == ['my tag', 'uniq']
+    assert line_protocol.field_columns == ['my,field', 'uniq']
+    assert line_protocol.make_line(['a', 'u1'], [1, 'u1'], 1) == 'demo,my\\ tag=a,uniq=u1 my\\,field=1i,uniq="u1" 1\n'
+
+
+@pytest.mark.parametrize('value, expected', [
+    (1, '1i'),
+    (-1, '-1i'),
+    (False, 'False'),
+    (0.1, '0.1'),
+    (1e20, '1e+20'),
+    ('1', '"1"'),
+    (b'bytes', '"bytes"'),
+])
+def test_escape_field_value(value, expected):
+    assert LineProtocolObject.escape_field_value(value) == expected
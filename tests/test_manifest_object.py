@@ -0,0 +1,124 @@
+from ExportCsvToInflux import ExporterObject
+from ExportCsvToInflux import ManifestObject
+from ExportCsvToInflux import CSVObject
+import pytest
+import json
+import os
+
+
+def read_records(manifest_file):
+    return [json.loads(line) for line in manifest_file.read_text().splitlines()]
+
+
+def export(tmp_path, **kwargs):
+    output = tmp_path / 'output.lp'
+    args = dict(csv_file=str(tmp_path / 'demo.csv'),
+                db_measurement='demo',
+                tag_columns='host',
+                field_columns='value',
+                force_insert_even_csv_no_update=False,
+                output=str(output))
+    args.update(kwargs)
+    ExporterObject().export_csv_to_influx(**args)
+    return output.read_text().splitlines()
+
+
+def test_update_load_and_save(tmp_path, capsys):
+    manifest_file = tmp_path / 'sub' / 'manifest.jsonl'
+    manifest = ManifestObject(str(manifest_file))
+    assert manifest.get('a.csv') is None
+    manifest.update('a.csv', {'size': 1})
+    manifest.update('b.csv', {'size': 2})
+    manifest.update('a.csv', {'size': 3})
+
+    # Appended line by line, the later record wins when loaded
+    assert len(read_records(manifest_file)) == 3
+    with manifest_file.open('a') as f:
+        f.write(u'{"csv_file": "broken\n')
+    manifest = ManifestObject(str(manifest_file))
+    assert 'Warning: Skip the broken manifest line' in capsys.readouterr().out
+    assert manifest.get('a.csv') == {'csv_file': os.path.abspath('a.csv'), 'size': 3}
+
+    # Compacted to one record per file
+    manifest.save()
+    assert read_records(manifest_file) == [{'csv_file': os.path.abspath('a.csv'), 'size': 3},
+                                           {'csv_file': os.path.abspath('b.csv'), 'size': 2}]
+    assert not os.path.exists('{0}.tmp'.format(manifest_file))
+
+
+def test_fingerprint(tmp_path):
+    csv_file = tmp_path / 'demo.csv'
+    content = b'timestamp,value\n' + b'2021-01-01 00:00:00,1\n' * 10000
+    csv_file.write_bytes(content)
+    csv_object = CSVObject()
+
+    prefix_md5, tail_md5 = ManifestObject.get_fingerprint(csv_object, str(csv_file), 1000)
+    assert prefix_md5 == csv_object.get_file_md5(str(csv_file), 0, 1000)
+    assert tail_md5 == prefix_md5
+    prefix_md5, tail_md5 = ManifestObject.get_fingerprint(csv_object, str(csv_file), len(content))
+    assert prefix_md5 == csv_object.get_file_md5(str(csv_file), 0, ManifestObject.prefix_size)
+    assert tail_md5 == csv_object.get_file_md5(str(csv_file), len(content) - ManifestObject.tail_size, len(content))
+
+
+def test_no_update_check(tmp_path):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n2021-01-01 00:00:00,h1,1\n')
+    assert export(tmp_path) == ['demo,host=h1 value=1i 1609459200000000000']
+
+    # The default manifest is in the csv dir, instead of the <name>_influx.csv copy
+    manifest_file = tmp_path / '.export_csv_to_influx_manifest.jsonl'
+    record, = read_records(manifest_file)
+    assert record['csv_file'] == str(csv_file)
+    assert record['size'] == os.path.getsize(str(csv_file))
+    assert record['lines_count'] == 1
+    assert not os.path.exists(str(tmp_path / 'demo_influx.csv'))
+    assert export(tmp_path) == []
+
+    # The same size, but changed
+    csv_file.write_text(u'timestamp,host,value\n2021-01-01 00:00:00,h2,2\n')
+    assert export(tmp_path) == ['demo,host=h2 value=2i 1609459200000000000']
+    assert export(tmp_path, force_insert_even_csv_no_update=True) == ['demo,host=h2 value=2i 1609459200000000000']
+
+
+@pytest.mark.parametrize('hash_algorithm', ['blake2b', 'xxhash'])
+def test_no_update_check_by_hash(tmp_path, monkeypatch, hash_algorithm):
+    if hash_algorithm == 'xxhash':
+        pytest.importorskip('xxhash')
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n2021-01-01 00:00:00,h1,1\n')
+    assert export(tmp_path, hash_algorithm=hash_algorithm) == ['demo,host=h1 value=1i 1609459200000000000']
+    record, = read_records(tmp_path / '.export_csv_to_influx_manifest.jsonl')
+    assert record['hash_algorithm'] == hash_algorithm
+    assert record['hash'] == CSVObject(hash_algorithm=hash_algorithm).get_file_hash(str(csv_file))
+
+    # The same size and modified time: skipped without hashing
+    get_file_hash = CSVObject.get_file_hash
+    hashed = list()
+
+    def count_get_file_hash(self, *args, **kwargs):
+        hashed.append(args)
+        return get_file_hash(self, *args, **kwargs)
+
+    monkeypatch.setattr(CSVObject, 'get_file_hash', count_get_file_hash)
+    monkeypatch.setattr(CSVObject, 'scan_file', lambda *args, **kwargs: pytest.fail('The csv file is scanned'))
+    assert export(tmp_path, hash_algorithm=hash_algorithm) == []
+    assert hashed == []
+    monkeypatch.undo()
+
+    # Touched: skipped by the hash
+    mtime = os.path.getmtime(str(csv_file)) + 60
+    os.utime(str(csv_file), (mtime, mtime))
+    assert export(tmp_path, hash_algorithm=hash_algorithm) == []
+    # Touched again: the hash by the other algorithm is not compared
+    os.utime(str(csv_file), (mtime + 60, mtime + 60))
+    assert export(tmp_path, hash_algorithm='md5') == ['demo,host=h1 value=1i 1609459200000000000']
+
+
+def test_legacy_influx_csv_copy(tmp_path):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n2021-01-01 00:00:00,h1,1\n')
+    md5 = CSVObject().get_file_md5(str(csv_file))
+    (tmp_path / 'demo_influx.csv').write_text(u'timestamp,host,value,md5\n2021-01-01 00:00:00,h1,1,{0}\n'.format(md5))
+
+    # Not in the manifest yet, the md5 of the legacy copy is checked
+    assert export(tmp_path) == []
@@ -0,0 +1,57 @@
+from ExportCsvToInflux import MatchObject
+import pytest
+
+rows = [{'host': 'h1', 'region': 'us east', 'value': 1},
+        {'host': 'H2', 'region': 'eu', 'value': 2},
+        {'host': 'h3', 'region': 'us west', 'value': 3},
+        {'host': 'db', 'region': 'ap', 'value': 30}]
+
+
+@pytest.mark.parametrize('patterns, values, expected', [
+    (['^h[0-9]$'], ['h1', 'H2', 'db'], [True, True, False]),
+    (['^h1$', 'b$'], ['h1', 'db', 'h2'], [True, True, False]),
+    # The back reference is searched one by one, not combined
+    (['^(.)\\1$', '^d'], ['aa', 'ab', 'db'], [True, False, True]),
+    ([r'^(?P<c>.)(?P=c)$'], ['bb', 'bc'], [True, False]),
+])
+def test_compile_regex(patterns, values, expected):
+    search = MatchObject.compile_regex(patterns)
+    assert [bool(search(value)) for value in values] == expected
+
+
+def test_compile_regex_empty():
+    assert MatchObject.compile_regex([]) is None
+    assert MatchObject.compile_regex(None) is None
+
+
+@pytest.mark.parametrize('check_type, columns, by_string, by_regex, expected', [
+    ('match', ['host'], ['db'], ['^h[12]$'], [True, True, False, True]),
+    ('match', ['host', 'region'], [], ['^h', '^us'], [True, False, True, False]),
+    ('match', ['missing'], ['h1'], [], [False, False, False, False]),
+    ('filter', ['host', 'region'], ['eu'], ['^d'], [False, True, False, True]),
+    ('filter', ['value'], ['3'], ['^[12]$'], [True, True, True, False]),
+])
+def test_check_rows_and_columns(check_type, columns, by_string, by_regex, expected):
+    match_object = MatchObject(columns, by_string, by_regex, check_type=check_type, csv_file_length=len(rows))
+    assert [match_object.check(row) for row in rows] == expected
+    count = match_object.count
+
+    # The columns check is the same as the row by row check, and counts the same
+    match_object = MatchObject(columns, by_string, by_regex, check_type=check_type, csv_file_length=len(rows))
+    columns_text = dict((column, [str(row[column]) for row in rows]) for column in rows[0])
+    assert match_object.check_columns(columns_text, len(rows)) == expected
+    assert match_object.count == count
+
+
+def test_count():
+    match_object = MatchObject(['host'], ['h1', 'db'], [], csv_file_length=len(rows))
+    filter_object = MatchObject(['host'], ['h1', 'db'], [], check_type='filter', csv_file_length=len(rows))
+    for row in rows:
+        match_object.check(row)
+        filter_object.check(row)
+
+    assert match_object.count == {'host': 2}
+    # The filter count is counted down from the csv file length
+    assert filter_object.count == {'host': 2}
+    filter_object.check(rows[0])
+    assert filter_object.count == {'host': 1}
@@ -0,0 +1,95 @@
+from ExportCsvToInflux import ExporterObject
+from ExportCsvToInflux import MetricsObject
+import pytest
+import json
+import re
+
+# The sample line of the prometheus text format: name{labels} value
+sample_pattern = re.compile(r'^([a-z_]+)(?:\{((?:[a-z]+="(?:[^"\\]|\\.)*",?)*)\})? (\S+)$')
+
+
+def parse_prometheus(text):
+    """Parse the prometheus text to {(name, labels): value}, and check the TYPE of each metric"""
+
+    samples = dict()
+    types = dict()
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            assert name not in types
+            types[name] = metric_type
+            continue
+        if line.startswith('# HELP '):
+            continue
+        match = sample_pattern.match(line)
+        assert match, line
+        name, labels, value = match.groups()
+        labels = tuple(re.findall(r'([a-z]+)="((?:[^"\\]|\\.)*)"', labels or ''))
+        assert re.sub('_(bucket|sum|count)$', '', name) in types or name in types, name
+        samples[(name, labels)] = float(value)
+
+    return samples
+
+
+def test_observe_and_merge():
+    metrics = MetricsObject()
+    metrics.observe('write', 0.001, items=10, data_bytes=100)
+    metrics.observe('write', 0.002, items=5, data_bytes=50)
+    metrics.observe('write', 100.0)
+    write = metrics.to_dict()['stages']['write']
+    assert (write['count'], write['items'], write['bytes']) == (3, 15, 150)
+    # The bucket is the upper bound, inclusive, the last one is +Inf
+    assert write['histogram'] == [1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1]
+
+    run = MetricsObject()
+    run.add_file('a.csv', metrics.to_dict())
+    run.add_file('b.csv', metrics.to_dict())
+    assert run.to_dict()['stages']['write']['histogram'] == [2, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2]
+    assert run.to_dict()['stages']['write']['items'] == 30
+    assert list(run.files) == ['a.csv', 'b.csv']
+
+
+def test_dumps_prometheus():
+    metrics = MetricsObject()
+    metrics.counters['points'] = 7
+    metrics.observe('timestamp', 0.003, items=7)
+    metrics.observe('timestamp', 0.3, items=3)
+    run = MetricsObject()
+    run.add_file('dir/a "b".csv', metrics.to_dict())
+
+    samples = parse_prometheus(run.dumps_prometheus())
+    prefix = MetricsObject.metric_prefix
+    assert samples[(prefix + '_points_total', ())] == 7
+    stage = ('stage', 'timestamp')
+    buckets = [samples[(prefix + '_stage_seconds_bucket', (stage, ('le', str(bucket))))]
+               for bucket in MetricsObject.buckets + ['+Inf']]
+    assert buckets == [0, 1, 1, 1, 1, 2, 2, 2, 2, 2, 2, 2]
+    assert samples[(prefix + '_stage_seconds_count', (stage,))] == 2
+    assert samples[(prefix + '_stage_seconds_sum', (stage,))] == pytest.approx(0.303)
+    assert samples[(prefix + '_stage_items_total', (stage,))] == 10
+    assert samples[(prefix + '_file_stage_items', (('file', 'dir/a \\"b\\".csv'), stage))] == 10
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_export_metrics_file(tmp_path, workers):
+    for name in ('a', 'b'):
+        (tmp_path / '{0}.csv'.format(name)).write_text(
+            u'timestamp,host,value\n' + u''.join(u'2021-01-01 00:00:{0:02d},h{0},{0}\n'.format(i) for i in range(5)))
+    kwargs = dict(csv_file=str(tmp_path), db_measurement='demo', tag_columns='host', field_columns='value',
+                  batch_size=2, workers=workers, output=str(tmp_path / 'output.lp'))
+    ExporterObject().export_csv_to_influx(metrics_file=str(tmp_path / 'metrics.json'), **kwargs)
+    ExporterObject().export_csv_to_influx(metrics_file=str(tmp_path / 'metrics.prom'), metrics_format='prometheus',
+                                          **kwargs)
+
+    metrics = json.loads((tmp_path / 'metrics.json').read_text())
+    assert metrics['run']['counters']['files'] == 2
+    assert metrics['run']['counters']['points'] == 10
+    assert sorted(metrics['files']) == [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')]
+    assert metrics['run']['stages']['serialization']['count'] == 6
+    assert metrics['run']['stages']['hash_count']['count'] == 2
+
+    samples = parse_prometheus((tmp_path / 'metrics.prom').read_text())
+    prefix = MetricsObject.metric_prefix
+    assert samples[(prefix + '_points_total', ())] == 10
+    assert samples[(prefix + '_stage_seconds_count', (('stage', 'serialization'),))] == 6
+    assert samples[(prefix + '_file_stage_items', (('file', str(tmp_path / 'a.csv')), ('stage', 'timestamp')))] == 5
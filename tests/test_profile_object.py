@@ -0,0 +1,95 @@
+from ExportCsvToInflux import ExporterObject
+from ExportCsvToInflux import ProfileObject
+from ExportCsvToInflux import profile_object
+import threading
+import requests
+import signal
+import pstats
+import pytest
+import time
+import sys
+
+
+def busy_loop(seconds):
+    end = time.time() + seconds
+    count = 0
+    while time.time() < end:
+        count += sum(range(100))
+    return count
+
+
+def test_cprofile_export(tmp_path, capsys):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n' + u''.join(u'2021-01-01 00:00:{0:02d},h0,{0}\n'.format(i)
+                                                              for i in range(50)))
+    stats_file = tmp_path / 'export.prof'
+    ProfileObject(str(stats_file), top=50).run(ExporterObject().export_csv_to_influx,
+                                               csv_file=str(csv_file),
+                                               db_measurement='demo',
+                                               field_columns='value',
+                                               output=str(tmp_path / 'demo.lp'))
+
+    # The stats file is read by pstats
+    names = set(name for _, _, name in pstats.Stats(str(stats_file)).stats)
+    assert 'export_csv_to_influx' in names
+    out = capsys.readouterr().out
+    assert 'Info: Saved the cprofile stats to {0}'.format(stats_file) in out
+    modules, functions = out.split('Info: Top 50 modules by the self time:')[1].split(
+        'Info: Top 50 functions by the self time:')
+    # Grouped by the module of this package, or the top level package
+    modules = [line.split()[-1] for line in modules.strip().splitlines()]
+    assert modules[0] == 'module'
+    assert 'ExportCsvToInflux.exporter_object' in modules
+    assert 'builtins' in modules
+    functions = functions.strip().splitlines()
+    assert functions[0].split() == ['seconds', '%', 'calls', 'function']
+    assert len(functions) == 51
+
+
+@pytest.mark.parametrize('in_thread', [False, True])
+def test_sample(tmp_path, capsys, in_thread):
+    stats_file = tmp_path / 'export.folded'
+    handler = signal.getsignal(signal.SIGALRM)
+    result = list()
+    profile = ProfileObject(str(stats_file), profiler='sample', stderr=True)
+    if in_thread:
+        # Not the main thread, sampled by the background thread, which waits for the GIL
+        thread = threading.Thread(target=lambda: result.append(profile.run(busy_loop, 0.3)))
+        thread.start()
+        thread.join()
+    else:
+        result.append(profile.run(busy_loop, 0.3))
+
+    assert result[0] > 0
+    assert signal.getsignal(signal.SIGALRM) == handler
+    stacks = [line.rsplit(' ', 1) for line in stats_file.read_text().splitlines()]
+    assert stacks
+    samples = sum(int(count) for stack, count in stacks if 'test_profile_object:busy_loop:' in stack)
+    assert samples > 0
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert 'Info: Saved the sample stats to {0}'.format(stats_file) in captured.err
+    assert 'test_profile_object:busy_loop:' in captured.err
+
+
+@pytest.mark.parametrize('profiler', ProfileObject.profilers)
+def test_saved_when_exit(tmp_path, profiler):
+    stats_file = tmp_path / 'export.prof'
+    with pytest.raises(SystemExit):
+        ProfileObject(str(stats_file), profiler=profiler).run(sys.exit, 'Error: exit')
+    assert stats_file.exists()
+
+
+def test_get_module_name():
+    profile = ProfileObject('export.prof')
+    assert profile.get_module_name(profile_object.__file__) == 'ExportCsvToInflux.profile_object'
+    assert profile.get_module_name(requests.__file__) == 'requests'
+    assert profile.get_module_name('~') == 'builtins'
+    assert profile.get_module_name('<frozen importlib._bootstrap>') == 'builtins'
+
+
+@pytest.mark.parametrize('kwargs, message', [({'profiler': 'perf'}, 'The profiler should be one of'),
+                                             ({'top': 'all'}, 'The profile top should be int')])
+def test_invalid(kwargs, message):
+    with pytest.raises(SystemExit, match=message):
+        ProfileObject('export.prof', **kwargs)
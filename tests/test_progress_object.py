@@ -0,0 +1,167 @@
+from ExportCsvToInflux import ExporterObject
+from ExportCsvToInflux import ProgressObject
+from ExportCsvToInflux import progress_object
+import pytest
+import json
+
+
+def json_records(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith('{')]
+
+
+def test_progress_at_most_once_per_interval(capsys):
+    progress = ProgressObject(interval=3600, verbosity=1)
+    progress.start('demo.csv', total_rows=4)
+    for points in range(1, 5):
+        progress.rows = points
+        progress.update(points, 10)
+    progress.finish()
+
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 1
+    assert out[0].startswith('Info: Exported demo.csv: 4/4 (100.0%) rows read, 4 points written, 40 bytes sent')
+
+
+def test_progress_verbosity_0(capsys):
+    progress = ProgressObject(verbosity=0)
+    progress.start('demo.csv')
+    progress.update(1, 10)
+    progress.finish()
+
+    assert capsys.readouterr().out == ''
+
+
+def test_progress_json_every_batch(capsys):
+    progress = ProgressObject(verbosity=2, log_format='json')
+    progress.start('demo.csv', total_rows=4)
+    progress.rows = 2
+    progress.update(2, 10, compression_ratio=4.0, batch_compression=(5.0, 0.002))
+    progress.rows = 4
+    progress.update(4, 10)
+    progress.finish()
+
+    records = json_records(capsys)
+    assert [record['event'] for record in records] == ['progress', 'progress', 'done']
+    assert [record['points'] for record in records] == [2, 4, 4]
+    assert records[0]['compression_ratio'] == 4.0
+    assert records[0]['batch_compression_ratio'] == 5.0
+    assert records[0]['batch_compression_seconds'] == 0.002
+    assert 'batch_compression_ratio' not in records[1]
+    assert records[2]['bytes'] == 20
+
+
+def test_batch_compression_is_not_reported_by_interval(capsys):
+    progress = ProgressObject(interval=0, verbosity=1, log_format='json')
+    progress.start('demo.csv')
+    progress.update(2, 10, compression_ratio=4.0, batch_compression=(5.0, 0.002))
+
+    record, = json_records(capsys)
+    assert record['compression_ratio'] == 4.0
+    assert 'batch_compression_ratio' not in record
+
+
+def test_export_reports_batch_compression(tmp_path, fake_influx, capsys):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n' + u''.join(u'2021-01-01 00:00:{0:02d},h0,{0}\n'.format(i)
+                                                              for i in range(5)))
+    metrics_file = tmp_path / 'metrics.json'
+    ExporterObject().export_csv_to_influx(csv_file=str(csv_file),
+                                          db_server_name=fake_influx.url,
+                                          db_name='demo',
+                                          db_measurement='demo',
+                                          tag_columns='host',
+                                          field_columns='value',
+                                          batch_size=2,
+                                          gzip=True,
+                                          verbosity=2,
+                                          log_format='json',
+                                          metrics_file=str(metrics_file))
+
+    records = [record for record in json_records(capsys) if record['event'] == 'progress']
+    assert len(records) == 3
+    for record, write in zip(records, fake_influx.writes):
+        assert record['batch_compression_ratio'] == round(len(write['data']) / float(write['body_bytes']), 2)
+        assert record['batch_compression_seconds'] >= 0
+    assert records[-1]['bytes'] == sum(write['body_bytes'] for write in fake_influx.writes)
+
+    compress = json.loads(metrics_file.read_text())['run']['stages']['compress']
+    assert compress['count'] == 3
+    assert compress['items'] == 5
+    assert compress['bytes'] == sum(len(write['data']) for write in fake_influx.writes)
+
+
+def test_export_reports_spooled_points(tmp_path, fake_influx, capsys):
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n' + u''.join(u'2021-01-01 00:00:{0:02d},h0,{0}\n'.format(i)
+                                                              for i in range(5)))
+    # The first batch is written, the others are spooled
+    fake_influx.responses = [204, 503, 503]
+    ExporterObject().export_csv_to_influx(csv_file=str(csv_file),
+                                          db_server_name=fake_influx.url,
+                                          db_name='demo',
+                                          db_measurement='demo',
+                                          tag_columns='host',
+                                          field_columns='value',
+                                          batch_size=2,
+                                          retries=0,
+                                          spool_dir=str(tmp_path / 'spool'),
+                                          log_format='json')
+
+    done, = [record for record in json_records(capsys) if record['event'] == 'done']
+    assert done['points'] == 2
+    assert done['spooled_points'] == 3
+    assert done['bytes'] == fake_influx.bytes
+    assert done['spooled_bytes'] == sum(write['body_bytes'] for write in fake_influx.writes if write['code'] == 503)
+
+
+def test_progress_text_spooled(capsys):
+    progress = ProgressObject(verbosity=1)
+    progress.start('demo.csv')
+    progress.update(4, 40, spooled=(1, 10))
+    progress.finish(spooled=(3, 30))
+
+    out = capsys.readouterr().out
+    assert '1 points written, 10 bytes sent, 3 points (30 bytes) spooled' in out
+
+
+def test_progress_rate_and_eta(monkeypatch, capsys):
+    now = [1000.0]
+    monkeypatch.setattr(progress_object.time, 'time', lambda: now[0])
+    progress = ProgressObject(interval=5, verbosity=1)
+    progress.start('demo.csv', total_rows=1000)
+    now[0] += 4
+    progress.rows = 100
+    progress.update(100, 1000)
+    now[0] += 6
+    progress.rows = 250
+    progress.update(250, 1500, compression_ratio=3.5)
+    now[0] += 30
+    progress.rows = 1000
+    progress.finish()
+
+    # Not reported in the first interval, then 25 rows/s and 750 rows left
+    out = capsys.readouterr().out.splitlines()
+    assert out == ['Info: Exporting demo.csv: 250/1000 (25.0%) rows read, 250 points written, 2500 bytes sent, '
+                   '25 rows/s, ETA 0:00:30, compression ratio 3.50',
+                   'Info: Exported demo.csv: 1000/1000 (100.0%) rows read, 250 points written, 2500 bytes sent, '
+                   '25 rows/s, in 40.00 s']
+
+
+@pytest.mark.parametrize('verbosity, progress_interval, reports', [(1, 3600, 0), (1, 0, 3), (2, 3600, 3)])
+def test_export_progress(tmp_path, capsys, verbosity, progress_interval, reports):
+    for name in ('a', 'b'):
+        (tmp_path / '{0}.csv'.format(name)).write_text(
+            u'timestamp,host,value\n' + u''.join(u'2021-01-01 00:00:{0:02d},h0,{0}\n'.format(i) for i in range(5)))
+    kwargs = dict(csv_file=str(tmp_path), db_measurement='demo', tag_columns='host', field_columns='value',
+                  batch_size=2, verbosity=verbosity, progress_interval=progress_interval)
+    ExporterObject().export_csv_to_influx(output=str(tmp_path / 'demo.lp'), **kwargs)
+    # The same progress when serialized by the generator
+    assert len(list(ExporterObject().serialize_csv_to_influx(**kwargs))) == 6
+
+    out = capsys.readouterr().out.splitlines()
+    for csv_file in ('a.csv', 'b.csv'):
+        csv_file = str(tmp_path / csv_file)
+        assert len([line for line in out if line.startswith('Info: Exporting {0}: '.format(csv_file))]) == reports * 2
+        done = [line for line in out if line.startswith('Info: Exported {0}: '.format(csv_file))]
+        assert len(done) == 2
+        assert done[0].startswith('Info: Exported {0}: 5/5 (100.0%) rows read, 5 points written'.format(csv_file))
@@ -0,0 +1,114 @@
+from ExportCsvToInflux import ExporterObject
+from ExportCsvToInflux import SinkObject
+import pytest
+import gzip
+
+
+def make_csv(csv_file, rows=10):
+    csv_file.write_text(u'timestamp,host,value\n' + u''.join(u'2021-01-01 00:00:{0:02d},h{1},{0}\n'.format(i, i % 3)
+                                                              for i in range(rows)))
+
+
+def export(csv_file, **kwargs):
+    args = dict(csv_file=str(csv_file),
+                db_measurement='demo',
+                tag_columns='host',
+                field_columns='value',
+                batch_size=3,
+                force_insert_even_csv_no_update=True)
+    args.update(kwargs)
+    ExporterObject().export_csv_to_influx(**args)
+
+
+@pytest.mark.parametrize('output, compress', [('demo.lp', False), ('demo.lp.gz', False), ('demo.lp', True)])
+def test_output_file_matches_influx_writes(tmp_path, fake_influx, output, compress):
+    make_csv(tmp_path / 'demo.csv')
+    export(tmp_path / 'demo.csv', db_server_name=fake_influx.url, db_name='demo')
+    written = b''.join(write['data'] for write in fake_influx.writes)
+
+    # The influx is not connected with the output
+    export(tmp_path / 'demo.csv', db_server_name='localhost:1', output=str(tmp_path / output), gzip=compress)
+    data = (tmp_path / output).read_bytes()
+    if compress or output.endswith('.gz'):
+        data = gzip.decompress(data)
+    assert data == written
+    assert fake_influx.requests == 4
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_output_stdout(tmp_path, capsysbinary, compress):
+    make_csv(tmp_path / 'demo.csv')
+    export(tmp_path / 'demo.csv', output='-', gzip=compress)
+
+    captured = capsysbinary.readouterr()
+    data = gzip.decompress(captured.out) if compress else captured.out
+    assert data.decode('utf-8').splitlines() == ['demo,host=h{0} value={1}i {2}'.format(
+        i % 3, i, 1609459200000000000 + i * 10 ** 9) for i in range(10)]
+    # The messages are printed to stderr
+    assert b'Info: Wrote ' in captured.err
+
+
+class FullFile(object):
+    """The file which fails to write, like no space left on the device"""
+
+    def __init__(self):
+        self.data = list()
+
+    def write(self, data):
+        if self.data:
+            raise IOError(28, 'No space left on device')
+        self.data.append(data)
+
+    def close(self):
+        pass
+
+
+def test_write_after_error(tmp_path):
+    sink = SinkObject(str(tmp_path / 'demo.lp'))
+    sink.file.close()
+    sink.file = FullFile()
+    assert sink.write(b'a\n')
+    assert not sink.write(b'b\n')
+    assert not sink.write(b'c\n')
+    assert sink.file.data == [b'a\n']
+    assert sink.bytes == 2
+    assert not sink.flush()
+    assert not sink.close()
+
+
+def test_open_error(tmp_path):
+    with pytest.raises(SystemExit, match='Failed to open the output'):
+        SinkObject(str(tmp_path / 'missing' / 'demo.lp'))
+
+
+def test_serialize_csv_to_influx(tmp_path):
+    make_csv(tmp_path / 'demo.csv')
+    output = tmp_path / 'demo.lp'
+    export(tmp_path / 'demo.csv', output=str(output))
+
+    batches = list(ExporterObject().serialize_csv_to_influx(csv_file=str(tmp_path / 'demo.csv'),
+                                                            db_measurement='demo',
+                                                            tag_columns='host',
+                                                            field_columns='value',
+                                                            batch_size=3))
+    assert [batch.count(b'\n') for batch in batches] == [3, 3, 3, 1]
+    assert b''.join(batches) == output.read_bytes()
+
+
+def test_serialize_csv_to_influx_incremental(tmp_path):
+    csv_file = tmp_path / 'demo.csv'
+    make_csv(csv_file, rows=4)
+    kwargs = dict(csv_file=str(csv_file), db_measurement='demo', tag_columns='host', field_columns='value',
+                  batch_size=3, incremental=True)
+
+    # The offset is saved only when the batches of the csv file are all consumed
+    batches = ExporterObject().serialize_csv_to_influx(**kwargs)
+    assert next(batches).count(b'\n') == 3
+    batches.close()
+    assert len(list(ExporterObject().serialize_csv_to_influx(**kwargs))) == 2
+    assert list(ExporterObject().serialize_csv_to_influx(**kwargs)) == []
+
+    with csv_file.open('a') as f:
+        f.write(u'2021-01-01 00:01:00,h9,9\n')
+    assert list(ExporterObject().serialize_csv_to_influx(**kwargs)) == [
+        b'demo,host=h9 value=9i 1609459260000000000\n']
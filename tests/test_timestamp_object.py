@@ -0,0 +1,75 @@
+from ExportCsvToInflux import TimestampObject
+from pytz import timezone
+import datetime
+import pytest
+
+epoch = datetime.datetime(1970, 1, 1)
+
+
+def strptime_timestamp(value, time_format, time_zone):
+    """The timestamp by datetime.strptime and pytz localize, as the reference"""
+
+    datetime_local = timezone(time_zone).localize(datetime.datetime.strptime(value, time_format))
+    delta = datetime_local.replace(tzinfo=None) - datetime_local.utcoffset() - epoch
+    return int(delta.total_seconds() * 1000) * 1000000
+
+
+@pytest.mark.parametrize('time_zone', ['UTC', 'America/New_York', 'Europe/London', 'Asia/Kolkata',
+                                       'Australia/Lord_Howe'])
+@pytest.mark.parametrize('start', [datetime.datetime(2021, 3, 13, 12), datetime.datetime(2021, 11, 6, 12),
+                                   datetime.datetime(2021, 4, 3, 12)])
+def test_convert_matches_strptime_around_transitions(time_zone, start):
+    time_format = '%Y-%m-%d %H:%M:%S'
+    timestamp_object = TimestampObject(time_format=time_format, time_zone=time_zone)
+    for minutes in range(0, 48 * 60, 7):
+        value = (start + datetime.timedelta(minutes=minutes)).strftime(time_format)
+        assert timestamp_object.convert(value) == strptime_timestamp(value, time_format, time_zone), value
+
+
+@pytest.mark.parametrize('time_format, value', [
+    ('%Y-%m-%d', '2021-06-01'),
+    ('%Y/%m/%d %H:%M:%S', '2021/06/01 08:30:00'),
+    ('%Y-%m-%dT%H:%M:%S.%f', '2021-06-01T08:30:00.123456'),
+    ('%Y-%m-%dT%H:%M:%S.%fZ', '2021-06-01T08:30:00.5Z'),
+    # Not the fixed layout, or the value not in the fixed layout, by datetime.strptime
+    ('%d/%m/%Y %H:%M', '01/06/2021 08:30'),
+    ('%Y-%m-%d %H:%M:%S', '2021-6-1 8:30:00'),
+])
+def test_convert_formats(time_format, value):
+    timestamp_object = TimestampObject(time_format=time_format, time_zone='Asia/Shanghai')
+    assert timestamp_object.convert(value) == strptime_timestamp(value, time_format, 'Asia/Shanghai')
+
+
+@pytest.mark.parametrize('value, kind, expected', [
+    ('1622536200', 'epoch_s', 1622536200 * 10 ** 9),
+    ('1622536200123', 'epoch_ms', 1622536200123 * 10 ** 6),
+    ('1622536200123456', 'epoch_us', 1622536200123456 * 10 ** 3),
+    ('1622536200123456789', 'epoch_ns', 1622536200123456789),
+    ('1622536200.5', 'epoch_s', 1622536200500000000),
+    ('16225362001234567891', 'epoch', 1622536200123456789),
+    ('2021-06-01 08:30:00', 'datetime', 1622536200 * 10 ** 9),
+])
+def test_detect_and_convert_epoch(value, kind, expected):
+    timestamp_object = TimestampObject()
+    assert timestamp_object.detect(value) == kind
+    assert timestamp_object.convert(value) == expected
+    assert timestamp_object.kind == kind
+
+
+def test_utc_offset_period():
+    timestamp_object = TimestampObject(time_zone='America/New_York')
+    offset, period = timestamp_object.get_utc_offset(datetime.datetime(2021, 6, 1))
+    assert offset == datetime.timedelta(hours=-4)
+    start, end = period
+    # Between the spring forward and the fall back, excluding the ambiguous hour
+    assert start == datetime.datetime(2021, 3, 14, 3)
+    assert end == datetime.datetime(2021, 11, 7, 1)
+
+    offset, period = timestamp_object.get_utc_offset(datetime.datetime(2021, 11, 7, 1, 30))
+    assert offset == datetime.timedelta(hours=-5)
+    assert period is None
+
+
+def test_unexpected_time():
+    with pytest.raises(SystemExit, match='Unexpected time'):
+        TimestampObject(kind='datetime').convert('yesterday')
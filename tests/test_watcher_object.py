@@ -0,0 +1,52 @@
+from ExportCsvToInflux import WatcherObject
+from ExportCsvToInflux import watcher_object
+import pytest
+import os
+
+
+@pytest.fixture(params=['polling', 'inotify'])
+def mode(request, monkeypatch):
+    if request.param == 'polling':
+        monkeypatch.setattr(watcher_object, 'INotify', None)
+    elif watcher_object.INotify is None:
+        pytest.skip('inotify_simple is not installed')
+    return request.param
+
+
+def append(path, text):
+    with open(str(path), 'a') as f:
+        f.write(text)
+
+
+def test_watch_dir(tmp_path, mode, capsys):
+    append(tmp_path / 'a.csv', u'timestamp,value\n')
+    watcher = WatcherObject(str(tmp_path), interval=0.1)
+    assert 'Info: Watching {0} by {1}'.format(tmp_path, mode) in capsys.readouterr().out
+    changes = watcher.watch()
+
+    append(tmp_path / 'a.csv', u'2021-01-01 00:00:00,1\n')
+    append(tmp_path / 'b.csv', u'timestamp,value\n')
+    append(tmp_path / 'b_influx.csv', u'timestamp,value\n')
+    append(tmp_path / 'notes.txt', u'notes\n')
+    assert next(changes) == [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')]
+
+    # The new sub directory is watched as well
+    os.mkdir(str(tmp_path / 'sub'))
+    append(tmp_path / 'sub' / 'c.csv', u'timestamp,value\n')
+    assert next(changes) == [str(tmp_path / 'sub' / 'c.csv')]
+    append(tmp_path / 'sub' / 'c.csv', u'2021-01-01 00:00:00,1\n')
+    assert next(changes) == [str(tmp_path / 'sub' / 'c.csv')]
+    watcher.close()
+
+
+def test_watch_file(tmp_path, mode):
+    csv_file = tmp_path / 'a.csv'
+    append(csv_file, u'timestamp,value\n')
+    watcher = WatcherObject(str(csv_file), interval=0.1)
+    changes = watcher.watch()
+
+    # The other csv file in the same dir is not watched
+    append(tmp_path / 'b.csv', u'timestamp,value\n')
+    append(csv_file, u'2021-01-01 00:00:00,1\n')
+    assert next(changes) == [str(csv_file)]
+    watcher.close()
@@ -0,0 +1,217 @@
+from ExportCsvToInflux import ExporterObject
+from ExportCsvToInflux import WriterObject
+from ExportCsvToInflux import writer_object
+import pytest
+import json
+import gzip
+import io
+import os
+
+lines = [b'demo,host=h0 value=0i 1609459200000000000\n',
+         b'demo,host=h1 value=1i 1609459201000000000\n',
+         b'demo,host=h2 value=2i 1609459202000000000\n']
+
+
+def make_writer(fake_influx, version, **kwargs):
+    if version == '1':
+        args = dict(influxdb_version='1.8.10', db_name='demo', db_user='admin', db_password='admin')
+    else:
+        args = dict(influxdb_version='2.0.0', token='token', org_name='my-org', bucket_name='my-bucket')
+    args.update(kwargs)
+    return WriterObject('http://{0}/'.format(fake_influx.url), **args)
+
+
+@pytest.mark.parametrize('version, path, params', [
+    ('1', '/write', {'db': 'demo'}),
+    ('2', '/api/v2/write', {'org': 'my-org', 'bucket': 'my-bucket', 'precision': 'ns'}),
+])
+@pytest.mark.parametrize('max_in_flight', [0, 2])
+def test_write(fake_influx, version, path, params, max_in_flight):
+    writer = make_writer(fake_influx, version, max_in_flight=max_in_flight)
+    assert writer.write(b''.join(lines[:2]))
+    assert writer.write(lines[2])
+    assert writer.close()
+
+    assert fake_influx.requests == 2
+    assert fake_influx.lines == 3
+    assert fake_influx.bytes == len(b''.join(lines))
+    assert sorted(write['data'] for write in fake_influx.writes) == sorted([b''.join(lines[:2]), lines[2]])
+    for write in fake_influx.writes:
+        assert write['path'] == path
+        assert write['params'] == params
+        assert 'Content-Encoding' not in write['headers']
+
+
+@pytest.mark.parametrize('version', ['1', '2'])
+def test_write_gzip(fake_influx, version):
+    data = b''.join(lines) * 100
+    writer = make_writer(fake_influx, version, compress=True)
+    assert writer.write(data)
+    assert writer.close()
+
+    write, = fake_influx.writes
+    assert write['headers']['Content-Encoding'] == 'gzip'
+    assert write['data'] == data
+    assert write['body_bytes'] == writer.compression['batch_compressed_bytes'] < len(data)
+    assert fake_influx.lines == 300
+
+
+def test_compression_counters(fake_influx):
+    writer = make_writer(fake_influx, '1', compress=True)
+    batches = [b''.join(lines) * 100, lines[0] * 10]
+    for data in batches:
+        assert writer.write(data)
+    assert writer.close()
+
+    compression = writer.compression
+    bodies = [write['body_bytes'] for write in fake_influx.writes]
+    assert (compression['batch_bytes'], compression['batch_compressed_bytes']) == (len(batches[1]), bodies[1])
+    assert (compression['bytes'], compression['compressed_bytes']) == (sum(map(len, batches)), sum(bodies))
+    assert compression['seconds'] >= compression['batch_seconds'] >= 0
+    assert writer.compression_ratio == (len(batches[1]) / float(bodies[1]), sum(map(len, batches)) / float(sum(bodies)))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_export_compression_summary(tmp_path, fake_influx, capsys, workers):
+    for name in ['a', 'b']:
+        (tmp_path / '{0}.csv'.format(name)).write_text(
+            u'timestamp,host,value\n' + u''.join(u'2021-01-01 00:00:{0:02d},h0,{0}\n'.format(i) for i in range(50)))
+    ExporterObject().export_csv_to_influx(csv_file=str(tmp_path),
+                                          db_server_name=fake_influx.url,
+                                          db_name='demo',
+                                          db_measurement='demo',
+                                          tag_columns='host',
+                                          field_columns='value',
+                                          batch_size=20,
+                                          gzip=True,
+                                          workers=workers)
+
+    # The compression of the workers is summed to the summary
+    data_bytes = sum(len(write['data']) for write in fake_influx.writes)
+    body_bytes = sum(write['body_bytes'] for write in fake_influx.writes)
+    assert len(fake_influx.writes) == 6
+    assert 'Info: Compressed {0} bytes to {1} bytes in total, ratio {2:.2f}'.format(
+        data_bytes, body_bytes, data_bytes / float(body_bytes)) in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('version', ['1.8.10', '2.0.0'])
+@pytest.mark.parametrize('compress', [False, True])
+def test_export(tmp_path, fake_influx, version, compress):
+    fake_influx.reset(version=version)
+    csv_file = tmp_path / 'demo.csv'
+    csv_file.write_text(u'timestamp,host,value\n' + u''.join(u'2021-01-01 00:00:{0:02d},h{0},{0}\n'.format(i)
+                                                              for i in range(5)))
+    ExporterObject().export_csv_to_influx(csv_file=str(csv_file),
+                                          db_server_name=fake_influx.url,
+                                          db_name='demo',
+                                          token='token',
+                                          db_measurement='demo',
+                                          tag_columns='host',
+                                          field_columns='value',
+                                          batch_size=2,
+                                          gzip=compress,
+                                          force_insert_even_csv_no_update=True)
+
+    written = b''.join(write['data'] for write in fake_influx.writes).decode('utf-8').splitlines()
+    assert written == ['demo,host=h{0} value={0}i {1}'.format(i, 1609459200000000000 + i * 10 ** 9)
+                       for i in range(5)]
+    assert fake_influx.requests == 3
+    assert fake_influx.bytes == len('\n'.join(written)) + 1
+    for write in fake_influx.writes:
+        assert write['path'] == ('/write' if version.startswith('1') else '/api/v2/write')
+        assert write['headers'].get('Content-Encoding') == ('gzip' if compress else None)
+
+
+def test_retry_transient_errors(fake_influx, monkeypatch):
+    sleeps = list()
+    monkeypatch.setattr(writer_object.time, 'sleep', sleeps.append)
+    fake_influx.responses = [503, 429, 503]
+    writer = make_writer(fake_influx, '1', retries=3, retry_interval=0.5)
+    assert writer.write(lines[0])
+    assert writer.close()
+
+    assert [write['code'] for write in fake_influx.writes] == [503, 429, 503, 204]
+    # The exponential backoff with jitter: uniform(0, 0.5 * 2 ** attempt)
+    assert len(sleeps) == 3
+    for attempt, interval in enumerate(sleeps):
+        assert 0 <= interval <= 0.5 * 2 ** attempt
+    assert fake_influx.lines == 1
+    assert writer.spooled == 0
+
+
+def test_conflict_fails_fast(fake_influx, tmp_path):
+    errors = list()
+    fake_influx.responses = [400]
+    writer = make_writer(fake_influx, '1', retries=3, spool_dir=str(tmp_path),
+                         error_callback=lambda details, data, exception: errors.append((details, data)))
+    assert not writer.write(lines[0])
+    assert not writer.write(lines[1])
+    assert not writer.close()
+
+    assert len(fake_influx.writes) == 1
+    assert errors == [(('demo',), lines[0])]
+    assert os.listdir(str(tmp_path)) == []
+
+
+@pytest.mark.parametrize('version, params', [
+    ('1', {'db': 'demo'}),
+    ('2', {'org': 'my-org', 'bucket': 'my-bucket', 'precision': 'ns'}),
+])
+def test_spool_and_replay(fake_influx, tmp_path, monkeypatch, version, params):
+    monkeypatch.setattr(writer_object.time, 'sleep', lambda interval: None)
+    spool_dir = str(tmp_path / 'spool')
+    data = b''.join(lines)
+    fake_influx.responses = [503, 503]
+    writer = make_writer(fake_influx, version, retries=1, compress=True, spool_dir=spool_dir)
+    assert writer.write(data)
+    assert writer.close()
+    assert (writer.spooled, writer.spooled_points) == (1, 3)
+
+    names = sorted(os.listdir(spool_dir))
+    assert [os.path.splitext(name)[1] for name in names] == ['.json', '.lp']
+    with open(os.path.join(spool_dir, names[0])) as f:
+        meta = json.load(f)
+    assert meta['params'] == params
+    assert meta['content_encoding'] == 'gzip'
+    assert meta['points'] == 3
+    with open(os.path.join(spool_dir, names[1]), 'rb') as f:
+        assert gzip.GzipFile(fileobj=io.BytesIO(f.read())).read() == data
+
+    # Replay by the writer without the db or bucket, like replay_spool_to_influx
+    del fake_influx.writes[:]
+    replay_writer = make_writer(fake_influx, version, **{'db_name' if version == '1' else 'bucket_name': None})
+    assert replay_writer.replay_spool(spool_dir) == (1, 0)
+    replay_writer.close()
+
+    write, = fake_influx.writes
+    assert write['params'] == params
+    assert write['headers']['Content-Encoding'] == 'gzip'
+    assert write['data'] == data
+    assert os.listdir(spool_dir) == []
+
+
+def test_replay_stops_at_failure(fake_influx, tmp_path, monkeypatch):
+    monkeypatch.setattr(writer_object.time, 'sleep', lambda interval: None)
+    spool_dir = str(tmp_path)
+    fake_influx.responses = [503, 503]
+    writer = make_writer(fake_influx, '1', retries=0, spool_dir=spool_dir)
+    assert writer.write(lines[0])
+    assert writer.write(lines[1])
+    assert writer.close()
+    assert len(os.listdir(spool_dir)) == 4
+
+    fake_influx.responses = [400]
+    replay_writer = make_writer(fake_influx, '1')
+    assert replay_writer.replay_spool(spool_dir) == (0, 2)
+    assert len(os.listdir(spool_dir)) == 4
+
+    assert replay_writer.replay_spool(spool_dir) == (2, 0)
+    replay_writer.close()
+    assert [write['data'] for write in fake_influx.writes if write['code'] == 204] == lines[:2]
+    assert os.listdir(spool_dir) == []
+
+
+@pytest.mark.parametrize('version', ['1', '2'])
+def test_verify_ssl(fake_influx, version):
+    assert make_writer(fake_influx, version).session.verify is True
+    assert make_writer(fake_influx, version, verify_ssl=False).session.verify is False